@@ -34,12 +34,13 @@ from utils.config import (
     show_info_message,
     show_success_message,
     show_warning_message,
+    formatar_variacao,
     COLORS
 )
 
 # MUDANÇA AQUI: Usar dados reais do banco em vez de mock_data
 # from utils.mock_data import get_metricas_dashboard  # DESATIVADO
-from models.dashboard_model import get_metricas_dashboard  # ✅ DADOS REAIS
+from utils.cache import metricas_dashboard  # ✅ DADOS REAIS (get_metricas_dashboard em cache)
 
 # ============================================================================
 # CONFIGURAÇÃO DA PÁGINA
@@ -69,7 +70,16 @@ st.markdown("---")
 
 try:
     # Esta função busca TODOS os dados do banco MySQL
-    metricas = get_metricas_dashboard()
+    # (seções em paralelo; as que passarem de 5s voltam vazias)
+    metricas = metricas_dashboard()
+    
+    if metricas.get('secoes_indisponiveis'):
+        # Resultado parcial não fica em cache: a próxima execução tenta de novo
+        metricas_dashboard.clear()
+        show_warning_message(
+            "Algumas informações não carregaram a tempo e aparecem vazias: "
+            + ", ".join(metricas['secoes_indisponiveis'])
+        )
     
     # Verificar se conseguiu conectar
     if not metricas or (metricas.get('total_doadores', 0) == 0 and 
@@ -101,28 +111,28 @@ with col1:
     st.metric(
         label="👤 Total de Doadores",
         value=f"{metricas['total_doadores']:,}".replace(",", "."),
-        delta="+23 este mês"  # TODO: Calcular delta real
+        delta=formatar_variacao(metricas['variacao_mes'], 'total_doadores')
     )
 
 with col2:
     st.metric(
         label="🤝 Total de Beneficiários",
         value=f"{metricas['total_beneficiarios']:,}".replace(",", "."),
-        delta="+12 este mês"  # TODO: Calcular delta real
+        delta=formatar_variacao(metricas['variacao_mes'], 'total_beneficiarios')
     )
 
 with col3:
     st.metric(
         label="📦 Total de Doações",
         value=f"{metricas['total_doacoes']:,}".replace(",", "."),
-        delta="+156 este mês"  # TODO: Calcular delta real
+        delta=formatar_variacao(metricas['variacao_mes'], 'total_doacoes')
     )
 
 with col4:
     st.metric(
         label="📢 Campanhas Ativas",
         value=metricas['campanhas_ativas'],
-        delta="3 novas"  # TODO: Calcular delta real
+        delta=formatar_variacao(metricas['variacao_mes'], 'campanhas_ativas')
     )
 
 st.markdown("---")
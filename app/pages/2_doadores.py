@@ -30,6 +30,8 @@ from utils.config import (
 
 # Importar modelo do backend
 from models.doador import Doador
+from utils.cache import doadores_df, buscar
+from utils.importacao import render_importador
 
 # ============================================================================
 # CONFIGURAÇÃO DA PÁGINA
@@ -128,21 +130,25 @@ if st.session_state.get('confirmar_exclusao_doador'):
 # CARREGAR DADOS DO BANCO
 # ============================================================================
 
+def preparar_doadores(df: pd.DataFrame) -> pd.DataFrame:
+    """Colunas exibidas na lista (a listagem completa e a busca usam o mesmo formato)"""
+    if df.empty:
+        return pd.DataFrame(columns=['id', 'nome', 'email', 'telefone', 'endereco', 'data_cadastro'])
+    df = df.copy()
+    if 'endereco' not in df.columns:
+        df['endereco'] = df.apply(
+            lambda row: f"{row.get('logradouro', '')}, {row.get('numero', '')} - {row.get('bairro', '')}".strip(' ,-'), 
+            axis=1
+        )
+    if 'data_cadastro' not in df.columns:
+        df['data_cadastro'] = datetime.now().strftime('%Y-%m-%d')
+    if 'idDoador' in df.columns:
+        df['id'] = df['idDoador']
+    return df
+
+
 try:
-    doadores_list = Doador.get_all()
-    if doadores_list:
-        df_doadores = pd.DataFrame([d.to_dict() for d in doadores_list])
-        if 'endereco' not in df_doadores.columns:
-            df_doadores['endereco'] = df_doadores.apply(
-                lambda row: f"{row.get('logradouro', '')}, {row.get('numero', '')} - {row.get('bairro', '')}".strip(' ,-'), 
-                axis=1
-            )
-        if 'data_cadastro' not in df_doadores.columns:
-            df_doadores['data_cadastro'] = datetime.now().strftime('%Y-%m-%d')
-        if 'idDoador' in df_doadores.columns:
-            df_doadores['id'] = df_doadores['idDoador']
-    else:
-        df_doadores = pd.DataFrame(columns=['id', 'nome', 'email', 'telefone', 'endereco', 'data_cadastro'])
+    df_doadores = preparar_doadores(doadores_df())
 except Exception as e:
     show_error_message(f"Erro ao carregar doadores: {str(e)}")
     df_doadores = pd.DataFrame(columns=['id', 'nome', 'email', 'telefone', 'endereco', 'data_cadastro'])
@@ -175,22 +181,10 @@ st.markdown("---")
 
 if busca:
     try:
-        doadores_list = Doador.search_by_name(busca)
-        if doadores_list:
-            df_filtrado = pd.DataFrame([d.to_dict() for d in doadores_list])
-            if 'endereco' not in df_filtrado.columns:
-                df_filtrado['endereco'] = df_filtrado.apply(
-                    lambda row: f"{row.get('logradouro', '')}, {row.get('numero', '')} - {row.get('bairro', '')}".strip(' ,-'), 
-                    axis=1
-                )
-            if 'data_cadastro' not in df_filtrado.columns:
-                df_filtrado['data_cadastro'] = datetime.now().strftime('%Y-%m-%d')
-            if 'idDoador' in df_filtrado.columns:
-                df_filtrado['id'] = df_filtrado['idDoador']
-        else:
-            df_filtrado = pd.DataFrame(columns=['id', 'nome', 'email', 'telefone', 'endereco', 'data_cadastro'])
+        # Busca ranqueada no banco (nome, email e telefone), mais relevantes primeiro
+        df_filtrado = preparar_doadores(buscar('doador', busca))
     except Exception as e:
-        show_info_message(f"Usando busca local (backend indisponível)")
+        show_info_message(f"Usando busca local (índices de busca indisponíveis)")
         if not df_doadores.empty:
             mask = (
                 df_doadores['nome'].str.contains(busca, case=False, na=False) |
@@ -396,6 +390,18 @@ if st.session_state['mostrar_form']:
                 st.session_state['mostrar_form'] = False
                 st.rerun()
 
+# ============================================================================
+# IMPORTAR PLANILHA
+# ============================================================================
+
+with st.expander("📥 Importar Doadores de Planilha"):
+    render_importador(
+        'doador',
+        "Colunas: **Nome** (obrigatória), Telefone, Email, Logradouro, Numero, "
+        "Complemento, Bairro, Cidade, Estado (UF) e CEP. Linhas com erro não "
+        "impedem a importação das demais."
+    )
+
 # ============================================================================
 # ESTATÍSTICAS RÁPIDAS
 # ============================================================================
@@ -484,7 +490,7 @@ if not df_filtrado.empty:
             st.markdown("---")
     
     if busca:
-        show_info_message(f"Mostrando {len(df_filtrado)} de {len(df_doadores)} doadores")
+        show_info_message(f"Mostrando {len(df_filtrado)} de {len(df_doadores)} doadores (os mais relevantes primeiro)")
     else:
         show_info_message(f"Total de {len(df_doadores)} doadores cadastrados")
 
@@ -506,7 +512,8 @@ with st.expander("ℹ️ Informações sobre Gerenciamento de Doadores"):
     
     **Buscar Doadores:**
     - Use a barra de busca para encontrar doadores por nome, email ou telefone
-    - A busca é feita em tempo real e não diferencia maiúsculas de minúsculas
+    - A busca encontra qualquer parte do texto e não diferencia maiúsculas, minúsculas nem acentos
+    - Os resultados mais relevantes aparecem primeiro (até 50 por busca)
     
     **Cadastrar Novo Doador:**
     - Clique no botão "Cadastrar Novo Doador"
@@ -30,6 +30,8 @@ from utils.config import (
 
 # Importar modelo do backend
 from models.beneficiario import Beneficiario
+from utils.cache import beneficiarios_df, buscar
+from utils.importacao import render_importador
 
 # ============================================================================
 # CONFIGURAÇÃO DA PÁGINA
@@ -129,18 +131,22 @@ if st.session_state.get('confirmar_exclusao_beneficiario'):
 # CARREGAR DADOS DO BANCO
 # ============================================================================
 
+def preparar_beneficiarios(df: pd.DataFrame) -> pd.DataFrame:
+    """Colunas exibidas na lista (a listagem completa e a busca usam o mesmo formato)"""
+    if df.empty:
+        return pd.DataFrame(columns=['id', 'nome', 'idade', 'genero', 'descricao', 'necessidades', 'status'])
+    df = df.copy()
+    if 'id' not in df.columns and 'idBeneficiario' in df.columns:
+        df['id'] = df['idBeneficiario']
+    if 'necessidades' not in df.columns:
+        df['necessidades'] = 'Não especificado'
+    if 'status' not in df.columns:
+        df['status'] = 'Ativo'
+    return df
+
+
 try:
-    beneficiarios_list = Beneficiario.get_all()
-    if beneficiarios_list:
-        df_beneficiarios = pd.DataFrame([b.to_dict() for b in beneficiarios_list])
-        if 'id' not in df_beneficiarios.columns and 'idBeneficiario' in df_beneficiarios.columns:
-            df_beneficiarios['id'] = df_beneficiarios['idBeneficiario']
-        if 'necessidades' not in df_beneficiarios.columns:
-            df_beneficiarios['necessidades'] = 'Não especificado'
-        if 'status' not in df_beneficiarios.columns:
-            df_beneficiarios['status'] = 'Ativo'
-    else:
-        df_beneficiarios = pd.DataFrame(columns=['id', 'nome', 'idade', 'genero', 'descricao', 'necessidades', 'status'])
+    df_beneficiarios = preparar_beneficiarios(beneficiarios_df())
 except Exception as e:
     show_error_message(f"Erro ao carregar beneficiários: {str(e)}")
     df_beneficiarios = pd.DataFrame(columns=['id', 'nome', 'idade', 'genero', 'descricao', 'necessidades', 'status'])
@@ -179,16 +185,16 @@ st.markdown("---")
 
 df_filtrado = df_beneficiarios.copy()
 
-# Filtrar por busca
+# Filtrar por busca (ranqueada no banco, mais relevantes primeiro)
 if busca:
     try:
+        df_filtrado = preparar_beneficiarios(buscar('beneficiario', busca))
+    except Exception as e:
+        show_info_message("Usando busca local (índices de busca indisponíveis)")
         if not df_beneficiarios.empty:
             df_filtrado = df_filtrado[
                 df_filtrado['nome'].str.contains(busca, case=False, na=False)
             ]
-    except Exception as e:
-        show_info_message("Erro ao filtrar dados")
-        df_filtrado = df_beneficiarios
 
 # Filtrar por status
 if filtro_status != "Todos":
@@ -418,6 +424,17 @@ if st.session_state['mostrar_form_benef']:
                 st.session_state['mostrar_form_benef'] = False
                 st.rerun()
 
+# ============================================================================
+# IMPORTAR PLANILHA
+# ============================================================================
+
+with st.expander("📥 Importar Beneficiários de Planilha"):
+    render_importador(
+        'beneficiario',
+        "Colunas: **Nome** (obrigatória), Idade, Genero (M, F, O ou N) e "
+        "Descricao. Linhas com erro não impedem a importação das demais."
+    )
+
 # ============================================================================
 # ESTATÍSTICAS RÁPIDAS
 # ============================================================================
@@ -577,7 +594,8 @@ with st.expander("ℹ️ Informações sobre Gerenciamento de Beneficiários"):
     ### Como usar esta página:
     
     **Buscar Beneficiários:**
-    - Use a barra de busca para encontrar beneficiários por nome
+    - Use a barra de busca para encontrar beneficiários por qualquer parte do nome (sem diferenciar acentos)
+    - Os resultados mais relevantes aparecem primeiro (até 50 por busca)
     - Use o filtro de status para visualizar apenas Ativos, Inativos ou Aguardando
     - Os filtros podem ser combinados
     
@@ -30,11 +30,10 @@ from utils.config import (
 
 # Importar modelos do backend
 from models.doacao import Doacao
-from models.doador import Doador
-from models.ponto_coleta import PontoColeta
-from models.campanha_doacao import CampanhaDoacao
-from models.beneficiario import Beneficiario
-from models.voluntario import Voluntario
+
+# Leituras em cache (st.cache_data), invalidadas a cada escrita
+from utils import cache
+from utils.importacao import render_importador
 
 # ============================================================================
 # CONFIGURAÇÃO DA PÁGINA
@@ -60,76 +59,123 @@ st.markdown("---")
 # ============================================================================
 # CARREGAR DADOS DO BANCO
 # ============================================================================
+# Cada aba é um st.fragment: interagir com uma aba reexecuta só a função
+# dela, que carrega apenas os dados que usa (em cache, ver utils/cache.py).
 
-# Carregar doadores
-try:
-    doadores_list = Doador.get_all()
-    doadores = [{'id': d.idDoador, 'nome': d.nome} for d in doadores_list] if doadores_list else []
-except Exception as e:
-    doadores = []
-    show_error_message(f"Erro ao carregar doadores: {str(e)}")
-
-# Carregar pontos de coleta
-try:
-    pontos_list = PontoColeta.get_all()
-    pontos = [{'id': p.idPontoColeta, 'nome': p.responsavel, 'cidade': getattr(p, 'cidade', '')} for p in pontos_list] if pontos_list else []
-except Exception as e:
-    pontos = []
-    show_error_message(f"Erro ao carregar pontos de coleta: {str(e)}")
-
-# Carregar voluntários
-try:
-    voluntarios_list = Voluntario.get_all()
-    voluntarios = [{'id': v.idVoluntario, 'nome': v.nome} for v in voluntarios_list] if voluntarios_list else []
-except Exception as e:
-    voluntarios = []
-    show_error_message(f"Erro ao carregar voluntários: {str(e)}")
-
-# Carregar campanhas
-try:
-    campanhas_list = CampanhaDoacao.get_all()
-    campanhas = [{'id': c.idCampanhaDoacao, 'nome': c.nome} for c in campanhas_list] if campanhas_list else []
-except Exception as e:
-    campanhas = []
-
-# Carregar beneficiários
-try:
-    beneficiarios_list = Beneficiario.get_all()
-    beneficiarios = [{'id': b.idBeneficiario, 'nome': b.nome} for b in beneficiarios_list] if beneficiarios_list else []
-except Exception as e:
-    beneficiarios = []
+def carregar_doadores():
+    try:
+        doadores_list = cache.doadores()
+        return [{'id': d.idDoador, 'nome': d.nome} for d in doadores_list] if doadores_list else []
+    except Exception as e:
+        show_error_message(f"Erro ao carregar doadores: {str(e)}")
+        return []
+
+
+def carregar_pontos():
+    try:
+        pontos_list = cache.pontos_coleta()
+        return [{'id': p.idPontoColeta, 'nome': p.responsavel, 'cidade': getattr(p, 'cidade', '')} for p in pontos_list] if pontos_list else []
+    except Exception as e:
+        show_error_message(f"Erro ao carregar pontos de coleta: {str(e)}")
+        return []
+
+
+def carregar_voluntarios():
+    try:
+        voluntarios_list = cache.voluntarios()
+        return [{'id': v.idVoluntario, 'nome': v.nome} for v in voluntarios_list] if voluntarios_list else []
+    except Exception as e:
+        show_error_message(f"Erro ao carregar voluntários: {str(e)}")
+        return []
 
-# ============================================================================
-# ABAS
-# ============================================================================
 
-tab1, tab2, tab3 = st.tabs(["📝 Nova Doação", "📤 Distribuir Doação", "📋 Histórico"])
+def carregar_campanhas():
+    try:
+        campanhas_list = cache.campanhas()
+        return [{'id': c.idCampanhaDoacao, 'nome': c.nome} for c in campanhas_list] if campanhas_list else []
+    except Exception:
+        return []
+
+
+# Beneficiários e voluntários podem ser milhares: na distribuição eles são
+# escolhidos por busca de prefixo no nome (índice idx_nome_*), que traz no
+# máximo LIMITE_BUSCA nomes por vez
+LIMITE_BUSCA = 20
+
+
+def selecionar_por_busca(rotulo: str, buscar, chave: str) -> list:
+    """
+    Campo de busca + multiselect com os primeiros nomes que batem.
+    
+    A seleção fica em st.session_state[chave] e continua valendo quando a
+    busca muda (os já escolhidos sempre fazem parte das opções). O
+    multiselect tem key própria (f"{chave}_selecao"), alimentada por
+    st.session_state[chave] antes de cada renderização; o on_change copia a
+    escolha de volta.
+    
+    Returns:
+        list: ids selecionados
+    """
+    termo = st.text_input(
+        f"Buscar {rotulo.lower()}",
+        key=f"{chave}_busca",
+        placeholder="Digite o início do nome..."
+    )
+    try:
+        encontrados = buscar(termo, LIMITE_BUSCA)
+    except Exception:
+        encontrados = []
+    
+    selecionados = st.session_state.get(chave, [])
+    opcoes = list(dict.fromkeys(selecionados + [(r['id'], r['nome']) for r in encontrados]))
+    
+    chave_selecao = f"{chave}_selecao"
+    st.session_state[chave_selecao] = selecionados
+    st.multiselect(
+        rotulo,
+        options=opcoes,
+        key=chave_selecao,
+        on_change=lambda: st.session_state.update({chave: st.session_state[chave_selecao]}),
+        format_func=lambda opcao: opcao[1]
+    )
+    if len(encontrados) == LIMITE_BUSCA:
+        st.caption(f"Mostrando os {LIMITE_BUSCA} primeiros nomes. Digite mais letras para refinar a busca.")
+    elif termo and not encontrados:
+        st.caption("Nenhum nome começa com esse texto")
+    
+    return [id_ for id_, _ in selecionados]
 
 # ============================================================================
 # ABA 1 - NOVA DOAÇÃO
 # ============================================================================
 
-with tab1:
+@st.fragment
+def aba_nova_doacao():
     st.markdown("### Registrar Nova Doação")
     st.info("💡 **Como funciona:** O doador entrega os itens no ponto de coleta. Um voluntário recebe e registra a doação no sistema com status 'Recebida'. Depois, você pode distribuir para beneficiários na aba 'Distribuir Doação'.")
     
+    doadores = carregar_doadores()
+    pontos = carregar_pontos()
+    voluntarios = carregar_voluntarios()
+    campanhas = carregar_campanhas()
+    
     if not doadores:
         show_warning_message("Nenhum doador cadastrado! Cadastre doadores antes de registrar doações.")
         if st.button("➕ Ir para Doadores"):
             st.switch_page("pages/2_doadores.py")
-        st.stop()
+        return
     
     if not pontos:
         show_warning_message("Nenhum ponto de coleta cadastrado! Cadastre um ponto primeiro.")
         if st.button("➕ Ir para Pontos de Coleta"):
             st.switch_page("pages/6_pontos_coleta.py")
-        st.stop()
+        return
     
     if not voluntarios:
         show_warning_message("Nenhum voluntário cadastrado! Cadastre um voluntário primeiro.")
         if st.button("➕ Ir para Voluntários"):
             st.switch_page("pages/7_voluntarios.py")
-        st.stop()
+        return
     
     with st.form("form_nova_doacao"):
         st.markdown("#### 📋 Identificação (Obrigatório)")
@@ -247,39 +293,50 @@ with tab1:
             )
             
             if doacao.save():
-                show_success_message(f"Doação #{doacao.idDoacao} registrada com sucesso!")
-                
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    st.metric("ID", f"#{doacao.idDoacao}")
-                with col2:
-                    st.metric("Status", "🟢 Recebida")
-                with col3:
-                    st.metric("Quantidade", f"{quantidade} {unidade}")
-                
-                st.markdown("---")
-                col1, col2 = st.columns(2)
-                with col1:
-                    if st.button("📤 Distribuir Agora", use_container_width=True):
-                        st.session_state['doacao_para_distribuir'] = doacao.idDoacao
-                        st.rerun()
-                with col2:
-                    if st.button("➕ Registrar Outra", use_container_width=True):
-                        st.rerun()
+                # Guardado na sessão para os botões abaixo continuarem
+                # visíveis quando o fragmento reexecutar no clique
+                st.session_state['doacao_registrada'] = (doacao.idDoacao, quantidade, unidade)
             else:
                 show_error_message("Erro ao registrar doação!")
+    
+    registrada = st.session_state.get('doacao_registrada')
+    if registrada:
+        id_registrada, qtd_registrada, un_registrada = registrada
+        show_success_message(f"Doação #{id_registrada} registrada com sucesso!")
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("ID", f"#{id_registrada}")
+        with col2:
+            st.metric("Status", "🟢 Recebida")
+        with col3:
+            st.metric("Quantidade", f"{qtd_registrada} {un_registrada}")
+        
+        st.markdown("---")
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("📤 Distribuir Agora", use_container_width=True):
+                del st.session_state['doacao_registrada']
+                st.session_state['doacao_para_distribuir'] = id_registrada
+                # A aba de distribuição é outro fragmento: reexecuta a página
+                st.rerun()
+        with col2:
+            if st.button("➕ Registrar Outra", use_container_width=True):
+                del st.session_state['doacao_registrada']
+                st.rerun(scope="fragment")
 
 # ============================================================================
 # ABA 2 - DISTRIBUIR DOAÇÃO
 # ============================================================================
 
-with tab2:
+@st.fragment
+def aba_distribuir():
     st.markdown("### 📤 Distribuir Doação para Beneficiários")
     st.info("💡 **Como funciona:** Selecione uma doação 'Recebida', escolha os beneficiários que receberão, selecione os voluntários que farão a entrega e confirme. O status mudará automaticamente para 'Distribuída'.")
     
-    # Carregar doações recebidas
+    # Carregar doações recebidas (já com nome do doador e do ponto)
     try:
-        doacoes_recebidas = Doacao.listar_por_status("Recebida")
+        doacoes_recebidas = cache.doacoes_detalhadas(status="Recebida")
     except:
         doacoes_recebidas = []
     
@@ -287,13 +344,18 @@ with tab2:
         show_warning_message("Não há doações aguardando distribuição!")
         if st.button("➕ Registrar Nova Doação"):
             st.switch_page("pages/4_doacoes.py")
-        st.stop()
+        return
     
-    if not beneficiarios:
+    try:
+        existe_beneficiario = bool(cache.buscar_beneficiarios("", 1))
+    except Exception:
+        existe_beneficiario = False
+    
+    if not existe_beneficiario:
         show_warning_message("Nenhum beneficiário cadastrado! Cadastre beneficiários primeiro.")
         if st.button("➕ Ir para Beneficiários"):
             st.switch_page("pages/3_beneficiarios.py")
-        st.stop()
+        return
     
     # Verificar se há doação pré-selecionada
     doacao_pre_sel = st.session_state.get('doacao_para_distribuir', None)
@@ -302,16 +364,10 @@ with tab2:
     # Criar opções de doações
     doacoes_options = []
     for idx, d in enumerate(doacoes_recebidas):
-        try:
-            doador = Doador.get_by_id(d.doador_id)
-            doador_nome = doador.nome if doador else "Desconhecido"
-        except:
-            doador_nome = "Desconhecido"
-        
-        opcao = f"#{d.idDoacao} - {d.tipo_doacao} ({d.quantidade} {d.unidade}) - {doador_nome}"
+        opcao = f"#{d['idDoacao']} - {d['tipo_doacao']} ({d['quantidade']} {d['unidade']}) - {d['doador_nome']}"
         doacoes_options.append(opcao)
         
-        if doacao_pre_sel and d.idDoacao == doacao_pre_sel:
+        if doacao_pre_sel and d['idDoacao'] == doacao_pre_sel:
             index_padrao = idx
     
     # Limpar sessão
@@ -327,7 +383,7 @@ with tab2:
     )
     
     doacao_id = int(doacao_sel.split(" - ")[0].replace("#", ""))
-    doacao_atual = next((d for d in doacoes_recebidas if d.idDoacao == doacao_id), None)
+    doacao_atual = next((d for d in doacoes_recebidas if d['idDoacao'] == doacao_id), None)
     
     if doacao_atual:
         # Mostrar detalhes
@@ -336,68 +392,51 @@ with tab2:
             
             with col1:
                 st.markdown("**📋 Geral**")
-                st.write(f"**ID:** #{doacao_atual.idDoacao}")
-                st.write(f"**Tipo:** {doacao_atual.tipo_doacao}")
-                st.write(f"**Qtd:** {doacao_atual.quantidade} {doacao_atual.unidade}")
+                st.write(f"**ID:** #{doacao_atual['idDoacao']}")
+                st.write(f"**Tipo:** {doacao_atual['tipo_doacao']}")
+                st.write(f"**Qtd:** {doacao_atual['quantidade']} {doacao_atual['unidade']}")
             
             with col2:
                 st.markdown("**👤 Doador**")
-                try:
-                    doador = Doador.get_by_id(doacao_atual.doador_id)
-                    st.write(f"**Nome:** {doador.nome if doador else 'N/A'}")
-                except:
-                    st.write("**Nome:** N/A")
+                st.write(f"**Nome:** {doacao_atual['doador_nome']}")
             
             with col3:
                 st.markdown("**📍 Coleta**")
-                try:
-                    ponto = PontoColeta.get_by_id(doacao_atual.ponto_coleta_id)
-                    st.write(f"**Ponto:** {ponto.responsavel if ponto else 'N/A'}")
-                except:
-                    st.write("**Ponto:** N/A")
+                st.write(f"**Ponto:** {doacao_atual['ponto_responsavel'] or 'N/A'}")
             
-            if doacao_atual.descricao_item:
-                st.markdown(f"**📝 Descrição:** {doacao_atual.descricao_item}")
+            if doacao_atual['descricao_item']:
+                st.markdown(f"**📝 Descrição:** {doacao_atual['descricao_item']}")
+        
+        st.markdown("---")
+        
+        # Seleção por busca (fora do form: a busca atualiza as opções ao digitar)
+        st.markdown("#### 👥 Beneficiários")
+        st.caption("Busque pelo nome e selecione um ou mais beneficiários")
+        
+        beneficiarios_selecionados = selecionar_por_busca(
+            "Beneficiários", cache.buscar_beneficiarios, "dist_beneficiarios"
+        )
+        
+        if beneficiarios_selecionados:
+            st.success(f"✅ {len(beneficiarios_selecionados)} beneficiário(s) selecionado(s)")
+        else:
+            st.warning("⚠️ Selecione pelo menos um beneficiário")
+        
+        st.markdown("---")
+        st.markdown("#### 🙋 Voluntários Distribuidores (Opcional)")
+        st.caption("Busque quem fará a entrega")
+        
+        voluntarios_selecionados = selecionar_por_busca(
+            "Voluntários", cache.buscar_voluntarios, "dist_voluntarios"
+        )
+        
+        if voluntarios_selecionados:
+            st.success(f"✅ {len(voluntarios_selecionados)} voluntário(s) selecionado(s)")
         
         st.markdown("---")
         
         # Formulário de distribuição
         with st.form("form_distribuir"):
-            st.markdown("#### 👥 Beneficiários")
-            st.caption("Selecione um ou mais beneficiários")
-            
-            beneficiarios_selecionados = []
-            cols = st.columns(3)
-            
-            for idx, benef in enumerate(beneficiarios):
-                col_idx = idx % 3
-                with cols[col_idx]:
-                    if st.checkbox(benef['nome'], key=f"benef_{benef['id']}"):
-                        beneficiarios_selecionados.append(benef['id'])
-            
-            if beneficiarios_selecionados:
-                st.success(f"✅ {len(beneficiarios_selecionados)} beneficiário(s) selecionado(s)")
-            else:
-                st.warning("⚠️ Selecione pelo menos um beneficiário")
-            
-            st.markdown("---")
-            st.markdown("#### 🙋 Voluntários Distribuidores (Opcional)")
-            st.caption("Selecione quem fará a entrega")
-            
-            voluntarios_selecionados = []
-            if voluntarios:
-                cols = st.columns(3)
-                
-                for idx, vol in enumerate(voluntarios):
-                    col_idx = idx % 3
-                    with cols[col_idx]:
-                        if st.checkbox(vol['nome'], key=f"vol_{vol['id']}"):
-                            voluntarios_selecionados.append(vol['id'])
-                
-                if voluntarios_selecionados:
-                    st.success(f"✅ {len(voluntarios_selecionados)} voluntário(s) selecionado(s)")
-            
-            st.markdown("---")
             st.markdown("#### 📅 Data de Entrega")
             
             data_entrega_dist = st.date_input(
@@ -411,6 +450,7 @@ with tab2:
             confirmar = st.form_submit_button("✅ Confirmar Distribuição", use_container_width=True, type="primary")
         
         if confirmar:
+            st.session_state.pop('dist_concluida', None)
             if not beneficiarios_selecionados:
                 show_error_message("Selecione pelo menos um beneficiário!")
             else:
@@ -422,47 +462,29 @@ with tab2:
                 )
                 
                 if sucesso:
+                    st.session_state.pop('dist_beneficiarios', None)
+                    st.session_state.pop('dist_voluntarios', None)
+                    st.session_state['dist_concluida'] = True
                     show_success_message(msg)
                     st.balloons()
-                    
-                    if st.button("📤 Distribuir Outra"):
-                        st.rerun()
                 else:
                     show_error_message(msg)
+        
+        # Fora do "if confirmar": no rerun do clique o form não foi enviado
+        if st.session_state.get('dist_concluida') and st.button("📤 Distribuir Outra"):
+            del st.session_state['dist_concluida']
+            st.rerun(scope="fragment")
 
 # ============================================================================
 # ABA 3 - HISTÓRICO
 # ============================================================================
 
-with tab3:
+@st.fragment
+def aba_historico():
     st.markdown("### 📋 Histórico de Doações")
     
-    # Carregar doações
-    try:
-        doacoes_list = Doacao.get_all()
-        if doacoes_list:
-            doacoes_data = []
-            for d in doacoes_list:
-                doacao_dict = d.to_dict()
-                
-                # Buscar nomes
-                try:
-                    doador = Doador.get_by_id(d.doador_id)
-                    doacao_dict['doador_nome'] = doador.nome if doador else 'Desconhecido'
-                except:
-                    doacao_dict['doador_nome'] = 'Desconhecido'
-                
-                doacoes_data.append(doacao_dict)
-            
-            df_doacoes = pd.DataFrame(doacoes_data)
-        else:
-            df_doacoes = pd.DataFrame()
-    except Exception as e:
-        show_error_message(f"Erro ao carregar doações: {str(e)}")
-        df_doacoes = pd.DataFrame()
-    
-    # Filtros
-    col1, col2, col3 = st.columns(3)
+    # Filtros (aplicados no banco)
+    col1, col2, col3, col4 = st.columns(4)
     
     with col1:
         filtro_tipo = st.selectbox(
@@ -477,17 +499,32 @@ with tab3:
         )
     
     with col3:
-        st.write("")
-        st.write("")
-        if st.button("🔍 Filtrar", use_container_width=True):
-            pass
+        filtro_inicio = st.date_input("De", value=None, key="historico_inicio")
+    
+    with col4:
+        filtro_fim = st.date_input("Até", value=None, key="historico_fim")
+    
+    filtros = {
+        'tipo': filtro_tipo,
+        'status': filtro_status,
+        'data_inicio': filtro_inicio,
+        'data_fim': filtro_fim
+    }
+    
+    # Pilha de cursores: o último é o início da página atual.
+    # Mudou algum filtro → volta para a primeira página.
+    chave_filtros = (filtro_tipo, filtro_status, filtro_inicio, filtro_fim)
+    if st.session_state.get('historico_filtros') != chave_filtros:
+        st.session_state['historico_filtros'] = chave_filtros
+        st.session_state['historico_cursores'] = [None]
+    cursores = st.session_state['historico_cursores']
     
     # Estatísticas
     st.markdown("---")
     col1, col2, col3, col4 = st.columns(4)
     
     try:
-        stats = Doacao.estatisticas_geral()
+        stats = cache.estatisticas_doacoes()
         
         with col1:
             st.metric("📦 Total", stats.get('total_doacoes', 0))
@@ -505,35 +542,73 @@ with tab3:
     
     st.markdown("---")
     
+    # Carregar somente a página atual
+    TAMANHO_PAGINA = 50
+    try:
+        linhas, proximo_cursor = cache.pagina_doacoes(filtros, TAMANHO_PAGINA, cursores[-1])
+        total_filtrado = cache.contar_doacoes(filtros)
+    except Exception as e:
+        show_error_message(f"Erro ao carregar doações: {str(e)}")
+        linhas, proximo_cursor, total_filtrado = [], None, 0
+    
     # Tabela
-    if not df_doacoes.empty:
+    if linhas:
         try:
-            # Filtrar
-            df_filtrado = df_doacoes.copy()
-            
-            if filtro_tipo != "Todos":
-                df_filtrado = df_filtrado[df_filtrado['tipo_doacao'] == filtro_tipo]
-            
-            if filtro_status != "Todos":
-                df_filtrado = df_filtrado[df_filtrado['status'] == filtro_status]
+            df_doacoes = pd.DataFrame(linhas)
             
             # Preparar para exibição
-            df_display = df_filtrado[[
+            df_display = df_doacoes[[
                 'idDoacao', 'data_criacao', 'doador_nome', 'tipo_doacao',
                 'descricao_item', 'quantidade', 'unidade', 'status'
             ]].copy()
             
             df_display.columns = ['ID', 'Data', 'Doador', 'Tipo', 'Item', 'Qtd', 'Un.', 'Status']
             df_display['Data'] = pd.to_datetime(df_display['Data']).dt.strftime('%d/%m/%Y')
-            df_display = df_display.sort_values('ID', ascending=False)
             
             st.dataframe(df_display, use_container_width=True, hide_index=True)
             
-            show_info_message(f"Exibindo {len(df_filtrado)} doações")
+            pagina = len(cursores)
+            total_paginas = max(1, -(-total_filtrado // TAMANHO_PAGINA))
+            show_info_message(f"Exibindo {len(linhas)} de {total_filtrado} doações (página {pagina} de {total_paginas})")
+            
+            col1, col2, col3 = st.columns([1, 1, 4])
+            with col1:
+                if st.button("⬅️ Anterior", use_container_width=True, disabled=pagina == 1):
+                    cursores.pop()
+                    st.rerun(scope="fragment")
+            with col2:
+                if st.button("Próxima ➡️", use_container_width=True, disabled=proximo_cursor is None):
+                    cursores.append(proximo_cursor)
+                    st.rerun(scope="fragment")
         except Exception as e:
             show_error_message(f"Erro ao exibir tabela: {str(e)}")
     else:
-        show_info_message("Nenhuma doação cadastrada")
+        show_info_message("Nenhuma doação encontrada")
+
+# ============================================================================
+# ABAS
+# ============================================================================
+
+tab1, tab2, tab3, tab4 = st.tabs(["📝 Nova Doação", "📤 Distribuir Doação", "📋 Histórico", "📥 Importar Planilha"])
+
+with tab1:
+    aba_nova_doacao()
+
+with tab2:
+    aba_distribuir()
+
+with tab3:
+    aba_historico()
+
+with tab4:
+    render_importador(
+        'doacao',
+        "Colunas obrigatórias: **Doador**, **Ponto de Coleta**, **Voluntario**, "
+        "**Item** e **Quantidade**. Opcionais: Campanha, Data (dd/mm/aaaa; "
+        "padrão hoje), Data de Entrega, Tipo, Unidade e Observacoes.\n\n"
+        "Doador, ponto de coleta, voluntário e campanha podem ser informados "
+        "pelo id ou pelo nome. As doações entram com status \"Recebida\"."
+    )
 
 st.markdown("---")
 
@@ -14,6 +14,7 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from backend.models.campanha_doacao import CampanhaDoacao
+from app.utils.cache import campanhas as carregar_campanhas
 from app.utils.config import (
     setup_page,
     apply_global_css,
@@ -114,7 +115,7 @@ if st.session_state.get('confirmar_exclusao_campanha'):
 # ============================================================================
 
 try:
-    campanhas_list = CampanhaDoacao.get_all()
+    campanhas_list = carregar_campanhas()
     if campanhas_list:
         campanhas = []
         for c in campanhas_list:
@@ -264,13 +265,14 @@ if st.session_state.get('editar_campanha_id'):
                     )
                 
                 with col3:
-                    arrecadado = st.number_input(
+                    # Calculado a partir das doações vinculadas (na unidade da meta)
+                    arrecadado = float(campanha.arrecadado or 0.0)
+                    st.number_input(
                         "Arrecadado",
-                        min_value=0.0,
-                        value=float(campanha.arrecadado or 0.0),
-                        step=10.0,
+                        value=arrecadado,
                         format="%.2f",
-                        help="Valor ou quantidade já arrecadada"
+                        disabled=True,
+                        help="Soma das doações vinculadas a esta campanha na unidade da meta"
                     )
                 
                 # Mostrar progresso atual
@@ -306,7 +308,6 @@ if st.session_state.get('editar_campanha_id'):
                             campanha.data_inicio = data_inicio
                             campanha.data_termino = data_fim
                             campanha.meta = meta
-                            campanha.arrecadado = arrecadado
                             campanha.tipo_meta = tipo_meta
                             
                             if campanha.update():
@@ -476,15 +477,10 @@ if campanhas_filtradas:
             col_dados, col_acoes = st.columns([5, 1])
             
             with col_dados:
-                # Calcular progresso REAL
+                # Progresso calculado a partir das doações da campanha
                 meta_valor = campanha.get('meta', 1)
                 arrecadado_valor = campanha.get('arrecadado', 0)
-                
-                if meta_valor > 0:
-                    progresso = (arrecadado_valor / meta_valor) * 100
-                    progresso = min(progresso, 100)
-                else:
-                    progresso = 0
+                progresso = campanha.get('progresso', 0)
                 
                 # Status emoji
                 status_emoji = "🟢" if campanha['status'] == 'Ativa' else "⚪"
@@ -573,7 +569,7 @@ with st.expander("ℹ️ Informações sobre Campanhas"):
     **Gestão de Metas:**
     - Defina uma meta clara para a campanha
     - Acompanhe o progresso em porcentagem
-    - Atualize o valor arrecadado conforme as doações
+    - O valor arrecadado é a soma das doações vinculadas à campanha na unidade da meta
     - Veja quanto ainda falta para atingir a meta
     
     **Status:**
@@ -583,7 +579,7 @@ with st.expander("ℹ️ Informações sobre Campanhas"):
     **Dicas:**
     - Use nomes descritivos (Ex: "Campanha de Inverno 2024")
     - Defina metas realistas e alcançáveis
-    - Atualize regularmente o valor arrecadado
+    - Vincule as doações à campanha ao registrá-las para o progresso avançar
     - Mantenha a descrição clara e objetiva
     """)
 
@@ -29,6 +29,7 @@ from utils.config import (
 
 # Importar modelo do backend
 from models.ponto_coleta import PontoColeta
+from utils.cache import pontos_coleta
 
 # ============================================================================
 # CONFIGURAÇÃO DA PÁGINA
@@ -128,7 +129,7 @@ if st.session_state.get('confirmar_exclusao_ponto'):
 # ============================================================================
 
 try:
-    pontos_list = PontoColeta.get_all()
+    pontos_list = pontos_coleta()
     if pontos_list:
         pontos = []
         for p in pontos_list:
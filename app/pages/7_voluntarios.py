@@ -30,6 +30,7 @@ from utils.config import (
 
 # Importar modelo do backend
 from models.voluntario import Voluntario
+from utils.cache import voluntarios_df, buscar
 
 # ============================================================================
 # CONFIGURAÇÃO DA PÁGINA
@@ -128,22 +129,26 @@ if st.session_state.get('confirmar_exclusao_voluntario'):
 # CARREGAR DADOS DO BANCO
 # ============================================================================
 
+def preparar_voluntarios(df: pd.DataFrame) -> pd.DataFrame:
+    """Colunas exibidas na lista (a listagem completa e a busca usam o mesmo formato)"""
+    if df.empty:
+        return pd.DataFrame(columns=['id', 'nome', 'email', 'telefone', 'areas_atuacao', 'disponibilidade', 'periodo', 'status'])
+    df = df.copy()
+    if 'id' not in df.columns and 'idVoluntario' in df.columns:
+        df['id'] = df['idVoluntario']
+    if 'areas_atuacao' not in df.columns:
+        df['areas_atuacao'] = 'Atendimento'
+    if 'disponibilidade' not in df.columns:
+        df['disponibilidade'] = 'Segunda a Sexta'
+    if 'periodo' not in df.columns:
+        df['periodo'] = 'Manhã'
+    if 'status' not in df.columns:
+        df['status'] = 'Ativo'
+    return df
+
+
 try:
-    voluntarios_list = Voluntario.get_all()
-    if voluntarios_list:
-        df_voluntarios = pd.DataFrame([v.to_dict() for v in voluntarios_list])
-        if 'id' not in df_voluntarios.columns and 'idVoluntario' in df_voluntarios.columns:
-            df_voluntarios['id'] = df_voluntarios['idVoluntario']
-        if 'areas_atuacao' not in df_voluntarios.columns:
-            df_voluntarios['areas_atuacao'] = 'Atendimento'
-        if 'disponibilidade' not in df_voluntarios.columns:
-            df_voluntarios['disponibilidade'] = 'Segunda a Sexta'
-        if 'periodo' not in df_voluntarios.columns:
-            df_voluntarios['periodo'] = 'Manhã'
-        if 'status' not in df_voluntarios.columns:
-            df_voluntarios['status'] = 'Ativo'
-    else:
-        df_voluntarios = pd.DataFrame(columns=['id', 'nome', 'email', 'telefone', 'areas_atuacao', 'disponibilidade', 'periodo', 'status'])
+    df_voluntarios = preparar_voluntarios(voluntarios_df())
 except Exception as e:
     show_error_message(f"Erro ao carregar voluntários: {str(e)}")
     df_voluntarios = pd.DataFrame(columns=['id', 'nome', 'email', 'telefone', 'areas_atuacao', 'disponibilidade', 'periodo', 'status'])
@@ -189,17 +194,19 @@ st.markdown("---")
 
 df_filtrado = df_voluntarios.copy()
 
-# Filtrar por busca
-if busca and not df_filtrado.empty:
+# Filtrar por busca (ranqueada no banco, mais relevantes primeiro)
+if busca:
     try:
-        mask = (
-            df_filtrado['nome'].str.contains(busca, case=False, na=False) |
-            df_filtrado['email'].str.contains(busca, case=False, na=False) |
-            df_filtrado['telefone'].str.contains(busca, case=False, na=False)
-        )
-        df_filtrado = df_filtrado[mask]
-    except:
-        pass
+        df_filtrado = preparar_voluntarios(buscar('voluntario', busca))
+    except Exception:
+        show_info_message("Usando busca local (índices de busca indisponíveis)")
+        if not df_filtrado.empty:
+            mask = (
+                df_filtrado['nome'].str.contains(busca, case=False, na=False) |
+                df_filtrado['email'].str.contains(busca, case=False, na=False) |
+                df_filtrado['telefone'].str.contains(busca, case=False, na=False)
+            )
+            df_filtrado = df_filtrado[mask]
 
 # Filtrar por status
 if filtro_status != "Todos" and not df_filtrado.empty:
@@ -478,7 +485,8 @@ with st.expander("ℹ️ Informações sobre Gerenciamento de Voluntários"):
     - Telefone
     
     **Buscar e Filtrar:**
-    - Use a barra de busca para encontrar por nome, email ou telefone
+    - Use a barra de busca para encontrar por qualquer parte do nome, email ou telefone
+    - Os resultados mais relevantes aparecem primeiro (até 50 por busca)
     - Filtre por status e área de atuação
     - Os filtros podem ser combinados
     
@@ -30,16 +30,16 @@ from utils.config import (
     render_sidebar,
     render_footer,
     show_success_message,
+    show_error_message,
     show_info_message,
+    formatar_variacao,
     COLORS
 )
 
 # ✅ DADOS REAIS: Importar models do backend
-from models.dashboard_model import get_metricas_dashboard
-from models.doador import Doador
-from models.beneficiario import Beneficiario
-from models.doacao import Doacao
-from models.campanha_doacao import CampanhaDoacao
+from services.relatorio_service import RelatorioService
+from services.exportacao_service import ExportacaoService
+from utils.cache import relatorio as carregar_relatorio, arquivo_relatorio
 
 # ============================================================================
 # CONFIGURAÇÃO DA PÁGINA
@@ -62,30 +62,6 @@ st.title("📊 Relatórios e Estatísticas")
 st.markdown("Visualize estatísticas detalhadas e gere relatórios do sistema")
 st.markdown("---")
 
-# ============================================================================
-# CARREGAR DADOS REAIS DO BANCO
-# ============================================================================
-
-try:
-    # Buscar métricas do dashboard
-    metricas = get_metricas_dashboard()
-    
-    # Buscar listas completas de cada entidade
-    doadores_list = Doador.get_all()
-    beneficiarios_list = Beneficiario.get_all()
-    doacoes_list = Doacao.get_all()
-    campanhas_list = CampanhaDoacao.get_all()
-    
-    # Converter para DataFrames
-    df_doadores = pd.DataFrame([d.to_dict() for d in doadores_list]) if doadores_list else pd.DataFrame()
-    df_beneficiarios = pd.DataFrame([b.to_dict() for b in beneficiarios_list]) if beneficiarios_list else pd.DataFrame()
-    df_doacoes = pd.DataFrame([d.to_dict() for d in doacoes_list]) if doacoes_list else pd.DataFrame()
-    df_campanhas = pd.DataFrame([c.to_dict() for c in campanhas_list]) if campanhas_list else pd.DataFrame()
-    
-except Exception as e:
-    st.error(f"❌ Erro ao carregar dados: {e}")
-    st.stop()
-
 # ============================================================================
 # FILTROS DE PERÍODO E TIPO DE RELATÓRIO
 # ============================================================================
@@ -109,11 +85,30 @@ with col2:
 with col3:
     tipo_relatorio = st.selectbox(
         "Tipo de Relatório",
-        ["Visão Geral", "Doações", "Doadores", "Beneficiários", "Campanhas"]
+        list(RelatorioService.SECOES_POR_TIPO.keys())
     )
 
+if data_inicio > data_fim:
+    st.warning("⚠️ A data de início deve ser anterior à data de fim")
+    st.stop()
+
 st.markdown("---")
 
+# ============================================================================
+# CARREGAR DADOS REAIS DO BANCO
+# ============================================================================
+
+try:
+    # Só as seções do tipo escolhido, restritas ao período (em cache por tipo + período)
+    relatorio = carregar_relatorio(tipo_relatorio, data_inicio, data_fim)
+    metricas = relatorio['totais']
+    
+except Exception as e:
+    st.error(f"❌ Erro ao carregar dados: {e}")
+    st.stop()
+
+periodo_texto = f"{data_inicio.strftime('%d/%m/%Y')} a {data_fim.strftime('%d/%m/%Y')}"
+
 # ============================================================================
 # SEÇÃO 1 - VISÃO GERAL COM COMPARAÇÕES
 # ============================================================================
@@ -127,7 +122,7 @@ with col1:
     st.metric(
         label="👤 Total de Doadores",
         value=f"{metricas['total_doadores']:,}".replace(",", "."),
-        delta="+8.5%",  # TODO: Calcular delta real
+        delta=formatar_variacao(metricas['variacao_mes'], 'total_doadores', percentual=True),
         delta_color="normal"
     )
 
@@ -135,7 +130,7 @@ with col2:
     st.metric(
         label="🤝 Total de Beneficiários",
         value=f"{metricas['total_beneficiarios']:,}".replace(",", "."),
-        delta="+12.3%",  # TODO: Calcular delta real
+        delta=formatar_variacao(metricas['variacao_mes'], 'total_beneficiarios', percentual=True),
         delta_color="normal"
     )
 
@@ -143,7 +138,7 @@ with col3:
     st.metric(
         label="📦 Total de Doações",
         value=f"{metricas['total_doacoes']:,}".replace(",", "."),
-        delta="+15.7%",  # TODO: Calcular delta real
+        delta=formatar_variacao(metricas['variacao_mes'], 'total_doacoes', percentual=True),
         delta_color="normal"
     )
 
@@ -151,250 +146,228 @@ with col4:
     st.metric(
         label="📢 Campanhas Ativas",
         value=metricas['campanhas_ativas'],
-        delta="+3",  # TODO: Calcular delta real
+        delta=formatar_variacao(metricas['variacao_mes'], 'campanhas_ativas', sufixo=""),
         delta_color="normal"
     )
 
+if 'resumo' in relatorio:
+    resumo = relatorio['resumo']
+    st.caption(
+        f"📅 {periodo_texto}: {resumo['total_doacoes']} doação(ões) de "
+        f"{resumo['doadores_ativos']} doador(es), {resumo['distribuidas']} já distribuída(s)"
+    )
+
 st.markdown("---")
 
 # ============================================================================
 # SEÇÃO 2 - GRÁFICOS DETALHADOS
 # ============================================================================
 
-st.markdown("### 📊 Análises Detalhadas")
-
-# Gráfico de Pizza - Distribuição por Tipo de Doação
-col1, col2 = st.columns(2)
-
-with col1:
-    st.markdown("#### Distribuição por Tipo de Doação")
+if 'por_tipo' in relatorio or 'ranking_doadores' in relatorio:
+    st.markdown("### 📊 Análises Detalhadas")
     
-    if metricas['doacoes_por_categoria']:
-        df_categorias = pd.DataFrame(
-            list(metricas['doacoes_por_categoria'].items()),
-            columns=['Categoria', 'Quantidade']
-        )
-        
-        fig_pizza = px.pie(
-            df_categorias,
-            values='Quantidade',
-            names='Categoria',
-            color_discrete_sequence=[
-                COLORS['primary'], 
-                COLORS['secondary'], 
-                COLORS['success'], 
-                COLORS['warning']
-            ],
-            hole=0.4
-        )
-        fig_pizza.update_traces(textposition='inside', textinfo='percent+label')
-        fig_pizza.update_layout(height=400, showlegend=True)
-        st.plotly_chart(fig_pizza, use_container_width=True)
-    else:
-        st.info("📝 Execute `add_doacoes_detalhes.sql` para dados por categoria")
-
-with col2:
-    st.markdown("#### Ranking de Doadores (Top 10)")
+    col1, col2 = st.columns(2)
     
-    if not df_doadores.empty and not df_doacoes.empty:
-        # Contar doações por doador
-        doacoes_por_doador = df_doacoes.groupby('doador_id').size().reset_index(name='total_doacoes')
-        
-        # Fazer merge com nomes dos doadores
-        if 'idDoador' in df_doadores.columns:
-            ranking = doacoes_por_doador.merge(
-                df_doadores[['idDoador', 'nome']], 
-                left_on='doador_id', 
-                right_on='idDoador',
-                how='left'
-            )
-            ranking = ranking.nlargest(10, 'total_doacoes')
+    # Gráfico de Pizza - Distribuição por Tipo de Doação
+    if 'por_tipo' in relatorio:
+        with col1:
+            st.markdown("#### Distribuição por Tipo de Doação")
             
-            fig_ranking = px.bar(
-                ranking,
-                x='total_doacoes',
-                y='nome',
-                orientation='h',
-                color='total_doacoes',
-                color_continuous_scale=[[0, COLORS['background']], [1, COLORS['primary']]],
-                labels={'total_doacoes': 'Doações', 'nome': 'Doador'}
-            )
-            fig_ranking.update_layout(
-                height=400, 
-                showlegend=False, 
-                yaxis={'categoryorder':'total ascending'}
-            )
-            st.plotly_chart(fig_ranking, use_container_width=True)
-        else:
-            st.info("Estrutura de dados incompatível para ranking")
-    else:
-        st.info("Cadastre doadores e doações para ver o ranking")
-
-st.markdown("---")
+            df_categorias = relatorio['por_tipo']
+            if not df_categorias.empty:
+                fig_pizza = px.pie(
+                    df_categorias,
+                    values='total',
+                    names='tipo_doacao',
+                    color_discrete_sequence=[
+                        COLORS['primary'], 
+                        COLORS['secondary'], 
+                        COLORS['success'], 
+                        COLORS['warning']
+                    ],
+                    hole=0.4,
+                    labels={'total': 'Quantidade', 'tipo_doacao': 'Categoria'}
+                )
+                fig_pizza.update_traces(textposition='inside', textinfo='percent+label')
+                fig_pizza.update_layout(height=400, showlegend=True)
+                st.plotly_chart(fig_pizza, use_container_width=True)
+            else:
+                st.info("Nenhuma doação no período")
+    
+    if 'ranking_doadores' in relatorio:
+        with col2:
+            st.markdown("#### Ranking de Doadores (Top 10)")
+            
+            df_ranking = relatorio['ranking_doadores']
+            if not df_ranking.empty:
+                # Ranking já vem ordenado do banco
+                ranking = df_ranking.head(10)
+                
+                fig_ranking = px.bar(
+                    ranking,
+                    x='total_doacoes',
+                    y='nome',
+                    orientation='h',
+                    color='total_doacoes',
+                    color_continuous_scale=[[0, COLORS['background']], [1, COLORS['primary']]],
+                    labels={'total_doacoes': 'Doações', 'nome': 'Doador'}
+                )
+                fig_ranking.update_layout(
+                    height=400, 
+                    showlegend=False, 
+                    yaxis={'categoryorder':'total ascending'}
+                )
+                st.plotly_chart(fig_ranking, use_container_width=True)
+            else:
+                st.info("Nenhuma doação no período")
+    
+    st.markdown("---")
 
 # Gráfico de Linha - Evolução Mensal
-st.markdown("#### Evolução Mensal de Doações")
-
-if metricas['doacoes_mensais']:
-    # Dados reais dos últimos 6 meses
-    df_evolucao_real = pd.DataFrame(
-        list(metricas['doacoes_mensais'].items()),
-        columns=['Mês', 'Doações']
-    )
-    df_evolucao_real['Mês'] = pd.to_datetime(df_evolucao_real['Mês']).dt.strftime('%b/%y')
-    df_evolucao_real['Ano'] = '2024'  # Atual
+if 'mensal' in relatorio:
+    st.markdown("#### Evolução Mensal de Doações")
     
-    # TODO: Buscar dados do ano anterior para comparação
-    # Por enquanto, só mostra ano atual
+    df_evolucao = relatorio['mensal']
+    if not df_evolucao.empty:
+        df_evolucao['Mês'] = df_evolucao['mes'].dt.strftime('%b/%y')
+        
+        fig_linha = px.line(
+            df_evolucao,
+            x='Mês',
+            y='total',
+            markers=True,
+            color_discrete_sequence=[COLORS['primary']],
+            labels={'total': 'Doações'}
+        )
+        fig_linha.update_layout(height=400)
+        st.plotly_chart(fig_linha, use_container_width=True)
+    else:
+        st.info(f"Nenhuma doação entre {periodo_texto}")
     
-    fig_linha = px.line(
-        df_evolucao_real,
-        x='Mês',
-        y='Doações',
-        markers=True,
-        color_discrete_sequence=[COLORS['primary']]
-    )
-    fig_linha.update_layout(height=400)
-    st.plotly_chart(fig_linha, use_container_width=True)
-else:
-    st.info("Nenhuma doação nos últimos 6 meses")
-
-st.markdown("---")
+    st.markdown("---")
 
-# Gráfico de Área - Novos Cadastros
-st.markdown("#### Novos Cadastros por Mês (Doadores e Beneficiários)")
-
-if metricas['doadores_mensais']:
-    df_cadastros = pd.DataFrame(
-        list(metricas['doadores_mensais'].items()),
-        columns=['Mês', 'Doadores']
-    )
-    df_cadastros['Mês'] = pd.to_datetime(df_cadastros['Mês']).dt.strftime('%b/%y')
-    
-    # TODO: Adicionar beneficiários mensais também
-    # Por enquanto só mostra doadores
+# Gráfico de Área - Novos Doadores
+if 'novos_doadores' in relatorio:
+    st.markdown("#### Novos Doadores por Mês")
     
-    fig_area = go.Figure()
-    fig_area.add_trace(go.Scatter(
-        x=df_cadastros['Mês'], 
-        y=df_cadastros['Doadores'],
-        mode='lines', 
-        name='Doadores',
-        fill='tozeroy', 
-        line=dict(color=COLORS['primary'])
-    ))
+    df_cadastros = relatorio['novos_doadores']
+    if not df_cadastros.empty:
+        df_cadastros['Mês'] = df_cadastros['mes'].dt.strftime('%b/%y')
+        
+        fig_area = go.Figure()
+        fig_area.add_trace(go.Scatter(
+            x=df_cadastros['Mês'], 
+            y=df_cadastros['novos_doadores'],
+            mode='lines', 
+            name='Doadores',
+            fill='tozeroy', 
+            line=dict(color=COLORS['primary'])
+        ))
+        
+        fig_area.update_layout(height=400, xaxis_title="", yaxis_title="Quantidade")
+        st.plotly_chart(fig_area, use_container_width=True)
+    else:
+        st.info(f"Nenhum doador novo entre {periodo_texto}")
     
-    fig_area.update_layout(height=400, xaxis_title="", yaxis_title="Quantidade")
-    st.plotly_chart(fig_area, use_container_width=True)
-else:
-    st.info("Nenhum cadastro nos últimos 6 meses")
-
-st.markdown("---")
+    st.markdown("---")
 
 # ============================================================================
 # SEÇÃO 3 - TABELAS DETALHADAS
 # ============================================================================
 
-st.markdown("### 📋 Tabelas Detalhadas")
-
-tab1, tab2, tab3 = st.tabs(["Campanhas", "Doadores Ativos", "Beneficiários Atendidos"])
-
-with tab1:
-    st.markdown("#### Resumo de Campanhas")
-    
-    if not df_campanhas.empty:
-        # Preparar dados para exibição
-        df_campanhas_display = df_campanhas.copy()
-        
-        # Renomear colunas
-        colunas_map = {
-            'nome': 'Campanha',
-            'data_inicio': 'Data Início',
-            'data_termino': 'Data Término',
-            'descricao': 'Descrição'
-        }
-        df_campanhas_display = df_campanhas_display.rename(columns=colunas_map)
-        
-        # Selecionar colunas relevantes
-        colunas_exibir = ['Campanha', 'Data Início', 'Data Término', 'Descrição']
-        colunas_disponiveis = [c for c in colunas_exibir if c in df_campanhas_display.columns]
-        
-        st.dataframe(
-            df_campanhas_display[colunas_disponiveis],
-            use_container_width=True,
-            hide_index=True
-        )
-    else:
-        st.info("Nenhuma campanha cadastrada")
-
-with tab2:
-    st.markdown("#### Doadores Mais Ativos")
+tabelas = [
+    (secao, titulo)
+    for secao, titulo in [
+        ('campanhas', "Campanhas"),
+        ('ranking_doadores', "Doadores Ativos"),
+        ('beneficiarios', "Beneficiários Atendidos")
+    ]
+    if secao in relatorio
+]
+
+if tabelas:
+    st.markdown("### 📋 Tabelas Detalhadas")
+    abas = dict(zip([secao for secao, _ in tabelas], st.tabs([titulo for _, titulo in tabelas])))
     
-    if not df_doadores.empty and not df_doacoes.empty:
-        # Contar doações por doador
-        doacoes_count = df_doacoes.groupby('doador_id').size().reset_index(name='Total Doações')
-        
-        # Merge com dados dos doadores
-        if 'idDoador' in df_doadores.columns:
-            doadores_ativos = doacoes_count.merge(
-                df_doadores[['idDoador', 'nome', 'email', 'telefone']], 
-                left_on='doador_id', 
-                right_on='idDoador',
-                how='left'
-            )
-            
-            # Ordenar por total de doações
-            doadores_ativos = doadores_ativos.sort_values('Total Doações', ascending=False)
-            
-            # Selecionar colunas
-            colunas_exibir = ['nome', 'Total Doações', 'email', 'telefone']
-            df_display = doadores_ativos[colunas_exibir].head(15)
-            df_display.columns = ['Nome', 'Total de Doações', 'Email', 'Telefone']
+    if 'campanhas' in abas:
+        with abas['campanhas']:
+            st.markdown("#### Resumo de Campanhas")
             
-            st.dataframe(
-                df_display,
-                use_container_width=True,
-                hide_index=True
-            )
-        else:
-            st.info("Estrutura de dados incompatível")
-    else:
-        st.info("Cadastre doadores e doações para ver estatísticas")
-
-with tab3:
-    st.markdown("#### Beneficiários Atendidos")
+            df_campanhas = relatorio['campanhas']
+            if not df_campanhas.empty:
+                # Preparar dados para exibição
+                df_campanhas_display = df_campanhas.copy()
+                
+                # Datas no formato brasileiro (as colunas vêm como datetime64)
+                for coluna in ['data_inicio', 'data_termino']:
+                    df_campanhas_display[coluna] = df_campanhas_display[coluna].dt.strftime('%d/%m/%Y')
+                
+                # Renomear colunas
+                colunas_map = {
+                    'nome': 'Campanha',
+                    'data_inicio': 'Data Início',
+                    'data_termino': 'Data Término',
+                    'total_doacoes': 'Doações no Período',
+                    'descricao': 'Descrição'
+                }
+                df_campanhas_display = df_campanhas_display.rename(columns=colunas_map)
+                
+                # Selecionar colunas relevantes
+                colunas_exibir = ['Campanha', 'Data Início', 'Data Término', 'Doações no Período', 'Descrição']
+                colunas_disponiveis = [c for c in colunas_exibir if c in df_campanhas_display.columns]
+                
+                st.dataframe(
+                    df_campanhas_display[colunas_disponiveis],
+                    use_container_width=True,
+                    hide_index=True
+                )
+            else:
+                st.info("Nenhuma campanha ativa no período")
     
-    if not df_beneficiarios.empty:
-        # Preparar dados
-        df_benef_display = df_beneficiarios.copy()
-        
-        # Selecionar colunas relevantes
-        colunas = ['nome', 'idade', 'genero', 'descricao']
-        colunas_disponiveis = [c for c in colunas if c in df_benef_display.columns]
-        
-        if colunas_disponiveis:
-            df_benef_display = df_benef_display[colunas_disponiveis].head(15)
+    if 'ranking_doadores' in abas:
+        with abas['ranking_doadores']:
+            st.markdown("#### Doadores Mais Ativos")
             
-            # Renomear
-            rename_map = {
-                'nome': 'Nome',
-                'idade': 'Idade',
-                'genero': 'Gênero',
-                'descricao': 'Descrição'
-            }
-            df_benef_display = df_benef_display.rename(columns=rename_map)
+            df_ranking = relatorio['ranking_doadores']
+            if not df_ranking.empty:
+                # Selecionar colunas (ranking já ordenado por total de doações)
+                colunas_exibir = ['nome', 'total_doacoes', 'email', 'telefone']
+                df_display = df_ranking[colunas_exibir].copy()
+                df_display.columns = ['Nome', 'Total de Doações', 'Email', 'Telefone']
+                
+                st.dataframe(
+                    df_display,
+                    use_container_width=True,
+                    hide_index=True
+                )
+            else:
+                st.info("Nenhuma doação no período")
+    
+    if 'beneficiarios' in abas:
+        with abas['beneficiarios']:
+            st.markdown("#### Beneficiários Atendidos")
             
-            st.dataframe(
-                df_benef_display,
-                use_container_width=True,
-                hide_index=True
-            )
-        else:
-            st.info("Colunas esperadas não encontradas")
-    else:
-        st.info("Nenhum beneficiário cadastrado")
-
-st.markdown("---")
+            df_beneficiarios = relatorio['beneficiarios']
+            if not df_beneficiarios.empty:
+                # Os 15 que mais receberam doações no período
+                colunas = ['nome', 'idade', 'genero', 'total_recebido', 'descricao']
+                df_benef_display = df_beneficiarios[colunas].rename(columns={
+                    'nome': 'Nome',
+                    'idade': 'Idade',
+                    'genero': 'Gênero',
+                    'total_recebido': 'Doações Recebidas',
+                    'descricao': 'Descrição'
+                })
+                
+                st.dataframe(
+                    df_benef_display,
+                    use_container_width=True,
+                    hide_index=True
+                )
+            else:
+                st.info("Nenhum beneficiário atendido no período")
+    
+    st.markdown("---")
 
 # ============================================================================
 # SEÇÃO 4 - EXPORTAÇÃO
@@ -402,20 +375,51 @@ st.markdown("---")
 
 st.markdown("### 📥 Exportar Relatórios")
 
+# O arquivo é gerado no clique e fica em cache por (relatório, período,
+# versão dos dados): baixar de novo é instantâneo enquanto nada for gravado
+tabelas_exportacao = ExportacaoService.tabelas(tipo_relatorio)
+
 col1, col2, col3, col4 = st.columns([1, 1, 1, 3])
 
+with col4:
+    tabela_csv = st.selectbox(
+        "Tabela do CSV",
+        tabelas_exportacao,
+        format_func=lambda tabela: ExportacaoService.PLANILHAS[tabela][0],
+        help="O Excel traz todas as tabelas do relatório, uma por aba"
+    )
+
 with col1:
-    if st.button("📄 Baixar PDF", use_container_width=True):
-        show_info_message("Funcionalidade de exportação PDF será implementada em breve!", "🚧")
+    if st.button("📊 Exportar Excel", use_container_width=True):
+        st.session_state['exportacao_relatorio'] = (tipo_relatorio, data_inicio, data_fim, 'xlsx', None)
 
 with col2:
-    if st.button("📊 Exportar Excel", use_container_width=True):
-        show_info_message("Funcionalidade de exportação Excel será implementada em breve!", "🚧")
+    if st.button("📄 Exportar CSV", use_container_width=True):
+        st.session_state['exportacao_relatorio'] = (tipo_relatorio, data_inicio, data_fim, 'csv', tabela_csv)
 
 with col3:
     if st.button("📧 Enviar por Email", use_container_width=True):
         show_info_message("Funcionalidade de envio por email será implementada em breve!", "🚧")
 
+exportacao = st.session_state.get('exportacao_relatorio')
+if exportacao and exportacao[:3] == (tipo_relatorio, data_inicio, data_fim):
+    _, _, _, formato, tabela = exportacao
+    nome_arquivo = ExportacaoService.nome_arquivo(tipo_relatorio, data_inicio, data_fim, formato, tabela)
+    try:
+        with st.spinner("Gerando arquivo..."):
+            caminho = arquivo_relatorio(tipo_relatorio, data_inicio, data_fim, formato, tabela)
+        with open(caminho, 'rb') as arquivo:
+            st.download_button(
+                f"⬇️ Baixar {nome_arquivo}",
+                data=arquivo,
+                file_name=nome_arquivo,
+                mime=("text/csv" if formato == 'csv'
+                      else "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+                type="primary"
+            )
+    except Exception as e:
+        show_error_message(f"Erro ao exportar: {str(e)}")
+
 st.markdown("---")
 
 # ============================================================================
@@ -484,8 +488,15 @@ with st.expander("ℹ️ Informações sobre Relatórios e Estatísticas"):
     2. Cadastre informações completas (descrição, categoria, etc)
     3. Registre doações regularmente para análise temporal
     
+    **Exportar:**
+    - **Excel:** todas as tabelas do relatório escolhido, uma por aba, incluindo
+      a lista completa de doações do período
+    - **CSV:** a tabela escolhida em "Tabela do CSV" (separador ";")
+    - O arquivo gerado fica guardado: baixar de novo é instantâneo até a
+      próxima alteração nos dados
+    
     **Funcionalidades Futuras:**
-    - Exportação em PDF e Excel
+    - Exportação em PDF
     - Comparação ano a ano
     - Gráficos personalizáveis
     - Relatórios agendados por email
@@ -504,8 +515,4 @@ render_footer()
 # ============================================================================
 # Descomente para ver dados brutos:
 # with st.expander("🐛 Debug - Dados Carregados"):
-#     st.write("Métricas:", metricas)
-#     st.write("Doadores:", len(df_doadores))
-#     st.write("Beneficiários:", len(df_beneficiarios))
-#     st.write("Doações:", len(df_doacoes))
-#     st.write("Campanhas:", len(df_campanhas))
\ No newline at end of file
+#     st.write("Relatório:", relatorio)
\ No newline at end of file
@@ -0,0 +1,250 @@
+"""
+Cache das leituras das páginas (st.cache_data)
+
+Toda interação com um widget reexecuta a página inteira. As funções abaixo
+embrulham as leituras dos models com st.cache_data, então digitar na busca
+ou trocar um filtro não volta ao MySQL enquanto os dados não mudarem.
+
+Invalidação:
+- cada função recebe a "versão dos dados" atual como parte da chave
+- qualquer escrita dos models (save/update/delete/distribuir) chama
+  query_cache.invalidate() no backend, que avisa este módulo e incrementa
+  a versão; a próxima leitura de qualquer página busca dados novos
+- o TTL limita por quanto tempo uma versão antiga fica guardada e cobre
+  alterações feitas fora deste processo (outro servidor, SQL manual)
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from functools import wraps
+from pathlib import Path
+
+import pandas as pd
+import streamlit as st
+
+# Adicionar backend ao path
+backend_path = Path(__file__).parent.parent.parent / 'backend'
+if str(backend_path) not in sys.path:
+    sys.path.insert(0, str(backend_path))
+
+from database.cache import query_cache
+from models.doador import Doador
+from models.beneficiario import Beneficiario
+from models.voluntario import Voluntario
+from models.ponto_coleta import PontoColeta
+from models.campanha_doacao import CampanhaDoacao
+from models.doacao import Doacao
+from models.dashboard_model import get_metricas_dashboard
+from services.relatorio_service import RelatorioService
+from services.busca_service import BuscaService
+from services.exportacao_service import ExportacaoService
+
+# ============================================================================
+# CONFIGURAÇÃO
+# ============================================================================
+
+TTL_CADASTROS = 600   # doadores, beneficiários, voluntários, pontos, campanhas
+TTL_DOACOES = 120     # listagens e estatísticas de doações
+TTL_PAINEL = 60       # dashboard e relatórios
+MAX_ENTRADAS = 64     # por função (buscas e páginas diferentes somam entradas)
+TTL_EXPORTACAO = 600  # arquivos exportados (Excel/CSV), guardados em disco
+PASTA_EXPORTACOES = Path(tempfile.gettempdir()) / 'somos_darua_exportacoes'
+
+# ============================================================================
+# VERSÃO DOS DADOS
+# ============================================================================
+
+
+class _VersaoDados:
+    """Contador global do processo, compartilhado por todas as sessões"""
+    
+    def __init__(self):
+        self.valor = 0
+        self._lock = threading.Lock()
+    
+    def incrementar(self, namespace: str = None) -> int:
+        with self._lock:
+            self.valor += 1
+            return self.valor
+
+
+_versao = _VersaoDados()
+query_cache.ao_invalidar(_versao.incrementar)
+
+
+def versao_dados() -> int:
+    """Versão atual dos dados (muda a cada escrita)"""
+    return _versao.valor
+
+
+def nova_versao_dados() -> int:
+    """Descarta tudo o que está em cache nas páginas (ex: botão "Atualizar")"""
+    return _versao.incrementar()
+
+
+def _versionado(funcao_cacheada):
+    """Chama a função cacheada passando a versão atual como primeiro argumento"""
+    @wraps(funcao_cacheada)
+    def wrapper(*args, **kwargs):
+        return funcao_cacheada(versao_dados(), *args, **kwargs)
+    wrapper.clear = funcao_cacheada.clear
+    return wrapper
+
+# ============================================================================
+# CADASTROS
+# ============================================================================
+
+
+@_versionado
+@st.cache_data(ttl=TTL_CADASTROS, max_entries=MAX_ENTRADAS, show_spinner=False)
+def doadores_df(versao: int) -> pd.DataFrame:
+    """Doador.get_dataframe()"""
+    return Doador.get_dataframe()
+
+
+@_versionado
+@st.cache_data(ttl=TTL_CADASTROS, max_entries=MAX_ENTRADAS, show_spinner=False)
+def buscar(versao: int, entidade: str, texto: str, limite: int = BuscaService.LIMITE_PADRAO) -> pd.DataFrame:
+    """BuscaService.search(entidade, texto, limite), uma entrada por termo digitado"""
+    return BuscaService.search(entidade, texto, limite)
+
+
+@_versionado
+@st.cache_data(ttl=TTL_CADASTROS, max_entries=MAX_ENTRADAS, show_spinner=False)
+def doadores(versao: int) -> list:
+    """Doador.get_all()"""
+    return Doador.get_all()
+
+
+@_versionado
+@st.cache_data(ttl=TTL_CADASTROS, max_entries=MAX_ENTRADAS, show_spinner=False)
+def buscar_beneficiarios(versao: int, prefixo: str, limite: int = 20) -> list:
+    """Beneficiario.buscar_por_prefixo(prefixo, limite)"""
+    return Beneficiario.buscar_por_prefixo(prefixo, limite)
+
+
+@_versionado
+@st.cache_data(ttl=TTL_CADASTROS, max_entries=MAX_ENTRADAS, show_spinner=False)
+def buscar_voluntarios(versao: int, prefixo: str, limite: int = 20) -> list:
+    """Voluntario.buscar_por_prefixo(prefixo, limite)"""
+    return Voluntario.buscar_por_prefixo(prefixo, limite)
+
+
+@_versionado
+@st.cache_data(ttl=TTL_CADASTROS, max_entries=MAX_ENTRADAS, show_spinner=False)
+def beneficiarios_df(versao: int) -> pd.DataFrame:
+    """Beneficiario.get_dataframe()"""
+    return Beneficiario.get_dataframe()
+
+
+@_versionado
+@st.cache_data(ttl=TTL_CADASTROS, max_entries=MAX_ENTRADAS, show_spinner=False)
+def voluntarios_df(versao: int) -> pd.DataFrame:
+    """Voluntario.get_dataframe()"""
+    return Voluntario.get_dataframe()
+
+
+@_versionado
+@st.cache_data(ttl=TTL_CADASTROS, max_entries=MAX_ENTRADAS, show_spinner=False)
+def voluntarios(versao: int) -> list:
+    """Voluntario.get_all()"""
+    return Voluntario.get_all()
+
+
+@_versionado
+@st.cache_data(ttl=TTL_CADASTROS, max_entries=MAX_ENTRADAS, show_spinner=False)
+def pontos_coleta(versao: int) -> list:
+    """PontoColeta.get_all()"""
+    return PontoColeta.get_all()
+
+
+@_versionado
+@st.cache_data(ttl=TTL_CADASTROS, max_entries=MAX_ENTRADAS, show_spinner=False)
+def campanhas(versao: int) -> list:
+    """CampanhaDoacao.get_all() (com arrecadado e progresso)"""
+    return CampanhaDoacao.get_all()
+
+# ============================================================================
+# DOAÇÕES
+# ============================================================================
+
+
+@_versionado
+@st.cache_data(ttl=TTL_DOACOES, max_entries=MAX_ENTRADAS, show_spinner=False)
+def doacoes_detalhadas(versao: int, status: str = None) -> list:
+    """Doacao.listar_detalhado(status)"""
+    return Doacao.listar_detalhado(status=status)
+
+
+@_versionado
+@st.cache_data(ttl=TTL_DOACOES, max_entries=MAX_ENTRADAS, show_spinner=False)
+def pagina_doacoes(versao: int, filtros: dict, limite: int, cursor: tuple = None) -> tuple:
+    """Doacao.listar(filtros, limite=limite, cursor=cursor)"""
+    return Doacao.listar(filtros, limite=limite, cursor=cursor)
+
+
+@_versionado
+@st.cache_data(ttl=TTL_DOACOES, max_entries=MAX_ENTRADAS, show_spinner=False)
+def contar_doacoes(versao: int, filtros: dict) -> int:
+    """Doacao.contar(filtros)"""
+    return Doacao.contar(filtros)
+
+
+@_versionado
+@st.cache_data(ttl=TTL_DOACOES, max_entries=MAX_ENTRADAS, show_spinner=False)
+def estatisticas_doacoes(versao: int) -> dict:
+    """Doacao.estatisticas_geral()"""
+    return Doacao.estatisticas_geral()
+
+# ============================================================================
+# PAINÉIS
+# ============================================================================
+
+
+@_versionado
+@st.cache_data(ttl=TTL_PAINEL, max_entries=MAX_ENTRADAS, show_spinner=False)
+def metricas_dashboard(versao: int) -> dict:
+    """get_metricas_dashboard(concorrente=True), seções lentas voltam vazias"""
+    return get_metricas_dashboard(concorrente=True, timeout=5.0)
+
+
+@_versionado
+@st.cache_data(ttl=TTL_PAINEL, max_entries=MAX_ENTRADAS, show_spinner=False)
+def relatorio(versao: int, tipo: str, data_inicio, data_fim) -> dict:
+    """RelatorioService.gerar(tipo, data_inicio, data_fim)"""
+    return RelatorioService.gerar(tipo, data_inicio, data_fim)
+
+
+def arquivo_relatorio(tipo: str, data_inicio, data_fim, formato: str, tabela: str = None) -> Path:
+    """
+    ExportacaoService.exportar(...) gravado em disco; devolve o caminho.
+    
+    O arquivo fica em PASTA_EXPORTACOES com a versão dos dados no nome, então
+    é reaproveitado por (relatório, período, formato, tabela, versão) sem
+    guardar o conteúdo na memória. Versões antigas do mesmo relatório são
+    apagadas ao gerar uma nova; TTL_EXPORTACAO cobre alterações feitas fora
+    deste processo.
+    """
+    nome = ExportacaoService.nome_arquivo(tipo, data_inicio, data_fim, formato, tabela)
+    caminho = PASTA_EXPORTACOES / f"v{versao_dados()}_{nome}"
+    if caminho.exists() and time.time() - caminho.stat().st_mtime < TTL_EXPORTACAO:
+        return caminho
+    
+    PASTA_EXPORTACOES.mkdir(parents=True, exist_ok=True)
+    # Grava em um arquivo temporário e renomeia: quem baixa nunca vê um arquivo pela metade
+    with tempfile.NamedTemporaryFile(dir=PASTA_EXPORTACOES, suffix='.parcial', delete=False) as destino:
+        try:
+            ExportacaoService.exportar(destino, tipo, data_inicio, data_fim, formato, tabela)
+        except BaseException:
+            destino.close()
+            os.unlink(destino.name)
+            raise
+    os.replace(destino.name, caminho)
+    
+    for antigo in PASTA_EXPORTACOES.glob(f"v*_{nome}"):
+        if antigo != caminho:
+            antigo.unlink(missing_ok=True)
+    return caminho
@@ -308,6 +308,26 @@ def create_metric_card(label: str, value: str, delta: str = None):
     """
     return st.metric(label=label, value=value, delta=delta)
 
+def formatar_variacao(variacao: dict, metrica: str, percentual: bool = False,
+                      sufixo: str = " este mês"):
+    """
+    Texto do delta de um st.metric a partir de metricas['variacao_mes'].
+    
+    Args:
+        variacao (dict): métrica -> {'anterior', 'diferenca', 'percentual'}
+        metrica (str): chave da métrica (ex: "total_doadores")
+        percentual (bool): mostra "+8.5%" em vez de "+23 este mês"
+        sufixo (str): texto após a diferença absoluta
+    
+    Retorna None (card sem delta) se ainda não houver snapshot para comparar.
+    """
+    dados = (variacao or {}).get(metrica)
+    if not dados:
+        return None
+    if percentual and dados['percentual'] is not None:
+        return f"{dados['percentual']:+.1f}%"
+    return f"{dados['diferenca']:+,}".replace(",", ".") + sufixo
+
 def show_info_message(message: str, icon: str = "ℹ️"):
     """
     Exibe uma mensagem informativa padronizada.
@@ -0,0 +1,77 @@
+"""
+Importação de planilhas nas páginas (CSV/Excel)
+
+render_importador() mostra o upload, roda ImportacaoService.importar() e
+exibe o resumo com as linhas recusadas (e o CSV delas para corrigir e
+reenviar). É um st.fragment: escolher o arquivo e importar não reexecuta o
+resto da página.
+"""
+
+import sys
+from pathlib import Path
+
+import streamlit as st
+
+# Adicionar backend ao path
+backend_path = Path(__file__).parent.parent.parent / 'backend'
+if str(backend_path) not in sys.path:
+    sys.path.insert(0, str(backend_path))
+
+from services.importacao_service import ImportacaoService
+from utils.config import show_success_message, show_error_message, show_warning_message
+
+# Linhas com erro mostradas na tela (o CSV para download traz todas)
+MAX_ERROS_TELA = 200
+
+
+@st.fragment
+def render_importador(entidade: str, descricao: str):
+    """
+    Upload e importação de uma planilha da entidade.
+    
+    Args:
+        entidade: 'doador', 'beneficiario' ou 'doacao' (ver ImportacaoService.COLUNAS)
+        descricao: texto de ajuda com as colunas esperadas
+    """
+    st.markdown(descricao)
+    arquivo = st.file_uploader(
+        "Planilha (.csv ou .xlsx)",
+        type=['csv', 'xlsx'],
+        key=f"importar_{entidade}_arquivo"
+    )
+    
+    if arquivo is None or not st.button("📥 Importar", key=f"importar_{entidade}_botao", type="primary"):
+        return
+    
+    andamento = st.empty()
+    try:
+        resultado = ImportacaoService.importar(
+            entidade,
+            arquivo,
+            progresso=lambda lidas: andamento.caption(f"⏳ {lidas} linhas processadas...")
+        )
+    except ValueError as e:
+        andamento.empty()
+        show_error_message(str(e))
+        return
+    except Exception as e:
+        andamento.empty()
+        show_error_message(f"Erro ao importar: {str(e)}")
+        return
+    andamento.empty()
+    
+    erros = resultado['erros']
+    if resultado['inseridos']:
+        show_success_message(f"{resultado['inseridos']} de {resultado['total']} linhas importadas!")
+    if erros.empty:
+        return
+    
+    show_warning_message(f"{len(erros)} linhas não foram importadas")
+    st.dataframe(erros.head(MAX_ERROS_TELA), use_container_width=True, hide_index=True)
+    st.download_button(
+        "⬇️ Baixar linhas com erro (CSV)",
+        data=erros.to_csv(index=False).encode('utf-8-sig'),
+        file_name=f"erros_importacao_{entidade}.csv",
+        mime="text/csv",
+        key=f"importar_{entidade}_erros"
+    )
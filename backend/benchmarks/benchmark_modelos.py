@@ -0,0 +1,121 @@
+"""
+Benchmark de representação dos models
+
+Compara, para N linhas sintéticas da tabela Doacao (padrão 100 mil):
+1. Objetos sem __slots__ (como os models eram antes)
+2. Objetos com __slots__ (models atuais)
+3. Caminho antigo das páginas: dict -> objeto -> to_dict() -> DataFrame
+4. Caminho novo: tuplas do cursor -> DataFrame.from_records (fetch_dataframe)
+
+Não precisa de banco: as linhas são geradas no formato que o
+mysql-connector devolve (dicionários no cursor padrão, tuplas no cursor
+de fetch_dataframe).
+
+Uso:
+    python backend/benchmarks/benchmark_modelos.py [linhas]
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta
+from decimal import Decimal
+import pandas as pd
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.doacao import Doacao
+
+COLUNAS = [
+    'idDoacao', 'Doador_idDoador', 'CampanhaDoacao_idCampanhaDoacao',
+    'PontoColeta_idPontoColeta', 'VoluntarioColeta_idVoluntario',
+    'DataCriacao', 'DataEntrega', 'TipoDoacao', 'DescricaoItem',
+    'Quantidade', 'Unidade', 'Observacoes', 'Status'
+]
+
+ALIASES = [
+    'idDoacao', 'doador_id', 'campanha_id', 'ponto_coleta_id',
+    'voluntario_coleta_id', 'data_criacao', 'data_entrega', 'tipo_doacao',
+    'descricao_item', 'quantidade', 'unidade', 'observacoes', 'status'
+]
+
+TIPOS = ['Alimentos', 'Roupas', 'Higiene', 'Brinquedos', 'Outros']
+
+# Mesma classe, mas com __dict__ por instância (o formato anterior)
+DoacaoSemSlots = type('DoacaoSemSlots', (), {'__init__': Doacao.__init__})
+
+
+def gerar_tuplas(n: int) -> list:
+    """Linhas como o cursor de tuplas devolve"""
+    inicio = date(2024, 1, 1)
+    return [
+        (
+            i, i % 500 + 1, (i % 7 + 1) if i % 3 else None, i % 12 + 1, i % 40 + 1,
+            inicio + timedelta(days=i % 600), None, TIPOS[i % len(TIPOS)],
+            f"Item {i % 1000}", Decimal(i % 50 + 1), 'Unidades', None,
+            'Recebida' if i % 4 else 'Distribuída'
+        )
+        for i in range(n)
+    ]
+
+
+def medir(nome: str, funcao, resultados: list):
+    """
+    Executa funcao() duas vezes: uma cronometrada e outra sob tracemalloc
+    (o rastreamento deixa a execução bem mais lenta e distorceria o tempo).
+    """
+    inicio = time.perf_counter()
+    funcao()
+    duracao = time.perf_counter() - inicio
+    
+    tracemalloc.start()
+    valor = funcao()
+    retida, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    resultados.append((nome, duracao, pico, retida))
+    return valor
+
+
+def main(n: int = 100_000):
+    tuplas = gerar_tuplas(n)
+    dicts = [dict(zip(COLUNAS, row)) for row in tuplas]
+    
+    def objetos(cls):
+        return [
+            cls(
+                idDoacao=r['idDoacao'], doador_id=r['Doador_idDoador'],
+                campanha_id=r['CampanhaDoacao_idCampanhaDoacao'],
+                ponto_coleta_id=r['PontoColeta_idPontoColeta'],
+                voluntario_coleta_id=r['VoluntarioColeta_idVoluntario'],
+                data_criacao=r['DataCriacao'], data_entrega=r['DataEntrega'],
+                tipo_doacao=r['TipoDoacao'], descricao_item=r['DescricaoItem'],
+                quantidade=float(r['Quantidade']), unidade=r['Unidade'],
+                observacoes=r['Observacoes'], status=r['Status']
+            )
+            for r in dicts
+        ]
+    
+    def caminho_antigo():
+        return pd.DataFrame([Doacao.to_dict(d) for d in objetos(DoacaoSemSlots)])
+    
+    def caminho_novo():
+        df = pd.DataFrame.from_records(tuplas, columns=ALIASES)
+        df['quantidade'] = df['quantidade'].astype(float)
+        return df
+    
+    resultados = []
+    medir("objetos sem __slots__", lambda: objetos(DoacaoSemSlots), resultados)
+    medir("objetos com __slots__", lambda: objetos(Doacao), resultados)
+    medir("dict -> objeto -> to_dict -> DataFrame", caminho_antigo, resultados)
+    medir("tuplas -> DataFrame (fetch_dataframe)", caminho_novo, resultados)
+    
+    escala = 100_000 / n
+    print(f"\n=== BENCHMARK MODELOS ({n:,} linhas, valores por 100k linhas) ===\n")
+    print(f"{'Representação':<42}{'Tempo (ms)':>12}{'Pico (MB)':>12}{'Retida (MB)':>13}")
+    for nome, duracao, pico, retida in resultados:
+        print(f"{nome:<42}{duracao * 1000 * escala:>12.1f}"
+              f"{pico / 2**20 * escala:>12.1f}{retida / 2**20 * escala:>13.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
\ No newline at end of file
@@ -0,0 +1,58 @@
+"""
+Backfill das tabelas derivadas
+
+Recalcula do zero as tabelas mantidas de forma incremental pelos models.
+Rode depois da migration correspondente ou se suspeitar de divergência.
+
+Uso:
+    python backend/database/backfill.py              # todas
+    python backend/database/backfill.py resumo_mensal
+"""
+
+import os
+import sys
+import time
+import argparse
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.connection import DatabaseConnection
+from models.resumo_mensal_doacao import ResumoMensalDoacao
+from models.doador import Doador
+from models.arrecadacao_campanha import ArrecadacaoCampanha
+from models.chave_busca import ChaveBusca
+
+# nome -> (descrição, função que recebe a conexão e devolve linhas geradas)
+TAREFAS = {
+    'resumo_mensal': ("ResumoMensalDoacao (add_resumo_mensal_doacoes.sql)", ResumoMensalDoacao.reconstruir),
+    'primeira_doacao': ("Doador.PrimeiraDoacao (add_primeira_doacao_doador.sql)", Doador.reconstruir_primeira_doacao),
+    'arrecadacao_campanhas': ("ArrecadacaoCampanha (add_arrecadacao_campanhas.sql)", ArrecadacaoCampanha.reconstruir),
+    'chave_busca': ("ChaveBusca de Doador, Beneficiario e Voluntario (add_chave_busca.sql)", ChaveBusca.reconstruir)
+}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Recalcula tabelas derivadas")
+    parser.add_argument('tarefas', nargs='*',
+                        help=f"tarefas a executar: {', '.join(TAREFAS)} (padrão: todas)")
+    args = parser.parse_args(argv)
+    desconhecidas = [t for t in args.tarefas if t not in TAREFAS]
+    if desconhecidas:
+        parser.error(f"tarefa desconhecida: {', '.join(desconhecidas)}")
+    
+    print("\n=== BACKFILL ===\n")
+    falhas = 0
+    with DatabaseConnection() as db:
+        for nome in args.tarefas or list(TAREFAS):
+            descricao, funcao = TAREFAS[nome]
+            inicio = time.perf_counter()
+            try:
+                linhas = funcao(db)
+                print(f"✓ {descricao}: {linhas} linha(s) em {time.perf_counter() - inicio:.2f}s")
+            except Exception as e:
+                falhas += 1
+                print(f"✗ {descricao}: {e}")
+    return 1 if falhas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,159 @@
+"""
+Cache em memória para as leituras dos models
+
+Cada entrada pertence a um namespace (nome do model). As leituras usam o
+decorator @cached('Doador') e as escritas chamam query_cache.invalidate('Doador')
+depois de gravar, para que quem escreveu nunca leia um dado antigo.
+
+Camadas de cache acima desta (ex: app/utils/cache.py, no Streamlit) podem
+se inscrever com query_cache.ao_invalidar(callback) para saber das escritas.
+
+Configuração opcional no .env:
+- CACHE_TTL: segundos que uma entrada continua válida (padrão 60)
+- CACHE_MAX_ITEMS: máximo de entradas antes de descartar a menos usada (padrão 256)
+"""
+
+import copy
+import os
+import time
+import threading
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Callable, Dict, Hashable, List, Tuple
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+class QueryCache:
+    """Cache com TTL, limite de tamanho e descarte LRU"""
+
+    def __init__(self, ttl: float = 60.0, max_items: int = 256):
+        self.ttl = ttl
+        self.max_items = max_items
+        self._entries = OrderedDict()  # chave -> (instante de expiração, valor)
+        self._geracoes: Dict[str, int] = {}  # namespace -> nº de invalidações
+        self._limpezas = 0  # nº de clear()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._ouvintes: List[Callable[[str], None]] = []
+
+    def get_or_load(self, key: Tuple[Hashable, ...], loader: Callable[[], Any]) -> Any:
+        """
+        Retorna o valor em cache ou chama loader() e guarda o resultado.
+
+        O loader roda fora do lock. Se o namespace for invalidado durante a
+        carga (ou o cache for esvaziado), o valor (talvez anterior à escrita)
+        é devolvido mas não é guardado. Resultados vazios (None, [] ou
+        DataFrame vazio) também não são guardados: os fetch_* devolvem vazio
+        quando o banco falha.
+        """
+        agora = time.monotonic()
+        with self._lock:
+            entrada = self._entries.get(key)
+            if entrada is not None and entrada[0] > agora:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entrada[1]
+            self.misses += 1
+            geracao = (self._limpezas, self._geracoes.get(key[0], 0))
+
+        valor = loader()
+        if _vazio(valor):
+            return valor
+
+        with self._lock:
+            if (self._limpezas, self._geracoes.get(key[0], 0)) != geracao:
+                return valor
+            self._entries[key] = (time.monotonic() + self.ttl, valor)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_items:
+                self._entries.popitem(last=False)
+        return valor
+
+    def invalidate(self, namespace: str):
+        """Remove todas as entradas de um namespace (ex: 'Doador') e avisa os ouvintes"""
+        with self._lock:
+            self._geracoes[namespace] = self._geracoes.get(namespace, 0) + 1
+            for key in [k for k in self._entries if k[0] == namespace]:
+                del self._entries[key]
+            ouvintes = list(self._ouvintes)
+        for ouvinte in ouvintes:
+            ouvinte(namespace)
+
+    def ao_invalidar(self, callback: Callable[[str], None]):
+        """Registra callback(namespace), chamado a cada invalidate()"""
+        with self._lock:
+            if callback not in self._ouvintes:
+                self._ouvintes.append(callback)
+
+    def clear(self):
+        """Esvazia o cache e zera os contadores (cargas em andamento não são guardadas)"""
+        with self._lock:
+            self._limpezas += 1
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict:
+        """Contadores de acerto/erro e ocupação"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'items': len(self._entries),
+                'max_items': self.max_items
+            }
+
+
+query_cache = QueryCache(
+    ttl=float(os.getenv('CACHE_TTL', 60)),
+    max_items=int(os.getenv('CACHE_MAX_ITEMS', 256))
+)
+
+
+def _vazio(valor: Any) -> bool:
+    """None, lista vazia ou DataFrame vazio (não vão para o cache)"""
+    if valor is None:
+        return True
+    if isinstance(valor, list):
+        return not valor
+    return bool(getattr(valor, 'empty', False))  # pandas.DataFrame
+
+
+def _copiar(valor: Any) -> Any:
+    """
+    Copia o valor guardado no cache: listas, tuplas e dicionários
+    recursivamente, DataFrames com .copy() e os demais objetos (ex: models)
+    com copy.copy, para que o chamador não altere o conteúdo guardado
+    """
+    if isinstance(valor, list):
+        return [_copiar(item) for item in valor]
+    if isinstance(valor, tuple):
+        return tuple(_copiar(item) for item in valor)
+    if isinstance(valor, dict):
+        return {chave: _copiar(item) for chave, item in valor.items()}
+    if hasattr(valor, 'to_records'):  # pandas.DataFrame
+        return valor.copy()
+    return copy.copy(valor)
+
+
+def cached(namespace: str):
+    """
+    Decorator para métodos de leitura dos models.
+
+    A chave é (namespace, nome da função, argumentos). Listas, DataFrames e
+    dicionários são devolvidos como cópia para que o chamador não altere o
+    conteúdo guardado.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (namespace, func.__name__, args, tuple(sorted(kwargs.items())))
+            valor = query_cache.get_or_load(key, lambda: func(*args, **kwargs))
+            return _copiar(valor)
+        return wrapper
+    return decorator
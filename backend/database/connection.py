@@ -1,103 +1,438 @@
 """
 Módulo de Conexão com MySQL
+
+As conexões vêm de um pool compartilhado pelo processo (ver ConnectionPool).
+Configuração opcional no .env:
+- DB_POOL_SIZE: máximo de conexões abertas ao mesmo tempo (padrão 5)
+- DB_POOL_TIMEOUT: segundos esperando uma conexão livre (padrão 10)
+- DB_POOL_MAX_IDLE: segundos que uma conexão pode ficar ociosa (padrão 300)
+- DB_POOL_PING_AFTER: ociosidade mínima para testar a conexão com ping (padrão 30)
+- DB_POOL_RESET_SESSION: reseta a sessão ao devolver a conexão (padrão 1)
 """
 
 import os
+import sys
+import time
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
 import mysql.connector
 from mysql.connector import Error
-from typing import List, Dict, Optional, Tuple
+from mysql.connector.errors import PoolError
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
 from dotenv import load_dotenv
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.instrumentation import instrumentation
+
 load_dotenv()
 
+logger = logging.getLogger('somos_darua.db')
+
+
+def _db_config() -> Dict:
+    """Parâmetros de conexão lidos do .env"""
+    return {
+        'host': os.getenv('DB_HOST', 'localhost'),
+        'user': os.getenv('DB_USER', 'root'),
+        'password': os.getenv('DB_PASSWORD', ''),
+        'database': os.getenv('DB_NAME', 'somos_darua'),
+        'port': int(os.getenv('DB_PORT', 3306)),
+        'charset': 'utf8mb4'
+    }
+
+
+class ConnectionPool:
+    """
+    Pool de conexões MySQL com tamanho limitado.
+    
+    - acquire() reaproveita a conexão ociosa mais recente ou abre uma nova,
+      esperando até `timeout` segundos quando todas estão em uso
+    - conexões ociosas há mais de `ping_after` segundos são testadas com ping
+    - conexões ociosas há mais de `max_idle` segundos são fechadas
+    - release() desfaz transações pendentes e reseta a sessão
+    """
+    
+    def __init__(self, config: Dict, size: int = 5, timeout: float = 10.0,
+                 max_idle: float = 300.0, ping_after: float = 30.0,
+                 reset_session: bool = True):
+        self.config = config
+        self.size = size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.ping_after = ping_after
+        self.reset_session = reset_session
+        self._idle = deque()  # (conexão, instante em que foi devolvida)
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+    
+    def acquire(self):
+        """Retorna uma conexão saudável do pool (ou uma nova)"""
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PoolError(f"Pool esgotado: {self.size} conexões em uso há mais de {self.timeout}s")
+        
+        try:
+            while True:
+                with self._lock:
+                    item = self._idle.pop() if self._idle else None
+                
+                if item is None:
+                    return mysql.connector.connect(**self.config)
+                
+                conn, devolvida_em = item
+                ociosa = time.monotonic() - devolvida_em
+                
+                if ociosa > self.max_idle:
+                    self._close(conn)
+                elif ociosa < self.ping_after or self._is_healthy(conn):
+                    return conn
+                else:
+                    self._close(conn)
+        except Exception:
+            self._slots.release()
+            raise
+    
+    def release(self, conn):
+        """Devolve a conexão ao pool, limpando o estado da sessão"""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            if self.reset_session:
+                conn.reset_session()
+            with self._lock:
+                self._idle.append((conn, time.monotonic()))
+        except Error:
+            self._close(conn)
+        finally:
+            self._slots.release()
+        
+        self._evict_idle()
+    
+    def close_all(self):
+        """Fecha todas as conexões ociosas"""
+        with self._lock:
+            ociosas = list(self._idle)
+            self._idle.clear()
+        for conn, _ in ociosas:
+            self._close(conn)
+    
+    def stats(self) -> Dict:
+        """Estado atual do pool"""
+        with self._lock:
+            ociosas = len(self._idle)
+        return {'size': self.size, 'idle': ociosas}
+    
+    def _evict_idle(self):
+        """Fecha conexões ociosas há mais de max_idle (as mais antigas ficam à esquerda)"""
+        expiradas = []
+        limite = time.monotonic() - self.max_idle
+        with self._lock:
+            while self._idle and self._idle[0][1] < limite:
+                expiradas.append(self._idle.popleft()[0])
+        for conn in expiradas:
+            self._close(conn)
+    
+    @staticmethod
+    def _is_healthy(conn) -> bool:
+        try:
+            conn.ping(reconnect=False)
+            return True
+        except Error:
+            return False
+    
+    @staticmethod
+    def _close(conn):
+        try:
+            conn.close()
+        except Error:
+            pass
+
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """Pool único do processo, criado na primeira chamada"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    _db_config(),
+                    size=int(os.getenv('DB_POOL_SIZE', 5)),
+                    timeout=float(os.getenv('DB_POOL_TIMEOUT', 10)),
+                    max_idle=float(os.getenv('DB_POOL_MAX_IDLE', 300)),
+                    ping_after=float(os.getenv('DB_POOL_PING_AFTER', 30)),
+                    reset_session=os.getenv('DB_POOL_RESET_SESSION', '1') not in ('0', 'false', 'False')
+                )
+    return _pool
+
 
 class DatabaseConnection:
-    """Gerenciador de conexões com MySQL"""
+    """Gerenciador de conexões com MySQL (emprestadas do pool do processo)"""
     
     def __init__(self):
         self.connection = None
         self.cursor = None
-        self.config = {
-            'host': os.getenv('DB_HOST', 'localhost'),
-            'user': os.getenv('DB_USER', 'root'),
-            'password': os.getenv('DB_PASSWORD', ''),
-            'database': os.getenv('DB_NAME', 'somos_darua'),
-            'port': int(os.getenv('DB_PORT', 3306)),
-            'charset': 'utf8mb4'
-        }
+        self.config = _db_config()
+        self._tx_depth = 0
+        self._after_commit: List[Callable[[], None]] = []
     
     def __enter__(self):
         self.connect()
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
-        if self.connection and self.connection.is_connected():
-            if exc_type is not None:
+        if self.connection and exc_type is not None:
+            try:
                 self.connection.rollback()
+            except Error:
+                pass
         self.disconnect()
         return False
     
     def connect(self) -> bool:
         try:
-            self.connection = mysql.connector.connect(**self.config)
-            
-            if self.connection.is_connected():
+            self.connection = get_pool().acquire()
+            try:
                 self.cursor = self.connection.cursor(dictionary=True)
-                db_info = self.connection.get_server_info()
-                print(f"✓ Conectado ao MySQL versão {db_info}")
-                return True
-            else:
-                print("✗ Falha ao conectar")
-                return False
+            except Error:
+                get_pool().release(self.connection)
+                self.connection = None
+                raise
+            return True
         except Error as e:
-            print(f"✗ Erro ao conectar: {e}")
+            logger.error("Erro ao conectar: %s", e)
             return False
     
     def disconnect(self):
-        if self.connection and self.connection.is_connected():
+        if self.connection:
             if self.cursor:
-                self.cursor.close()
-            self.connection.close()
-            print("✓ Conexão fechada")
+                try:
+                    self.cursor.close()
+                except Error:
+                    pass
+            get_pool().release(self.connection)
+            self.connection = None
+            self.cursor = None
+    
+    @property
+    def in_transaction(self) -> bool:
+        """True dentro de um bloco transaction()"""
+        return self._tx_depth > 0
+    
+    @contextmanager
+    def transaction(self):
+        """
+        Unidade de trabalho: tudo dentro do bloco é confirmado com UM commit.
+        
+        - execute_query/execute/executemany não fazem commit dentro do bloco
+        - qualquer erro propaga e desfaz o bloco inteiro
+        - blocos aninhados participam da transação mais externa
+        
+        Exemplo (vários models, uma conexão, um commit):
+            with DatabaseConnection() as db:
+                with db.transaction():
+                    doador.save(db=db)
+                    doacao.doador_id = doador.idDoador
+                    doacao.save(db=db)
+                    Doacao.distribuir(doacao.idDoacao, [1, 2], db=db)
+        """
+        if self._tx_depth == 0 and not self.connection.in_transaction:
+            self.connection.start_transaction()
+        self._tx_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._tx_depth -= 1
+            if self._tx_depth == 0:
+                self._after_commit.clear()
+                self.connection.rollback()
+            raise
+        self._tx_depth -= 1
+        if self._tx_depth == 0:
+            self.connection.commit()
+            callbacks, self._after_commit = self._after_commit, []
+            for callback in callbacks:
+                callback()
+    
+    def after_commit(self, callback: Callable[[], None]):
+        """Executa callback após o commit da transação (ou na hora, fora dela)"""
+        if self.in_transaction:
+            self._after_commit.append(callback)
+        else:
+            callback()
+    
+    def execute(self, query: str, params: Optional[Tuple] = None) -> int:
+        """
+        Executa um comando e propaga erros.
+        
+        Fora de transaction() confirma na hora; dentro, o commit fica para o fim do bloco.
+        
+        Returns:
+            int: linhas afetadas
+        """
+        inicio = time.perf_counter()
+        self.cursor.execute(query, params or ())
+        if not self.in_transaction:
+            self.connection.commit()
+        instrumentation.record(query, time.perf_counter() - inicio, self.cursor.rowcount)
+        return self.cursor.rowcount
+    
+    def executemany(self, query: str, seq_params: Sequence[Tuple]) -> int:
+        """
+        Executa o mesmo comando para vários conjuntos de parâmetros.
+        
+        INSERTs simples viram um único INSERT multi-linha no conector.
+        Mesmas regras de commit e erro de execute().
+        """
+        if not seq_params:
+            return 0
+        inicio = time.perf_counter()
+        self.cursor.executemany(query, seq_params)
+        if not self.in_transaction:
+            self.connection.commit()
+        instrumentation.record(query, time.perf_counter() - inicio, self.cursor.rowcount)
+        return self.cursor.rowcount
+    
+    def fetch_chunks(self, query: str, params: Optional[Tuple] = None,
+                     chunk_size: int = 500) -> Iterator[List[Dict]]:
+        """
+        Percorre o resultado em listas de até chunk_size linhas (propaga erros).
+        
+        Usa um cursor próprio sem buffer: as linhas são lidas do servidor à
+        medida que o chamador avança, então a memória fica limitada a um bloco
+        independentemente do tamanho do resultado. Enquanto o iterador não
+        terminar, a conexão não pode executar outras queries.
+        """
+        cursor = self.connection.cursor(dictionary=True, buffered=False)
+        inicio = time.perf_counter()
+        total = 0
+        try:
+            cursor.execute(query, params or ())
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                total += len(rows)
+                yield rows
+        finally:
+            instrumentation.record(query, time.perf_counter() - inicio, total)
+            try:
+                # Descarta o restante se o chamador parou antes do fim
+                while cursor.fetchmany(chunk_size):
+                    pass
+            except Error:
+                pass
+            cursor.close()
+    
+    def fetch_iter(self, query: str, params: Optional[Tuple] = None,
+                   chunk_size: int = 500) -> Iterator[Dict]:
+        """Como fetch_chunks(), mas entrega uma linha por vez"""
+        for rows in self.fetch_chunks(query, params, chunk_size):
+            yield from rows
+    
+    def fetch_dataframe(self, query: str, params: Optional[Tuple] = None,
+                        chunk_size: int = 5000):
+        """
+        Carrega o resultado direto em um pandas.DataFrame (propaga erros).
+        
+        As linhas vêm como tuplas de um cursor sem buffer e viram colunas sem
+        passar por dicionários nem objetos de model, o que corta boa parte da
+        memória e do tempo em listagens grandes. Os nomes das colunas são os
+        do SELECT, então use aliases para definir o formato final.
+        """
+        import pandas as pd  # só quem monta DataFrames precisa do pandas
+        
+        cursor = self.connection.cursor(buffered=False)
+        inicio = time.perf_counter()
+        rows: List[Tuple] = []
+        try:
+            cursor.execute(query, params or ())
+            while True:
+                bloco = cursor.fetchmany(chunk_size)
+                if not bloco:
+                    break
+                rows.extend(bloco)
+            colunas = list(cursor.column_names)
+        finally:
+            instrumentation.record(query, time.perf_counter() - inicio, len(rows))
+            cursor.close()
+        return pd.DataFrame.from_records(rows, columns=colunas)
     
     def execute_query(self, query: str, params: Optional[Tuple] = None) -> bool:
         try:
+            inicio = time.perf_counter()
             self.cursor.execute(query, params or ())
-            self.connection.commit()
-            print(f"✓ Query executada ({self.cursor.rowcount} linhas afetadas)")
+            if not self.in_transaction:
+                self.connection.commit()
+            instrumentation.record(query, time.perf_counter() - inicio, self.cursor.rowcount)
             return True
         except Error as e:
-            print(f"✗ Erro ao executar query: {e}")
+            if self.in_transaction:
+                raise
+            logger.error("Erro ao executar query: %s", e)
             self.connection.rollback()
             return False
     
     def fetch_all(self, query: str, params: Optional[Tuple] = None) -> List[Dict]:
         try:
+            inicio = time.perf_counter()
             self.cursor.execute(query, params or ())
             results = self.cursor.fetchall()
-            print(f"✓ Encontrados {len(results)} resultados")
+            instrumentation.record(query, time.perf_counter() - inicio, len(results))
             return results
         except Error as e:
-            print(f"✗ Erro ao buscar dados: {e}")
+            if self.in_transaction:
+                raise
+            logger.error("Erro ao buscar dados: %s", e)
             return []
     
     def fetch_one(self, query: str, params: Optional[Tuple] = None) -> Optional[Dict]:
         try:
+            inicio = time.perf_counter()
             self.cursor.execute(query, params or ())
             result = self.cursor.fetchone()
-            if result:
-                print("✓ Resultado encontrado")
-            else:
-                print("ℹ Nenhum resultado encontrado")
+            instrumentation.record(query, time.perf_counter() - inicio, 1 if result else 0)
             return result
         except Error as e:
-            print(f"✗ Erro ao buscar dados: {e}")
+            if self.in_transaction:
+                raise
+            logger.error("Erro ao buscar dados: %s", e)
             return None
     
     def get_last_insert_id(self) -> Optional[int]:
         return self.cursor.lastrowid if self.cursor else None
 
 
+@contextmanager
+def usar_conexao(db: Optional[DatabaseConnection] = None):
+    """
+    Reaproveita a conexão recebida ou abre uma própria.
+    
+    Permite que métodos dos models aceitem db=None (conexão própria, commit
+    imediato) ou uma conexão de quem está montando uma transação maior.
+    """
+    if db is not None:
+        yield db
+    else:
+        with DatabaseConnection() as nova:
+            yield nova
+
+
+def escapar_like(texto: str) -> str:
+    """
+    Escapa os curingas de LIKE (%, _ e a barra) para buscar o texto literal.
+    
+    Ex: f"{escapar_like(prefixo)}%" faz uma busca por prefixo que o MySQL
+    resolve como intervalo no índice da coluna.
+    """
+    return texto.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
 def test_connection():
     print("\n" + "="*60)
     print("TESTE DE CONEXÃO MySQL")
@@ -110,6 +445,8 @@ def test_connection():
             if result:
                 print(f"✓ Banco atual: {result['db_name']}")
                 print(f"✓ Versão MySQL: {result['version']}")
+                print(f"✓ Pool: {get_pool().stats()}")
+                print(f"✓ Queries registradas: {instrumentation.summary()}")
                 print("\n✅ CONEXÃO OK!\n")
                 return True
             else:
@@ -0,0 +1,148 @@
+"""
+Instrumentação das queries executadas por DatabaseConnection
+
+Cada query amostrada vira um registro com:
+- fingerprint: texto normalizado (literais viram ?, listas IN viram (...))
+- duration_ms, rows e caller (model/método que disparou a query)
+
+Os registros ficam em um buffer circular em memória e são repassados aos
+hooks registrados com add_hook(). Queries acima do limite de lentidão são
+sempre registradas e logadas em 'somos_darua.queries', mesmo fora da amostra.
+
+Configuração opcional no .env:
+- DB_QUERY_SAMPLE_RATE: fração das queries registradas, de 0 a 1 (padrão 1)
+- DB_QUERY_BUFFER: tamanho do buffer circular (padrão 1000)
+- DB_SLOW_QUERY_MS: limite de query lenta em ms, 0 desativa (padrão 500)
+"""
+
+import os
+import re
+import sys
+import time
+import random
+import logging
+import threading
+from collections import deque
+from typing import Callable, Dict, List, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger('somos_darua.queries')
+
+_RE_STRING = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+_RE_NUMERO = re.compile(r"\b\d+(?:\.\d+)?\b")
+_RE_LISTA_IN = re.compile(r"\bIN\s*\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)", re.IGNORECASE)
+_RE_ESPACOS = re.compile(r"\s+")
+
+
+def fingerprint(query: str) -> str:
+    """Normaliza a query para agrupar execuções com parâmetros diferentes"""
+    texto = _RE_STRING.sub("?", query)
+    texto = _RE_NUMERO.sub("?", texto)
+    texto = _RE_LISTA_IN.sub("IN (...)", texto)
+    return _RE_ESPACOS.sub(" ", texto).strip()
+
+
+def _caller() -> str:
+    """Primeiro frame fora de backend/database (normalmente um model)"""
+    frame = sys._getframe(2)
+    pasta_database = os.path.dirname(os.path.abspath(__file__))
+    while frame is not None:
+        arquivo = frame.f_code.co_filename
+        if not arquivo.startswith(pasta_database) and 'contextlib' not in arquivo:
+            modulo = os.path.splitext(os.path.basename(arquivo))[0]
+            return f"{modulo}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return "desconhecido"
+
+
+class QueryInstrumentation:
+    """Coleta amostras de queries em um buffer circular e repassa aos hooks"""
+    
+    def __init__(self, sample_rate: float = 1.0, buffer_size: int = 1000,
+                 slow_ms: float = 500.0):
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self._buffer = deque(maxlen=buffer_size)
+        self._hooks: List[Callable[[Dict], None]] = []
+        self._lock = threading.Lock()
+    
+    def add_hook(self, hook: Callable[[Dict], None]):
+        """Registra uma função chamada com cada registro amostrado"""
+        self._hooks.append(hook)
+    
+    def remove_hook(self, hook: Callable[[Dict], None]):
+        if hook in self._hooks:
+            self._hooks.remove(hook)
+    
+    def record(self, query: str, duration: float, rows: int):
+        """Registra uma execução (duration em segundos)"""
+        duration_ms = duration * 1000
+        lenta = bool(self.slow_ms) and duration_ms >= self.slow_ms
+        if not lenta and (self.sample_rate <= 0 or random.random() >= self.sample_rate):
+            return
+        
+        registro = {
+            'timestamp': time.time(),
+            'fingerprint': fingerprint(query),
+            'duration_ms': round(duration_ms, 3),
+            'rows': rows,
+            'caller': _caller(),
+            'slow': lenta
+        }
+        
+        with self._lock:
+            self._buffer.append(registro)
+        
+        if lenta:
+            logger.warning(
+                "Query lenta (%.1f ms, %s linhas) em %s: %s",
+                duration_ms, rows, registro['caller'], registro['fingerprint']
+            )
+        
+        for hook in list(self._hooks):
+            try:
+                hook(registro)
+            except Exception:
+                logger.exception("Erro no hook de instrumentação")
+    
+    def recent(self, limit: Optional[int] = None) -> List[Dict]:
+        """Registros mais recentes primeiro"""
+        with self._lock:
+            registros = list(self._buffer)
+        registros.reverse()
+        return registros[:limit] if limit else registros
+    
+    def summary(self) -> List[Dict]:
+        """Agrega o buffer por fingerprint, do maior tempo total para o menor"""
+        grupos: Dict[str, Dict] = {}
+        for r in self.recent():
+            g = grupos.setdefault(r['fingerprint'], {
+                'fingerprint': r['fingerprint'], 'count': 0, 'total_ms': 0.0,
+                'max_ms': 0.0, 'rows': 0, 'callers': set()
+            })
+            g['count'] += 1
+            g['total_ms'] += r['duration_ms']
+            g['max_ms'] = max(g['max_ms'], r['duration_ms'])
+            g['rows'] += max(r['rows'], 0)
+            g['callers'].add(r['caller'])
+        
+        resumo = []
+        for g in grupos.values():
+            g['avg_ms'] = round(g['total_ms'] / g['count'], 3)
+            g['total_ms'] = round(g['total_ms'], 3)
+            g['callers'] = sorted(g['callers'])
+            resumo.append(g)
+        return sorted(resumo, key=lambda g: g['total_ms'], reverse=True)
+    
+    def clear(self):
+        with self._lock:
+            self._buffer.clear()
+
+
+instrumentation = QueryInstrumentation(
+    sample_rate=float(os.getenv('DB_QUERY_SAMPLE_RATE', 1.0)),
+    buffer_size=int(os.getenv('DB_QUERY_BUFFER', 1000)),
+    slow_ms=float(os.getenv('DB_SLOW_QUERY_MS', 500))
+)
@@ -0,0 +1,107 @@
+"""
+Modelo ArrecadacaoCampanha - Quanto cada campanha arrecadou, por unidade
+
+Uma linha por (Campanha_id, Unidade) com:
+- TotalDoacoes: doações vinculadas à campanha nessa unidade
+- QuantidadeTotal: soma de Doacao.Quantidade
+
+O progresso da campanha usa a linha cuja Unidade é o TipoMeta da campanha
+(ver CampanhaDoacao._SELECT). Mantida de forma incremental pelo model Doacao,
+como ResumoMensalDoacao; reconstruir() refaz tudo a partir de Doacao
+(backfill: python backend/database/backfill.py arrecadacao_campanhas).
+
+Requer a migration add_arrecadacao_campanhas.sql.
+"""
+
+from typing import Optional, List, Dict, Tuple, Iterable
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.connection import DatabaseConnection, usar_conexao
+
+# (Campanha_id, Unidade)
+Chave = Tuple[int, str]
+
+
+class ArrecadacaoCampanha:
+    """Acesso e manutenção da tabela ArrecadacaoCampanha"""
+    
+    @staticmethod
+    def deltas(linhas: Iterable[Dict], sinal: int = 1,
+               acumulado: Optional[Dict[Chave, List]] = None) -> Dict[Chave, List]:
+        """
+        Soma a contribuição de linhas de Doacao (ResumoMensalDoacao.COLUNAS_DOACAO)
+        em um dicionário chave -> [doações, quantidade]. sinal=-1 subtrai.
+        
+        Doações sem campanha não entram.
+        """
+        acumulado = {} if acumulado is None else acumulado
+        for row in linhas:
+            campanha_id = row.get('CampanhaDoacao_idCampanhaDoacao')
+            if not campanha_id:
+                continue
+            delta = acumulado.setdefault((campanha_id, row.get('Unidade') or 'Unidades'), [0, 0.0])
+            delta[0] += sinal
+            delta[1] += sinal * float(row.get('Quantidade') or 0)
+        return acumulado
+    
+    @staticmethod
+    def aplicar(db: DatabaseConnection, deltas: Dict[Chave, List]) -> int:
+        """
+        Soma os deltas na tabela (upsert em lote).
+        
+        Deve rodar na mesma transação da escrita em Doacao que os originou.
+        """
+        linhas = [
+            (campanha_id, unidade, doacoes, round(quantidade, 2))
+            for (campanha_id, unidade), (doacoes, quantidade) in deltas.items()
+            if doacoes or round(quantidade, 2)
+        ]
+        return db.executemany(
+            """
+            INSERT INTO ArrecadacaoCampanha (Campanha_id, Unidade, TotalDoacoes, QuantidadeTotal)
+            VALUES (%s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+                TotalDoacoes = TotalDoacoes + VALUES(TotalDoacoes),
+                QuantidadeTotal = QuantidadeTotal + VALUES(QuantidadeTotal)
+            """,
+            linhas
+        )
+    
+    @staticmethod
+    def reconstruir(db: Optional[DatabaseConnection] = None) -> int:
+        """
+        Backfill: recalcula todas as campanhas com um único GROUP BY em Doacao.
+        
+        Returns:
+            int: quantidade de linhas geradas
+        """
+        with usar_conexao(db) as db:
+            with db.transaction():
+                db.execute("DELETE FROM ArrecadacaoCampanha")
+                return db.execute("""
+                    INSERT INTO ArrecadacaoCampanha
+                        (Campanha_id, Unidade, TotalDoacoes, QuantidadeTotal)
+                    SELECT
+                        CampanhaDoacao_idCampanhaDoacao,
+                        COALESCE(Unidade, 'Unidades'),
+                        COUNT(*),
+                        COALESCE(SUM(Quantidade), 0)
+                    FROM Doacao
+                    WHERE CampanhaDoacao_idCampanhaDoacao IS NOT NULL
+                    GROUP BY 1, 2
+                """)
+    
+    @staticmethod
+    def por_campanha(campanha_id: int, db: Optional[DatabaseConnection] = None) -> Dict[str, float]:
+        """Arrecadado de uma campanha em cada unidade (unidade -> quantidade)"""
+        query = """
+            SELECT Unidade, QuantidadeTotal
+            FROM ArrecadacaoCampanha
+            WHERE Campanha_id = %s AND TotalDoacoes > 0
+            ORDER BY QuantidadeTotal DESC
+        """
+        with usar_conexao(db) as db:
+            results = db.fetch_all(query, (campanha_id,))
+        return {row['Unidade']: float(row['QuantidadeTotal']) for row in results}
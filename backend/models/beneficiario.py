@@ -5,14 +5,20 @@ Modelo Beneficiario - Pessoas que recebem doações
 from typing import Optional, List, Dict
 import sys
 import os
+import pandas as pd
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from database.connection import DatabaseConnection
+from database.connection import DatabaseConnection, usar_conexao, escapar_like
+from database.cache import cached, query_cache
+from models.chave_busca import ChaveBusca
 
 
 class Beneficiario:
     """Representa um beneficiário no sistema"""
     
+    # Sem __dict__ por instância: listas grandes ocupam bem menos memória
+    __slots__ = ('idBeneficiario', 'nome', 'idade', 'genero', 'descricao')
+    
     def __init__(self, nome: str, idade: Optional[int] = None,
                  genero: Optional[str] = None, descricao: Optional[str] = None,
                  idBeneficiario: Optional[int] = None):
@@ -35,7 +41,31 @@ class Beneficiario:
             return False, "Gênero deve ser M, F, O ou N"
         return True, ""
     
-    def save(self) -> bool:
+    @staticmethod
+    def validar_dataframe(df: pd.DataFrame) -> pd.Series:
+        """
+        Regras de validate() aplicadas a um DataFrame inteiro de uma vez.
+        
+        Args:
+            df: colunas nome, idade (numérica, NaN = não informada) e genero
+        
+        Returns:
+            pd.Series: mensagem de erro de cada linha ("" = válida), a mesma que
+            validate() daria
+        """
+        nome = df['nome'].fillna('').astype(str).str.strip()
+        genero = df['genero'].fillna('').astype(str).str.strip()
+        regras = [
+            (nome == '', "Nome é obrigatório"),
+            (df['idade'].notna() & (df['idade'] < 0), "Idade não pode ser negativa"),
+            ((genero != '') & ~genero.isin(['M', 'F', 'O', 'N']), "Gênero deve ser M, F, O ou N"),
+        ]
+        erros = pd.Series('', index=df.index, dtype=object)
+        for falhou, mensagem in reversed(regras):  # a primeira regra que falha prevalece
+            erros[falhou] = mensagem
+        return erros
+    
+    def save(self, db: Optional[DatabaseConnection] = None) -> bool:
         """Salva novo beneficiário"""
         valido, erro = self.validate()
         if not valido:
@@ -43,18 +73,19 @@ class Beneficiario:
             return False
         
         query = """
-            INSERT INTO Beneficiario (Nome, Idade, Genero, Descricao)
-            VALUES (%s, %s, %s, %s)
+            INSERT INTO Beneficiario (Nome, Idade, Genero, Descricao, ChaveBusca)
+            VALUES (%s, %s, %s, %s, %s)
         """
-        params = (self.nome, self.idade, self.genero, self.descricao)
+        params = (self.nome, self.idade, self.genero, self.descricao, ChaveBusca.gerar(self.nome))
         
-        with DatabaseConnection() as db:
+        with usar_conexao(db) as db:
             if db.execute_query(query, params):
                 self.idBeneficiario = db.get_last_insert_id()
+                db.after_commit(lambda: query_cache.invalidate('Beneficiario'))
                 return True
         return False
     
-    def update(self) -> bool:
+    def update(self, db: Optional[DatabaseConnection] = None) -> bool:
         """Atualiza beneficiário existente"""
         if not self.idBeneficiario:
             print("✗ Beneficiário não possui ID")
@@ -66,23 +97,42 @@ class Beneficiario:
             return False
         
         query = """
-            UPDATE Beneficiario SET Nome = %s, Idade = %s, Genero = %s, Descricao = %s
+            UPDATE Beneficiario SET Nome = %s, Idade = %s, Genero = %s, Descricao = %s,
+                                    ChaveBusca = %s
             WHERE idBeneficiario = %s
         """
-        params = (self.nome, self.idade, self.genero, self.descricao, self.idBeneficiario)
+        params = (self.nome, self.idade, self.genero, self.descricao,
+                  ChaveBusca.gerar(self.nome), self.idBeneficiario)
         
-        with DatabaseConnection() as db:
-            return db.execute_query(query, params)
+        with usar_conexao(db) as db:
+            sucesso = db.execute_query(query, params)
+            if sucesso:
+                db.after_commit(lambda: query_cache.invalidate('Beneficiario'))
+        return sucesso
     
-    def delete(self) -> bool:
+    def delete(self, db: Optional[DatabaseConnection] = None) -> bool:
         """Remove beneficiário"""
         if not self.idBeneficiario:
             print("✗ Beneficiário não possui ID")
             return False
         
         query = "DELETE FROM Beneficiario WHERE idBeneficiario = %s"
-        with DatabaseConnection() as db:
-            return db.execute_query(query, (self.idBeneficiario,))
+        with usar_conexao(db) as db:
+            sucesso = db.execute_query(query, (self.idBeneficiario,))
+            if sucesso:
+                db.after_commit(lambda: query_cache.invalidate('Beneficiario'))
+        return sucesso
+    
+    @staticmethod
+    def _from_row(row: Dict) -> 'Beneficiario':
+        """Monta um Beneficiario a partir de uma linha de SELECT * FROM Beneficiario"""
+        return Beneficiario(
+            idBeneficiario=row['idBeneficiario'],
+            nome=row['Nome'],
+            idade=row['Idade'],
+            genero=row['Genero'],
+            descricao=row['Descricao']
+        )
     
     @staticmethod
     def get_by_id(beneficiario_id: int) -> Optional['Beneficiario']:
@@ -91,31 +141,55 @@ class Beneficiario:
         with DatabaseConnection() as db:
             result = db.fetch_one(query, (beneficiario_id,))
             if result:
-                return Beneficiario(
-                    idBeneficiario=result['idBeneficiario'],
-                    nome=result['Nome'],
-                    idade=result['Idade'],
-                    genero=result['Genero'],
-                    descricao=result['Descricao']
-                )
+                return Beneficiario._from_row(result)
         return None
     
     @staticmethod
+    @cached('Beneficiario')
     def get_all() -> List['Beneficiario']:
         """Retorna todos os beneficiários"""
         query = "SELECT * FROM Beneficiario ORDER BY Nome"
         with DatabaseConnection() as db:
             results = db.fetch_all(query)
-            return [
-                Beneficiario(
-                    idBeneficiario=row['idBeneficiario'],
-                    nome=row['Nome'],
-                    idade=row['Idade'],
-                    genero=row['Genero'],
-                    descricao=row['Descricao']
-                )
-                for row in results
-            ]
+            return [Beneficiario._from_row(row) for row in results]
+    
+    @staticmethod
+    def buscar_por_prefixo(prefixo: str = "", limite: int = 20) -> List[Dict]:
+        """
+        Primeiros beneficiários cujo nome começa com o prefixo, em ordem alfabética.
+        
+        Usa o índice idx_nome_beneficiario (LIKE 'prefixo%' + ORDER BY Nome + LIMIT):
+        o custo não cresce com o tamanho da tabela. Prefixo vazio traz os
+        primeiros nomes.
+        
+        Returns:
+            List[Dict]: no máximo `limite` itens {'id', 'nome'}
+        """
+        query = """
+            SELECT idBeneficiario AS id, Nome AS nome
+            FROM Beneficiario
+            WHERE Nome LIKE %s
+            ORDER BY Nome
+            LIMIT %s
+        """
+        with DatabaseConnection() as db:
+            return db.fetch_all(query, (f"{escapar_like(prefixo.strip())}%", int(limite)))
+    
+    @staticmethod
+    @cached('Beneficiario')
+    def get_dataframe() -> pd.DataFrame:
+        """
+        Todos os beneficiários direto em um DataFrame, com as colunas de to_dict().
+        
+        Não cria objetos Beneficiario: prefira este método para tabelas e gráficos.
+        """
+        query = """
+            SELECT idBeneficiario, Nome AS nome, Idade AS idade,
+                   Genero AS genero, Descricao AS descricao
+            FROM Beneficiario ORDER BY Nome
+        """
+        with DatabaseConnection() as db:
+            return db.fetch_dataframe(query)
     
     def to_dict(self) -> Dict:
         """Converte para dicionário"""
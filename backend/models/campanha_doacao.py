@@ -1,19 +1,28 @@
 """
 Modelo CampanhaDoacao - Campanhas organizadas
+
+O arrecadado não é mais digitado: vem de ArrecadacaoCampanha, a soma das
+doações vinculadas à campanha na unidade da meta (TipoMeta).
 """
 
 from typing import Optional, List, Dict
 from datetime import date
 import sys
 import os
+import pandas as pd
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from database.connection import DatabaseConnection
+from database.connection import DatabaseConnection, usar_conexao
+from database.cache import cached, query_cache
 
 
 class CampanhaDoacao:
     """Representa uma campanha de doação no sistema"""
     
+    # Sem __dict__ por instância: listas grandes ocupam bem menos memória
+    __slots__ = ('idCampanhaDoacao', 'nome', 'data_inicio', 'data_termino', 'descricao',
+                 'meta', 'arrecadado', 'tipo_meta')
+    
     def __init__(self, nome: str, data_inicio: Optional[date] = None,
                  data_termino: Optional[date] = None, descricao: Optional[str] = None,
                  meta: Optional[float] = 0.0, arrecadado: Optional[float] = 0.0,
@@ -43,7 +52,7 @@ class CampanhaDoacao:
             return False, "Arrecadado não pode ser negativo"
         return True, ""
     
-    def save(self) -> bool:
+    def save(self, db: Optional[DatabaseConnection] = None) -> bool:
         """Salva nova campanha"""
         valido, erro = self.validate()
         if not valido:
@@ -51,19 +60,20 @@ class CampanhaDoacao:
             return False
         
         query = """
-            INSERT INTO CampanhaDoacao (Nome, DataInicio, DataTermino, Descricao, Meta, Arrecadado, TipoMeta)
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
+            INSERT INTO CampanhaDoacao (Nome, DataInicio, DataTermino, Descricao, Meta, TipoMeta)
+            VALUES (%s, %s, %s, %s, %s, %s)
         """
         params = (self.nome, self.data_inicio, self.data_termino, self.descricao, 
-                 self.meta, self.arrecadado, self.tipo_meta)
+                 self.meta, self.tipo_meta)
         
-        with DatabaseConnection() as db:
+        with usar_conexao(db) as db:
             if db.execute_query(query, params):
                 self.idCampanhaDoacao = db.get_last_insert_id()
+                db.after_commit(lambda: query_cache.invalidate('CampanhaDoacao'))
                 return True
         return False
     
-    def update(self) -> bool:
+    def update(self, db: Optional[DatabaseConnection] = None) -> bool:
         """Atualiza campanha existente"""
         if not self.idCampanhaDoacao:
             print("✗ Campanha não possui ID")
@@ -77,91 +87,127 @@ class CampanhaDoacao:
         query = """
             UPDATE CampanhaDoacao SET Nome = %s, DataInicio = %s, 
                                      DataTermino = %s, Descricao = %s,
-                                     Meta = %s, Arrecadado = %s, TipoMeta = %s
+                                     Meta = %s, TipoMeta = %s
             WHERE idCampanhaDoacao = %s
         """
         params = (self.nome, self.data_inicio, self.data_termino, 
-                 self.descricao, self.meta, self.arrecadado, self.tipo_meta,
+                 self.descricao, self.meta, self.tipo_meta,
                  self.idCampanhaDoacao)
         
-        with DatabaseConnection() as db:
-            return db.execute_query(query, params)
+        with usar_conexao(db) as db:
+            sucesso = db.execute_query(query, params)
+            if sucesso:
+                db.after_commit(lambda: query_cache.invalidate('CampanhaDoacao'))
+        return sucesso
     
-    def delete(self) -> bool:
+    def delete(self, db: Optional[DatabaseConnection] = None) -> bool:
         """Remove campanha"""
         if not self.idCampanhaDoacao:
             print("✗ Campanha não possui ID")
             return False
         
         query = "DELETE FROM CampanhaDoacao WHERE idCampanhaDoacao = %s"
-        with DatabaseConnection() as db:
-            return db.execute_query(query, (self.idCampanhaDoacao,))
+        with usar_conexao(db) as db:
+            sucesso = db.execute_query(query, (self.idCampanhaDoacao,))
+            if sucesso:
+                db.after_commit(lambda: query_cache.invalidate('CampanhaDoacao'))
+        return sucesso
+    
+    # Campanhas com o arrecadado na unidade da meta (uma linha de
+    # ArrecadacaoCampanha por campanha, pela chave primária)
+    _SELECT = """
+        SELECT c.idCampanhaDoacao, c.Nome, c.DataInicio, c.DataTermino, c.Descricao,
+               COALESCE(c.Meta, 0) AS Meta,
+               COALESCE(a.QuantidadeTotal, 0) AS Arrecadado,
+               COALESCE(c.TipoMeta, 'R$') AS TipoMeta
+        FROM CampanhaDoacao c
+        LEFT JOIN ArrecadacaoCampanha a
+               ON a.Campanha_id = c.idCampanhaDoacao
+              AND a.Unidade = COALESCE(c.TipoMeta, 'R$')
+    """
+    
+    @staticmethod
+    def _from_row(row: Dict) -> 'CampanhaDoacao':
+        """Monta uma CampanhaDoacao a partir de uma linha de _SELECT"""
+        return CampanhaDoacao(
+            idCampanhaDoacao=row['idCampanhaDoacao'],
+            nome=row['Nome'],
+            data_inicio=row['DataInicio'],
+            data_termino=row['DataTermino'],
+            descricao=row['Descricao'],
+            meta=float(row.get('Meta', 0.0)),
+            arrecadado=float(row.get('Arrecadado', 0.0)),
+            tipo_meta=row.get('TipoMeta', 'R$')
+        )
     
     @staticmethod
     def get_by_id(campanha_id: int) -> Optional['CampanhaDoacao']:
         """Busca campanha por ID"""
-        query = "SELECT * FROM CampanhaDoacao WHERE idCampanhaDoacao = %s"
+        query = CampanhaDoacao._SELECT + " WHERE c.idCampanhaDoacao = %s"
         with DatabaseConnection() as db:
             result = db.fetch_one(query, (campanha_id,))
             if result:
-                return CampanhaDoacao(
-                    idCampanhaDoacao=result['idCampanhaDoacao'],
-                    nome=result['Nome'],
-                    data_inicio=result['DataInicio'],
-                    data_termino=result['DataTermino'],
-                    descricao=result['Descricao'],
-                    meta=float(result.get('Meta', 0.0)),
-                    arrecadado=float(result.get('Arrecadado', 0.0)),
-                    tipo_meta=result.get('TipoMeta', 'R$')
-                )
+                return CampanhaDoacao._from_row(result)
         return None
     
     @staticmethod
+    @cached('CampanhaDoacao')
     def get_all() -> List['CampanhaDoacao']:
         """Retorna todas as campanhas"""
-        query = "SELECT * FROM CampanhaDoacao ORDER BY DataInicio DESC"
+        query = CampanhaDoacao._SELECT + " ORDER BY c.DataInicio DESC"
         with DatabaseConnection() as db:
             results = db.fetch_all(query)
-            return [
-                CampanhaDoacao(
-                    idCampanhaDoacao=row['idCampanhaDoacao'],
-                    nome=row['Nome'],
-                    data_inicio=row['DataInicio'],
-                    data_termino=row['DataTermino'],
-                    descricao=row['Descricao'],
-                    meta=float(row.get('Meta', 0.0)),
-                    arrecadado=float(row.get('Arrecadado', 0.0)),
-                    tipo_meta=row.get('TipoMeta', 'R$')
-                )
-                for row in results
-            ]
+            return [CampanhaDoacao._from_row(row) for row in results]
     
     @staticmethod
+    @cached('CampanhaDoacao')
     def get_campanhas_ativas() -> List['CampanhaDoacao']:
         """Retorna campanhas ativas (sem data de término ou futuras)"""
-        query = """
-            SELECT * FROM CampanhaDoacao 
-            WHERE DataTermino IS NULL OR DataTermino >= CURDATE()
-            ORDER BY DataInicio DESC
+        query = CampanhaDoacao._SELECT + """
+            WHERE c.DataTermino IS NULL OR c.DataTermino >= CURDATE()
+            ORDER BY c.DataInicio DESC
         """
         with DatabaseConnection() as db:
             results = db.fetch_all(query)
-            return [
-                CampanhaDoacao(
-                    idCampanhaDoacao=row['idCampanhaDoacao'],
-                    nome=row['Nome'],
-                    data_inicio=row['DataInicio'],
-                    data_termino=row['DataTermino'],
-                    descricao=row['Descricao'],
-                    meta=float(row.get('Meta', 0.0)),
-                    arrecadado=float(row.get('Arrecadado', 0.0)),
-                    tipo_meta=row.get('TipoMeta', 'R$')
-                )
-                for row in results
-            ]
+            return [CampanhaDoacao._from_row(row) for row in results]
+    
+    @staticmethod
+    @cached('CampanhaDoacao')
+    def get_dataframe() -> pd.DataFrame:
+        """
+        Todas as campanhas direto em um DataFrame, com as colunas de to_dict().
+        
+        Não cria objetos CampanhaDoacao; o progresso é calculado por coluna.
+        Uma única query para todas as campanhas (arrecadado via ArrecadacaoCampanha).
+        """
+        query = """
+            SELECT c.idCampanhaDoacao, c.Nome AS nome, c.DataInicio AS data_inicio,
+                   c.DataTermino AS data_termino, c.Descricao AS descricao,
+                   COALESCE(c.Meta, 0) AS meta,
+                   COALESCE(a.QuantidadeTotal, 0) AS arrecadado,
+                   COALESCE(c.TipoMeta, 'R$') AS tipo_meta
+            FROM CampanhaDoacao c
+            LEFT JOIN ArrecadacaoCampanha a
+                   ON a.Campanha_id = c.idCampanhaDoacao
+                  AND a.Unidade = COALESCE(c.TipoMeta, 'R$')
+            ORDER BY c.DataInicio DESC
+        """
+        with DatabaseConnection() as db:
+            df = db.fetch_dataframe(query)
+        
+        # DECIMAL chega como Decimal; os cálculos e gráficos esperam float
+        df['meta'] = df['meta'].astype(float)
+        df['arrecadado'] = df['arrecadado'].astype(float)
+        progresso = (df['arrecadado'] / df['meta'].where(df['meta'] > 0)) * 100
+        df['progresso'] = progresso.fillna(0.0).clip(upper=100.0)
+        return df
     
     def calcular_progresso(self) -> float:
-        """Calcula o progresso da campanha em porcentagem"""
+        """
+        Calcula o progresso da campanha em porcentagem.
+        
+        Usa o arrecadado carregado junto com a campanha (sem ir ao banco).
+        """
         if self.meta <= 0:
             return 0.0
         progresso = (self.arrecadado / self.meta) * 100
@@ -193,7 +239,6 @@ if __name__ == "__main__":
         data_termino=date.today() + timedelta(days=90),
         descricao="Arrecadação de roupas e cobertores",
         meta=10000.00,
-        arrecadado=2500.00,
         tipo_meta="R$"
     )
     
@@ -0,0 +1,120 @@
+"""
+Modelo ChaveBusca - Chave fonética dos nomes de Doador, Beneficiario e Voluntario
+
+"Joao", "João", "JOAO SILVA" e "Joao da Silva" viram a mesma chave:
+
+    ChaveBusca.gerar("João da Silva")  ->  "JUAU SILVA"
+
+Passos:
+1. normalizar: maiúsculas, sem acentos (ç vira c), só letras e dígitos
+2. remover as partículas (da, de, do, das, dos, e)
+3. código fonético de cada palavra (regras do português: ph/f, ch/x, lh/l,
+   qu/k, ge/je, ce/se, z/s, y/i, w/v, h mudo, letras dobradas, m/n antes
+   de consoante ou no fim). e vira i e o vira u em qualquer posição, átona
+   ou tônica: "Pedro" e "Pidru" têm a mesma chave
+
+A chave fica na coluna ChaveBusca de cada tabela (índice idx_chave_busca_*),
+gravada pelos models no save/update. Assim a busca por nome é uma busca
+exata ou por prefixo no índice (ver BuscaService.search).
+
+Requer a migration add_chave_busca.sql
+(preencher: python backend/database/backfill.py chave_busca).
+"""
+
+import re
+import unicodedata
+from typing import List, Optional
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.connection import DatabaseConnection, usar_conexao
+
+
+class ChaveBusca:
+    """Geração e manutenção da chave fonética de busca"""
+    
+    # Partículas ignoradas nos nomes
+    STOPWORDS = frozenset({'D', 'DA', 'DE', 'DO', 'DAS', 'DOS', 'E'})
+    
+    # Tamanho da coluna ChaveBusca
+    TAMANHO = 255
+    
+    # tabela -> coluna de id (tabelas com a coluna ChaveBusca)
+    TABELAS = {
+        'Doador': 'idDoador',
+        'Beneficiario': 'idBeneficiario',
+        'Voluntario': 'idVoluntario'
+    }
+    
+    # Regras aplicadas em ordem sobre a palavra normalizada
+    _REGRAS = [
+        (re.compile(r'PH'), 'F'),
+        (re.compile(r'TH'), 'T'),
+        (re.compile(r'[CS]H'), 'X'),
+        (re.compile(r'LH'), 'L'),
+        (re.compile(r'NH'), 'N'),
+        (re.compile(r'QU(?=[EI])'), 'K'),
+        (re.compile(r'Q'), 'K'),
+        (re.compile(r'G(?=[EI])'), 'J'),
+        (re.compile(r'GU(?=[EI])'), 'G'),
+        (re.compile(r'C(?=[EI])'), 'S'),
+        (re.compile(r'C'), 'K'),
+        (re.compile(r'Z'), 'S'),
+        (re.compile(r'W'), 'V'),
+        (re.compile(r'Y'), 'I'),
+        (re.compile(r'H'), ''),
+        (re.compile(r'E'), 'I'),
+        (re.compile(r'O'), 'U'),
+        # Letras dobradas antes das nasais: "Emmanuel" = "Emanuel"
+        (re.compile(r'(.)\1+'), r'\1'),
+        (re.compile(r'M(?=[^AIU]|$)'), 'N'),
+        (re.compile(r'(.)\1+'), r'\1'),
+    ]
+    
+    @staticmethod
+    def normalizar(texto: Optional[str]) -> List[str]:
+        """Palavras do texto em maiúsculas, sem acentos e sem pontuação (ç vira c)"""
+        sem_acento = ''.join(
+            c for c in unicodedata.normalize('NFD', texto or '')
+            if unicodedata.category(c) != 'Mn'
+        )
+        return re.findall(r'[A-Z0-9]+', sem_acento.upper())
+    
+    @staticmethod
+    def fonetico(palavra: str) -> str:
+        """Código fonético de uma palavra normalizada (números ficam como estão)"""
+        if palavra.isdigit():
+            return palavra
+        for padrao, troca in ChaveBusca._REGRAS:
+            palavra = padrao.sub(troca, palavra)
+        return palavra
+    
+    @staticmethod
+    def gerar(nome: Optional[str]) -> str:
+        """Chave de busca de um nome (string vazia se não sobrar nenhuma palavra)"""
+        palavras = [p for p in ChaveBusca.normalizar(nome) if p not in ChaveBusca.STOPWORDS]
+        codigos = [c for c in (ChaveBusca.fonetico(p) for p in palavras) if c]
+        return ' '.join(codigos)[:ChaveBusca.TAMANHO]
+    
+    @staticmethod
+    def reconstruir(db: Optional[DatabaseConnection] = None, lote: int = 1000) -> int:
+        """
+        Backfill: recalcula ChaveBusca de todas as linhas das três tabelas.
+        
+        Returns:
+            int: quantidade de linhas atualizadas
+        """
+        total = 0
+        with usar_conexao(db) as db:
+            for tabela, coluna_id in ChaveBusca.TABELAS.items():
+                linhas = db.fetch_all(f"SELECT {coluna_id} AS id, Nome FROM {tabela}")
+                params = [(ChaveBusca.gerar(row['Nome']), row['id']) for row in linhas]
+                with db.transaction():
+                    for inicio in range(0, len(params), lote):
+                        db.executemany(
+                            f"UPDATE {tabela} SET ChaveBusca = %s WHERE {coluna_id} = %s",
+                            params[inicio:inicio + lote]
+                        )
+                total += len(params)
+        return total
@@ -5,20 +5,52 @@ Segue o mesmo padrão dos outros models do projeto
 
 import sys
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from database.connection import DatabaseConnection
-from typing import Dict, List, Any
+from database.connection import DatabaseConnection, get_pool
+from models.resumo_mensal_doacao import ResumoMensalDoacao
+from models.snapshot_metricas import SnapshotMetricas
+from typing import Dict, List, Any, Optional
 
 
 class DashboardModel:
     """Modelo para buscar dados agregados do dashboard"""
     
+    # Tempo (ms) gasto em cada seção na última chamada de get_metricas()
+    ultimos_tempos: Dict[str, float] = {}
+    
+    # Seções independentes das séries: seção -> (método, valor se falhar)
+    SECOES = {
+        'doacoes_por_categoria': ('_get_doacoes_por_categoria', dict),
+        'doacoes_mensais': ('_get_doacoes_mensais', dict),
+        'doadores_mensais': ('_get_doadores_mensais', dict),
+        'ultimas_doacoes': ('_get_ultimas_doacoes', list)
+    }
+    
+    # Totais usados quando a query dos cards falha ou estoura o tempo
+    TOTAIS_VAZIOS = {
+        'total_doadores': 0,
+        'total_beneficiarios': 0,
+        'total_doacoes': 0,
+        'campanhas_ativas': 0
+    }
+    
     @staticmethod
-    def get_metricas() -> Dict[str, Any]:
+    def get_metricas(concorrente: bool = False, timeout: float = 5.0) -> Dict[str, Any]:
         """
         Função principal que retorna TODAS as métricas do dashboard.
         
+        Modo padrão: UMA conexão para tudo; os quatro totais saem de uma única
+        query (subqueries escalares) e as séries rodam em sequência.
+        
+        concorrente=True: cada seção roda em uma thread com sua própria conexão
+        do pool, então o tempo total fica perto do da seção mais lenta. Cada
+        query tem até `timeout` segundos (também enviado ao MySQL como
+        MAX_EXECUTION_TIME); seções que falham ou estouram o tempo voltam
+        vazias e são listadas em 'secoes_indisponiveis'.
+        
         Retorna um dicionário com:
         - total_doadores: quantidade de doadores
         - total_beneficiarios: quantidade de beneficiários
@@ -28,123 +60,270 @@ class DashboardModel:
         - doacoes_mensais: dict com meses e quantidades (últimos 6)
         - doadores_mensais: dict com meses e novos doadores (últimos 6)
         - ultimas_doacoes: lista com últimas 10 doações
+        - variacao_mes: variação de cada total desde o fim do mês anterior
+          (ver SnapshotMetricas.variacao; vazio se ainda não há histórico)
+        - secoes_indisponiveis: seções que ficaram com o valor vazio (só no
+          modo concorrente; no sequencial um erro propaga)
+        - tempos_ms: dict com o tempo de cada seção (totais, categoria, ...)
+        """
+        if concorrente:
+            return DashboardModel._get_metricas_concorrente(timeout)
+        
+        tempos = {}
+        
+        def medir(secao, func, db):
+            inicio = time.perf_counter()
+            resultado = func(db)
+            tempos[secao] = round((time.perf_counter() - inicio) * 1000, 2)
+            return resultado
+        
+        with DatabaseConnection() as db:
+            totais = medir('totais', DashboardModel._get_totais, db)
+            metricas = {**totais}
+            for secao, (metodo, _) in DashboardModel.SECOES.items():
+                metricas[secao] = medir(secao, getattr(DashboardModel, metodo), db)
+            metricas['variacao_mes'] = medir(
+                'variacao_mes', lambda db: DashboardModel._get_variacao_mes(totais, db), db
+            )
+        
+        DashboardModel.ultimos_tempos = tempos
+        metricas['secoes_indisponiveis'] = []
+        metricas['tempos_ms'] = tempos
+        return metricas
+    
+    @staticmethod
+    def _get_metricas_concorrente(timeout: float) -> Dict[str, Any]:
+        """
+        get_metricas(concorrente=True): uma thread e uma conexão por seção.
+        
+        A variação do mês depende dos totais, então é disparada assim que
+        eles chegam; as demais seções começam todas juntas. Threads que
+        estouram o prazo não são esperadas: terminam sozinhas e devolvem a
+        conexão ao pool.
+        
+        Cada seção roda dentro de db.transaction(): ali os fetch_* propagam
+        erros (fora de transação eles devolvem vazio), então um timeout do
+        MAX_EXECUTION_TIME ou um erro do banco chega em 'secoes_indisponiveis'
+        em vez de virar uma seção vazia "bem-sucedida".
+        
+        No máximo tamanho do pool - 1 threads, para sobrar uma conexão para
+        as outras requisições.
+        """
+        tempos = {}
+        
+        def executar(secao, func):
+            inicio = time.perf_counter()
+            with DatabaseConnection() as db:
+                DashboardModel._limitar_tempo(db, timeout)
+                try:
+                    with db.transaction():
+                        return func(db)
+                finally:
+                    DashboardModel._limitar_tempo(db, 0)
+                    tempos[secao] = round((time.perf_counter() - inicio) * 1000, 2)
+        
+        prazo = time.monotonic() + timeout
+        indisponiveis = []
+        
+        def resultado(secao, futuro, vazio):
+            try:
+                return futuro.result(timeout=max(prazo - time.monotonic(), 0))
+            except FuturesTimeout:
+                print(f"⚠️ Dashboard: seção '{secao}' passou de {timeout}s")
+            except Exception as e:
+                print(f"⚠️ Dashboard: erro na seção '{secao}': {e}")
+            indisponiveis.append(secao)
+            return vazio()
+        
+        trabalhadores = max(1, min(len(DashboardModel.SECOES) + 1, get_pool().size - 1))
+        executor = ThreadPoolExecutor(max_workers=trabalhadores, thread_name_prefix='dashboard')
+        try:
+            futuro_totais = executor.submit(executar, 'totais', DashboardModel._get_totais)
+            futuros = {
+                secao: executor.submit(executar, secao, getattr(DashboardModel, metodo))
+                for secao, (metodo, _) in DashboardModel.SECOES.items()
+            }
+            
+            totais = resultado('totais', futuro_totais, lambda: dict(DashboardModel.TOTAIS_VAZIOS))
+            if 'totais' in indisponiveis:
+                futuro_variacao = None
+            else:
+                futuro_variacao = executor.submit(
+                    executar, 'variacao_mes', lambda db: DashboardModel._get_variacao_mes(totais, db)
+                )
+            
+            metricas = {**totais}
+            for secao, (_, vazio) in DashboardModel.SECOES.items():
+                metricas[secao] = resultado(secao, futuros[secao], vazio)
+            metricas['variacao_mes'] = (
+                resultado('variacao_mes', futuro_variacao, dict) if futuro_variacao else {}
+            )
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        # Cópia: threads atrasadas ainda podem escrever em `tempos`
+        tempos = dict(tempos)
+        DashboardModel.ultimos_tempos = tempos
+        metricas['secoes_indisponiveis'] = indisponiveis
+        metricas['tempos_ms'] = tempos
+        return metricas
+    
+    @staticmethod
+    def _limitar_tempo(db, segundos: float):
+        """
+        Limita o tempo de SELECT da sessão no MySQL (0 = sem limite).
+        
+        MAX_EXECUTION_TIME existe a partir do MySQL 5.7.8; em servidores sem
+        suporte o limite fica só do lado do Python.
+        """
+        try:
+            db.execute("SET SESSION MAX_EXECUTION_TIME = %s", (int(segundos * 1000),))
+        except Exception:
+            pass
+    
+    @staticmethod
+    def _fetch_one(query: str, db=None) -> Optional[Dict]:
+        """Executa na conexão recebida ou abre uma própria"""
+        if db is not None:
+            return db.fetch_one(query)
+        with DatabaseConnection() as db:
+            return db.fetch_one(query)
+    
+    @staticmethod
+    def _fetch_all(query: str, db=None) -> List[Dict]:
+        """Executa na conexão recebida ou abre uma própria"""
+        if db is not None:
+            return db.fetch_all(query)
+        with DatabaseConnection() as db:
+            return db.fetch_all(query)
+    
+    @staticmethod
+    def _get_totais(db=None) -> Dict[str, int]:
+        """
+        Os quatro totais dos cards em uma única ida ao banco.
+        
+        Raises:
+            RuntimeError: a consulta falhou (os totais não são trocados por
+            zeros, que seriam gravados como snapshot por SnapshotService)
+        """
+        query = """
+            SELECT
+                (SELECT COUNT(*) FROM Doador) AS total_doadores,
+                (SELECT COUNT(*) FROM Beneficiario) AS total_beneficiarios,
+                (SELECT COUNT(*) FROM Doacao) AS total_doacoes,
+                (SELECT COUNT(*) FROM CampanhaDoacao
+                  WHERE DataTermino IS NULL OR DataTermino >= CURDATE()) AS campanhas_ativas
         """
+        result = DashboardModel._fetch_one(query, db)
+        if not result:
+            raise RuntimeError("Não foi possível contar os totais do dashboard")
         return {
-            'total_doadores': DashboardModel._get_total_doadores(),
-            'total_beneficiarios': DashboardModel._get_total_beneficiarios(),
-            'total_doacoes': DashboardModel._get_total_doacoes(),
-            'campanhas_ativas': DashboardModel._get_campanhas_ativas(),
-            'doacoes_por_categoria': DashboardModel._get_doacoes_por_categoria(),
-            'doacoes_mensais': DashboardModel._get_doacoes_mensais(),
-            'doadores_mensais': DashboardModel._get_doadores_mensais(),
-            'ultimas_doacoes': DashboardModel._get_ultimas_doacoes()
+            'total_doadores': int(result.get('total_doadores') or 0),
+            'total_beneficiarios': int(result.get('total_beneficiarios') or 0),
+            'total_doacoes': int(result.get('total_doacoes') or 0),
+            'campanhas_ativas': int(result.get('campanhas_ativas') or 0)
         }
     
     @staticmethod
-    def _get_total_doadores() -> int:
+    def _get_total_doadores(db=None) -> int:
         """Conta total de doadores"""
         query = "SELECT COUNT(*) as total FROM Doador"
-        with DatabaseConnection() as db:
-            result = db.fetch_one(query)
-            return result['total'] if result else 0
+        result = DashboardModel._fetch_one(query, db)
+        return result['total'] if result else 0
     
     @staticmethod
-    def _get_total_beneficiarios() -> int:
+    def _get_total_beneficiarios(db=None) -> int:
         """Conta total de beneficiários"""
         query = "SELECT COUNT(*) as total FROM Beneficiario"
-        with DatabaseConnection() as db:
-            result = db.fetch_one(query)
-            return result['total'] if result else 0
+        result = DashboardModel._fetch_one(query, db)
+        return result['total'] if result else 0
     
     @staticmethod
-    def _get_total_doacoes() -> int:
+    def _get_total_doacoes(db=None) -> int:
         """Conta total de doações"""
         query = "SELECT COUNT(*) as total FROM Doacao"
-        with DatabaseConnection() as db:
-            result = db.fetch_one(query)
-            return result['total'] if result else 0
+        result = DashboardModel._fetch_one(query, db)
+        return result['total'] if result else 0
+    
+    @staticmethod
+    def _get_variacao_mes(totais: Dict[str, int], db=None) -> Dict[str, Dict]:
+        """
+        Compara os totais com o snapshot do fim do mês anterior.
+        
+        Só leitura (uma busca pela chave primária de SnapshotMetricas): os
+        snapshots são gravados pelo job diário (SnapshotService.registrar).
+        Requer a migration add_snapshot_metricas.sql; sem ela, retorna dict vazio.
+        """
+        try:
+            return SnapshotMetricas.variacao_no_mes(totais, db=db)
+        except Exception as e:
+            if db is not None and db.in_transaction:
+                raise
+            print(f"⚠️ Erro ao calcular variação (rode add_snapshot_metricas.sql): {e}")
+            return {}
     
     @staticmethod
-    def _get_campanhas_ativas() -> int:
+    def _get_campanhas_ativas(db=None) -> int:
         """Conta campanhas ativas (sem data término ou futuras)"""
         query = """
             SELECT COUNT(*) as total 
             FROM CampanhaDoacao 
             WHERE DataTermino IS NULL OR DataTermino >= CURDATE()
         """
-        with DatabaseConnection() as db:
-            result = db.fetch_one(query)
-            return result['total'] if result else 0
+        result = DashboardModel._fetch_one(query, db)
+        return result['total'] if result else 0
     
     @staticmethod
-    def _get_doacoes_por_categoria() -> Dict[str, int]:
+    def _get_doacoes_por_categoria(db=None) -> Dict[str, int]:
         """
-        Agrupa doações por TipoDoacao.
+        Total de doações por TipoDoacao, lido de ResumoMensalDoacao.
         
-        NOTA: Seu schema original não tem coluna TipoDoacao na tabela Doacao.
-        Você precisa rodar a migration add_doacoes_detalhes.sql primeiro!
+        Requer as migrations add_doacoes_detalhes.sql e
+        add_resumo_mensal_doacoes.sql (seguida do backfill).
         
-        Se a coluna não existir, retorna dict vazio.
-        """
-        query = """
-            SELECT TipoDoacao, COUNT(*) as total
-            FROM Doacao
-            GROUP BY TipoDoacao
-            ORDER BY total DESC
+        Se a tabela não existir, retorna dict vazio.
         """
         try:
-            with DatabaseConnection() as db:
-                results = db.fetch_all(query)
-                return {row['TipoDoacao']: row['total'] for row in results}
+            return ResumoMensalDoacao.por_tipo(db)
         except Exception as e:
-            print(f"⚠️ Erro ao buscar por categoria (rode add_doacoes_detalhes.sql): {e}")
+            if db is not None and db.in_transaction:
+                raise
+            print(f"⚠️ Erro ao buscar por categoria (rode add_resumo_mensal_doacoes.sql): {e}")
             return {}
     
     @staticmethod
-    def _get_doacoes_mensais() -> Dict[str, int]:
-        """Doações dos últimos 6 meses, agrupadas por mês"""
-        query = """
-            SELECT 
-                DATE_FORMAT(DataCriacao, '%Y-%m') as mes,
-                COUNT(*) as total
-            FROM Doacao
-            WHERE DataCriacao >= DATE_SUB(CURDATE(), INTERVAL 6 MONTH)
-            GROUP BY mes
-            ORDER BY mes ASC
+    def _get_doacoes_mensais(db=None) -> Dict[str, int]:
         """
-        with DatabaseConnection() as db:
-            results = db.fetch_all(query)
-            return {row['mes']: row['total'] for row in results}
+        Doações dos últimos 6 meses, agrupadas por mês.
+        
+        Lê ResumoMensalDoacao (algumas linhas por mês) em vez de agrupar Doacao.
+        """
+        return ResumoMensalDoacao.serie_mensal(6, db)
     
     @staticmethod
-    def _get_doadores_mensais() -> Dict[str, int]:
+    def _get_doadores_mensais(db=None) -> Dict[str, int]:
         """
-        Novos doadores por mês (baseado na primeira doação).
+        Novos doadores por mês (mês da primeira doação de cada doador).
         
-        Como não há DataCadastro em Doador, usamos a primeira doação
-        de cada doador para contar "novos doadores" por mês.
+        Lê Doador.PrimeiraDoacao, mantida pelo model Doacao, com uma consulta
+        de intervalo em idx_primeira_doacao. Mesma janela de _get_doacoes_mensais.
+        
+        Requer a migration add_primeira_doacao_doador.sql.
         """
         query = """
             SELECT 
-                DATE_FORMAT(MIN(d.DataCriacao), '%Y-%m') as mes,
-                COUNT(DISTINCT d.Doador_idDoador) as total_doadores
-            FROM Doacao d
-            WHERE d.DataCriacao >= DATE_SUB(CURDATE(), INTERVAL 6 MONTH)
-            GROUP BY d.Doador_idDoador
+                DATE_FORMAT(PrimeiraDoacao, '%Y-%m') as mes,
+                COUNT(*) as total_doadores
+            FROM Doador
+            WHERE PrimeiraDoacao >= DATE_FORMAT(DATE_SUB(CURDATE(), INTERVAL 6 MONTH), '%Y-%m-01')
+            GROUP BY mes
+            ORDER BY mes ASC
         """
-        with DatabaseConnection() as db:
-            results = db.fetch_all(query)
-            
-            # Agrupar por mês (vários doadores podem ter 1ª doação no mesmo mês)
-            meses_dict = {}
-            for row in results:
-                mes = row['mes']
-                meses_dict[mes] = meses_dict.get(mes, 0) + 1
-            
-            return meses_dict
+        results = DashboardModel._fetch_all(query, db)
+        return {row['mes']: int(row['total_doadores']) for row in results}
     
     @staticmethod
-    def _get_ultimas_doacoes() -> List[Dict[str, Any]]:
+    def _get_ultimas_doacoes(db=None) -> List[Dict[str, Any]]:
         """
         Últimas 10 doações com nome do doador.
         
@@ -186,29 +365,30 @@ class DashboardModel:
             LIMIT 10
         """
         
-        with DatabaseConnection() as db:
-            try:
-                # Tenta query completa primeiro
-                results = db.fetch_all(query_completa)
-            except Exception as e:
-                print(f"⚠️ Usando query básica (rode add_doacoes_detalhes.sql para mais dados)")
-                results = db.fetch_all(query_basica)
-            
-            # Converter datas para string
-            for row in results:
-                if row.get('data'):
-                    row['data'] = str(row['data'])
-            
-            return results
+        try:
+            # Tenta query completa primeiro
+            results = DashboardModel._fetch_all(query_completa, db)
+        except Exception as e:
+            print(f"⚠️ Usando query básica (rode add_doacoes_detalhes.sql para mais dados)")
+            results = DashboardModel._fetch_all(query_basica, db)
+        
+        # Converter datas para string
+        for row in results:
+            if row.get('data'):
+                row['data'] = str(row['data'])
+        
+        return results
 
 
 # Função de compatibilidade com seu main.py atual
-def get_metricas_dashboard() -> Dict[str, Any]:
+def get_metricas_dashboard(concorrente: bool = False, timeout: float = 5.0) -> Dict[str, Any]:
     """
     Função wrapper para manter compatibilidade com seu código atual.
     Seu main.py chama: metricas = get_metricas_dashboard()
+    
+    Ver DashboardModel.get_metricas para concorrente e timeout.
     """
-    return DashboardModel.get_metricas()
+    return DashboardModel.get_metricas(concorrente=concorrente, timeout=timeout)
 
 
 if __name__ == "__main__":
@@ -221,6 +401,16 @@ if __name__ == "__main__":
     print(f"Total de Doações: {metricas['total_doacoes']}")
     print(f"Campanhas Ativas: {metricas['campanhas_ativas']}")
     
+    print("\n⏱️ Tempo por seção (ms):")
+    print(metricas['tempos_ms'])
+    
+    inicio = time.perf_counter()
+    concorrente = get_metricas_dashboard(concorrente=True)
+    print(f"\n⚡ Modo concorrente: {(time.perf_counter() - inicio) * 1000:.1f} ms total")
+    print(concorrente['tempos_ms'])
+    if concorrente['secoes_indisponiveis']:
+        print(f"⚠️ Indisponíveis: {concorrente['secoes_indisponiveis']}")
+    
     print("\n📊 Doações por Categoria:")
     print(metricas['doacoes_por_categoria'])
     
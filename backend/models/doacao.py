@@ -3,13 +3,18 @@ Modelo Doacao - Representa doações no sistema
 VERSÃO CORRIGIDA - Remove completamente beneficiario_id (não existe na tabela!)
 """
 
-from typing import Optional, List, Dict, Tuple
+from typing import Optional, List, Dict, Tuple, Iterator
 from datetime import date, datetime
 import sys
 import os
+import pandas as pd
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from database.connection import DatabaseConnection
+from database.connection import DatabaseConnection, usar_conexao
+from database.cache import query_cache
+from models.resumo_mensal_doacao import ResumoMensalDoacao
+from models.doador import Doador
+from models.arrecadacao_campanha import ArrecadacaoCampanha
 
 
 class Doacao:
@@ -34,6 +39,14 @@ class Doacao:
     - "Distribuída": com beneficiários na tabela Recebe
     """
     
+    TIPOS_VALIDOS = ["Alimentos", "Roupas", "Medicamentos", "Dinheiro", "Outros"]
+    UNIDADES_VALIDAS = ["Kg", "Litros", "Unidades", "Caixas", "R$"]
+    
+    # Sem __dict__ por instância: o histórico inteiro cabe em bem menos memória
+    __slots__ = ('idDoacao', 'doador_id', 'campanha_id', 'ponto_coleta_id',
+                 'voluntario_coleta_id', 'data_criacao', 'data_entrega', 'tipo_doacao',
+                 'descricao_item', 'quantidade', 'unidade', 'observacoes', 'status')
+    
     def __init__(
         self,
         doador_id: int,
@@ -109,13 +122,11 @@ class Doacao:
             return False, "Quantidade deve ser maior que zero"
         
         # Validações de valores
-        tipos_validos = ["Alimentos", "Roupas", "Medicamentos", "Dinheiro", "Outros"]
-        if self.tipo_doacao not in tipos_validos:
-            return False, f"Tipo de doação deve ser um de: {', '.join(tipos_validos)}"
+        if self.tipo_doacao not in Doacao.TIPOS_VALIDOS:
+            return False, f"Tipo de doação deve ser um de: {', '.join(Doacao.TIPOS_VALIDOS)}"
         
-        unidades_validas = ["Kg", "Litros", "Unidades", "Caixas", "R$"]
-        if self.unidade not in unidades_validas:
-            return False, f"Unidade deve ser uma de: {', '.join(unidades_validas)}"
+        if self.unidade not in Doacao.UNIDADES_VALIDAS:
+            return False, f"Unidade deve ser uma de: {', '.join(Doacao.UNIDADES_VALIDAS)}"
         
         # Validação de datas
         if self.data_entrega and self.data_criacao:
@@ -124,13 +135,53 @@ class Doacao:
         
         return True, ""
     
-    def save(self) -> bool:
+    @staticmethod
+    def validar_dataframe(df: pd.DataFrame) -> pd.Series:
+        """
+        Regras de validate() aplicadas a um DataFrame inteiro de uma vez.
+        
+        Args:
+            df: colunas doador_id, ponto_coleta_id, voluntario_coleta_id e
+                quantidade (numéricas, NaN = não informado), descricao_item,
+                tipo_doacao, unidade, data_criacao e data_entrega (datetime64)
+        
+        Returns:
+            pd.Series: mensagem de erro de cada linha ("" = válida), a mesma que
+            validate() daria
+        """
+        def sem_id(coluna):
+            return df[coluna].isna() | (df[coluna] <= 0)
+        
+        descricao = df['descricao_item'].fillna('').astype(str).str.strip()
+        regras = [
+            (sem_id('doador_id'), "Doador é obrigatório e deve ser válido"),
+            (sem_id('ponto_coleta_id'), "Ponto de Coleta é obrigatório"),
+            (sem_id('voluntario_coleta_id'), "Voluntário Responsável é obrigatório"),
+            (descricao == '', "Descrição do item é obrigatória"),
+            (df['quantidade'].isna() | (df['quantidade'] <= 0), "Quantidade deve ser maior que zero"),
+            (~df['tipo_doacao'].isin(Doacao.TIPOS_VALIDOS),
+             f"Tipo de doação deve ser um de: {', '.join(Doacao.TIPOS_VALIDOS)}"),
+            (~df['unidade'].isin(Doacao.UNIDADES_VALIDAS),
+             f"Unidade deve ser uma de: {', '.join(Doacao.UNIDADES_VALIDAS)}"),
+            (df['data_entrega'].notna() & df['data_criacao'].notna()
+             & (df['data_entrega'] < df['data_criacao']),
+             "Data de entrega não pode ser anterior à data de criação"),
+        ]
+        erros = pd.Series('', index=df.index, dtype=object)
+        for falhou, mensagem in reversed(regras):  # a primeira regra que falha prevalece
+            erros[falhou] = mensagem
+        return erros
+    
+    def save(self, db: Optional[DatabaseConnection] = None) -> bool:
         """
         Salva uma nova doação no banco de dados.
         
         IMPORTANTE: O status sempre começa como "Recebida".
         Use o método distribuir() para associar beneficiários e mudar o status.
         
+        Args:
+            db: conexão de uma transação maior (opcional, ver DatabaseConnection.transaction)
+            
         Returns:
             bool: True se salvou com sucesso, False caso contrário
         """
@@ -172,23 +223,36 @@ class Doacao:
             "Recebida"  # Status inicial sempre "Recebida"
         )
         
-        with DatabaseConnection() as db:
-            if db.execute_query(query, params):
-                self.idDoacao = db.get_last_insert_id()
-                self.status = "Recebida"
-                print(f"✓ Doação salva com sucesso! ID: {self.idDoacao}")
-                return True
+        with usar_conexao(db) as db:
+            try:
+                with db.transaction():
+                    db.execute(query, params)
+                    self.idDoacao = db.get_last_insert_id()
+                    self.status = "Recebida"
+                    linha = self._linha_resumo()
+                    ResumoMensalDoacao.aplicar(db, ResumoMensalDoacao.deltas([linha]))
+                    ArrecadacaoCampanha.aplicar(db, ArrecadacaoCampanha.deltas([linha]))
+                    Doador.registrar_doacao(db, self.doador_id, self.data_criacao)
+                    db.after_commit(Doacao._invalidar_relatorios)
+            except Exception as e:
+                if db.in_transaction:
+                    raise
+                print(f"✗ Erro ao salvar doação: {e}")
+                return False
         
-        print("✗ Erro ao salvar doação")
-        return False
+        print(f"✓ Doação salva com sucesso! ID: {self.idDoacao}")
+        return True
     
-    def update(self) -> bool:
+    def update(self, db: Optional[DatabaseConnection] = None) -> bool:
         """
         Atualiza uma doação existente no banco de dados.
         
         ATENÇÃO: Para mudar o status, use o método distribuir() ao invés
         de atualizar manualmente, pois o status é calculado automaticamente.
         
+        Args:
+            db: conexão de uma transação maior (opcional, ver DatabaseConnection.transaction)
+            
         Returns:
             bool: True se atualizou com sucesso, False caso contrário
         """
@@ -234,21 +298,46 @@ class Doacao:
             self.idDoacao
         )
         
-        with DatabaseConnection() as db:
-            if db.execute_query(query, params):
-                print(f"✓ Doação {self.idDoacao} atualizada com sucesso!")
-                return True
+        with usar_conexao(db) as db:
+            try:
+                with db.transaction():
+                    # Tira a contribuição antiga dos contadores e soma a nova
+                    antigas = ResumoMensalDoacao.linhas_doacao(db, [self.idDoacao])
+                    db.execute(query, params)
+                    deltas = ResumoMensalDoacao.deltas(antigas, sinal=-1)
+                    arrecadacao = ArrecadacaoCampanha.deltas(antigas, sinal=-1)
+                    if antigas:
+                        linha = self._linha_resumo()
+                        ResumoMensalDoacao.deltas([linha], acumulado=deltas)
+                        ArrecadacaoCampanha.deltas([linha], acumulado=arrecadacao)
+                    ResumoMensalDoacao.aplicar(db, deltas)
+                    ArrecadacaoCampanha.aplicar(db, arrecadacao)
+                    # Primeira doação do doador antigo e do novo pode ter mudado
+                    if antigas and (antigas[0]['Doador_idDoador'] != self.doador_id
+                                    or str(antigas[0]['DataCriacao']) != str(self.data_criacao)):
+                        Doador.recalcular_primeira_doacao(
+                            db, [antigas[0]['Doador_idDoador'], self.doador_id]
+                        )
+                    db.after_commit(Doacao._invalidar_relatorios)
+            except Exception as e:
+                if db.in_transaction:
+                    raise
+                print(f"✗ Erro ao atualizar doação {self.idDoacao}: {e}")
+                return False
         
-        print(f"✗ Erro ao atualizar doação {self.idDoacao}")
-        return False
+        print(f"✓ Doação {self.idDoacao} atualizada com sucesso!")
+        return True
     
-    def delete(self) -> bool:
+    def delete(self, db: Optional[DatabaseConnection] = None) -> bool:
         """
         Remove uma doação do banco de dados.
         
         ATENÇÃO: Isso também remove as associações com beneficiários
         e voluntários distribuidores (CASCADE).
         
+        Args:
+            db: conexão de uma transação maior (opcional, ver DatabaseConnection.transaction)
+            
         Returns:
             bool: True se deletou com sucesso, False caso contrário
         """
@@ -258,13 +347,44 @@ class Doacao:
         
         query = "DELETE FROM Doacao WHERE idDoacao = %s"
         
-        with DatabaseConnection() as db:
-            if db.execute_query(query, (self.idDoacao,)):
-                print(f"✓ Doação {self.idDoacao} removida com sucesso!")
-                return True
+        with usar_conexao(db) as db:
+            try:
+                with db.transaction():
+                    antigas = ResumoMensalDoacao.linhas_doacao(db, [self.idDoacao])
+                    db.execute(query, (self.idDoacao,))
+                    ResumoMensalDoacao.aplicar(db, ResumoMensalDoacao.deltas(antigas, sinal=-1))
+                    ArrecadacaoCampanha.aplicar(db, ArrecadacaoCampanha.deltas(antigas, sinal=-1))
+                    Doador.recalcular_primeira_doacao(db, [row['Doador_idDoador'] for row in antigas])
+                    db.after_commit(Doacao._invalidar_relatorios)
+            except Exception as e:
+                if db.in_transaction:
+                    raise
+                print(f"✗ Erro ao remover doação {self.idDoacao}: {e}")
+                return False
         
-        print(f"✗ Erro ao remover doação {self.idDoacao}")
-        return False
+        print(f"✓ Doação {self.idDoacao} removida com sucesso!")
+        return True
+    
+    def _linha_resumo(self) -> Dict:
+        """Esta doação no formato de ResumoMensalDoacao.COLUNAS_DOACAO"""
+        return {
+            'DataCriacao': self.data_criacao,
+            'TipoDoacao': self.tipo_doacao,
+            'CampanhaDoacao_idCampanhaDoacao': self.campanha_id,
+            'PontoColeta_idPontoColeta': self.ponto_coleta_id,
+            'Quantidade': self.quantidade,
+            'Unidade': self.unidade,
+            'Status': self.status
+        }
+    
+    @staticmethod
+    def _invalidar_relatorios():
+        """
+        Descarta o que depende das doações em cache após gravar: relatórios
+        (RelatorioService.gerar) e campanhas (arrecadado/progresso)
+        """
+        query_cache.invalidate('Relatorio')
+        query_cache.invalidate('CampanhaDoacao')
     
     # ========================================================================
     # MÉTODOS DE DISTRIBUIÇÃO
@@ -275,92 +395,134 @@ class Doacao:
         doacao_id: int,
         beneficiarios_ids: List[int],
         voluntarios_ids: Optional[List[int]] = None,
-        data_entrega: Optional[date] = None
+        data_entrega: Optional[date] = None,
+        db: Optional[DatabaseConnection] = None
     ) -> Tuple[bool, str]:
         """
         Distribui uma doação para beneficiários específicos.
         
-        PROCESSO:
-        1. Remove associações anteriores da tabela Recebe
-        2. Remove associações anteriores da tabela Possui
-        3. Adiciona novos beneficiários na tabela Recebe
-        4. Adiciona voluntários distribuidores na tabela Possui
-        5. Atualiza data de entrega
-        6. Recalcula o status automaticamente
+        Atalho para distribuir_em_lote() com uma única doação.
         
         Args:
             doacao_id: ID da doação
             beneficiarios_ids: Lista de IDs dos beneficiários
             voluntarios_ids: Lista de IDs dos voluntários distribuidores (opcional)
             data_entrega: Data da entrega (opcional)
+            db: conexão de uma transação maior (opcional)
+            
+        Returns:
+            Tuple[bool, str]: (sucesso, mensagem)
+        """
+        sucesso, msg = Doacao.distribuir_em_lote(
+            [doacao_id], beneficiarios_ids, voluntarios_ids, data_entrega, db=db
+        )
+        if sucesso:
+            qtd_beneficiarios = len(set(beneficiarios_ids))
+            qtd_voluntarios = len(set(voluntarios_ids)) if voluntarios_ids else 0
+            msg = f"✅ Doação distribuída para {qtd_beneficiarios} beneficiário(s) por {qtd_voluntarios} voluntário(s)!"
+        return sucesso, msg
+    
+    @staticmethod
+    def distribuir_em_lote(
+        doacoes_ids: List[int],
+        beneficiarios_ids: List[int],
+        voluntarios_ids: Optional[List[int]] = None,
+        data_entrega: Optional[date] = None,
+        db: Optional[DatabaseConnection] = None
+    ) -> Tuple[bool, str]:
+        """
+        Distribui várias doações para vários beneficiários em uma transação.
+        
+        Cada doação é associada a TODOS os beneficiários e voluntários informados.
+        
+        PROCESSO (um único commit no final):
+        1. Remove associações anteriores de Recebe e Possui (um DELETE cada)
+        2. Insere os pares em Recebe e Possui com INSERT de várias linhas
+        3. Atualiza DataEntrega e Status em um único UPDATE. Como acabamos de
+           inserir beneficiários, o status é "Distribuída" sem precisar de COUNT.
+        4. Soma em ResumoMensalDoacao as doações que acabaram de virar "Distribuída"
+        
+        Args:
+            doacoes_ids: IDs das doações
+            beneficiarios_ids: IDs dos beneficiários
+            voluntarios_ids: IDs dos voluntários distribuidores (opcional)
+            data_entrega: Data da entrega (opcional, mantém a atual se None)
+            db: conexão de uma transação maior (opcional). Nesse caso os erros
+                propagam para que a transação de quem chamou seja desfeita.
             
         Returns:
             Tuple[bool, str]: (sucesso, mensagem)
         """
         if not beneficiarios_ids:
             return False, "❌ Selecione pelo menos um beneficiário!"
+        if not doacoes_ids:
+            return False, "❌ Selecione pelo menos uma doação!"
         
-        with DatabaseConnection() as db:
+        # Remove duplicados preservando a ordem
+        doacoes_ids = list(dict.fromkeys(doacoes_ids))
+        beneficiarios_ids = list(dict.fromkeys(beneficiarios_ids))
+        voluntarios_ids = list(dict.fromkeys(voluntarios_ids or []))
+        
+        marcadores = ", ".join(["%s"] * len(doacoes_ids))
+        recebe = [(b, d) for d in doacoes_ids for b in beneficiarios_ids]
+        possui = [(d, v) for d in doacoes_ids for v in voluntarios_ids]
+        
+        with usar_conexao(db) as db:
             try:
-                # Inicia transação
-                db.connection.start_transaction()
-                
-                # 1 e 2. Remove associações anteriores
-                db.execute_query(
-                    "DELETE FROM Recebe WHERE Doacao_idDoacao = %s",
-                    (doacao_id,)
-                )
-                db.execute_query(
-                    "DELETE FROM Possui WHERE Doacao_idDoacao = %s",
-                    (doacao_id,)
-                )
-                
-                # 3. Adiciona novos beneficiários na tabela Recebe
-                for beneficiario_id in beneficiarios_ids:
-                    db.execute_query(
-                        """
-                        INSERT INTO Recebe (Beneficiario_idBeneficiario, Doacao_idDoacao)
-                        VALUES (%s, %s)
-                        """,
-                        (beneficiario_id, doacao_id)
+                with db.transaction():
+                    # 1. Remove associações anteriores
+                    db.execute(
+                        f"DELETE FROM Recebe WHERE Doacao_idDoacao IN ({marcadores})",
+                        tuple(doacoes_ids)
                     )
-                
-                # 4. Adiciona voluntários distribuidores na tabela Possui
-                if voluntarios_ids:
-                    for voluntario_id in voluntarios_ids:
-                        db.execute_query(
-                            """
-                            INSERT INTO Possui (Doacao_idDoacao, Voluntario_idVoluntario)
-                            VALUES (%s, %s)
-                            """,
-                            (doacao_id, voluntario_id)
-                        )
-                
-                # 5. Atualiza data de entrega se fornecida
-                if data_entrega:
-                    db.execute_query(
-                        "UPDATE Doacao SET DataEntrega = %s WHERE idDoacao = %s",
-                        (data_entrega, doacao_id)
+                    db.execute(
+                        f"DELETE FROM Possui WHERE Doacao_idDoacao IN ({marcadores})",
+                        tuple(doacoes_ids)
+                    )
+                    
+                    # 2. Inserções em lote (o conector junta em um INSERT multi-linha)
+                    db.executemany(
+                        "INSERT INTO Recebe (Beneficiario_idBeneficiario, Doacao_idDoacao) VALUES (%s, %s)",
+                        recebe
+                    )
+                    db.executemany(
+                        "INSERT INTO Possui (Doacao_idDoacao, Voluntario_idVoluntario) VALUES (%s, %s)",
+                        possui
                     )
-                
-                # 6. Recalcula o status (agora será "Distribuída")
-                Doacao.calcular_status(doacao_id, db)
-                
-                # Confirma transação
-                db.connection.commit()
-                
-                qtd_beneficiarios = len(beneficiarios_ids)
-                qtd_voluntarios = len(voluntarios_ids) if voluntarios_ids else 0
-                
-                return True, f"✅ Doação distribuída para {qtd_beneficiarios} beneficiário(s) por {qtd_voluntarios} voluntário(s)!"
-                
+                    
+                    # 3. Doações que passam a contar como distribuídas no resumo mensal
+                    mudando = ResumoMensalDoacao.linhas_doacao(
+                        db, doacoes_ids, "AND (Status IS NULL OR Status <> 'Distribuída')"
+                    )
+                    
+                    # 4. Data de entrega e status de uma vez
+                    db.execute(
+                        f"""
+                        UPDATE Doacao
+                        SET Status = 'Distribuída',
+                            DataEntrega = COALESCE(%s, DataEntrega)
+                        WHERE idDoacao IN ({marcadores})
+                        """,
+                        (data_entrega, *doacoes_ids)
+                    )
+                    ResumoMensalDoacao.aplicar(db, {
+                        chave: [0, 0.0, doacoes]
+                        for chave, (doacoes, _, _) in ResumoMensalDoacao.deltas(mudando).items()
+                    })
+                    db.after_commit(Doacao._invalidar_relatorios)
             except Exception as e:
-                # Desfaz tudo em caso de erro
-                db.connection.rollback()
+                # Dentro da transação de quem chamou: deixa o erro subir
+                if db.in_transaction:
+                    raise
                 return False, f"❌ Erro ao distribuir doação: {str(e)}"
+        
+        return True, (
+            f"✅ {len(doacoes_ids)} doação(ões) distribuída(s) para "
+            f"{len(beneficiarios_ids)} beneficiário(s) por {len(voluntarios_ids)} voluntário(s)!"
+        )
     
     @staticmethod
-    def calcular_status(doacao_id: int, db=None) -> bool:
+    def calcular_status(doacao_id: int, db: Optional[DatabaseConnection] = None) -> bool:
         """
         Calcula e atualiza o status de uma doação automaticamente.
         
@@ -370,48 +532,46 @@ class Doacao:
         
         Args:
             doacao_id: ID da doação
-            db: Conexão DatabaseConnection (opcional, para usar em transação)
+            db: conexão de uma transação maior (opcional, ver DatabaseConnection.transaction)
             
         Returns:
             bool: True se atualizou com sucesso
         """
-        usar_conexao_propria = db is None
+        with usar_conexao(db) as db:
+            try:
+                with db.transaction():
+                    # Conta quantos beneficiários estão associados na tabela Recebe
+                    result = db.fetch_one(
+                        "SELECT COUNT(*) as count FROM Recebe WHERE Doacao_idDoacao = %s",
+                        (doacao_id,)
+                    )
+                    
+                    count = result['count'] if result else 0
+                    
+                    # Define status baseado na contagem
+                    novo_status = "Distribuída" if count > 0 else "Recebida"
+                    
+                    # Status anterior, para ajustar o resumo mensal se mudar
+                    antigas = ResumoMensalDoacao.linhas_doacao(db, [doacao_id])
+                    
+                    # Atualiza o status
+                    db.execute(
+                        "UPDATE Doacao SET Status = %s WHERE idDoacao = %s",
+                        (novo_status, doacao_id)
+                    )
+                    if antigas and antigas[0].get('Status') != novo_status:
+                        deltas = ResumoMensalDoacao.deltas(antigas, sinal=-1)
+                        ResumoMensalDoacao.deltas([{**antigas[0], 'Status': novo_status}], acumulado=deltas)
+                        ResumoMensalDoacao.aplicar(db, deltas)
+                    db.after_commit(Doacao._invalidar_relatorios)
+            except Exception as e:
+                # Dentro da transação de quem chamou: deixa o erro subir
+                if db.in_transaction:
+                    raise
+                print(f"❌ Erro ao calcular status: {e}")
+                return False
         
-        try:
-            if usar_conexao_propria:
-                db = DatabaseConnection()
-                db.__enter__()
-            
-            # Conta quantos beneficiários estão associados na tabela Recebe
-            result = db.fetch_one(
-                "SELECT COUNT(*) as count FROM Recebe WHERE Doacao_idDoacao = %s",
-                (doacao_id,)
-            )
-            
-            count = result['count'] if result else 0
-            
-            # Define status baseado na contagem
-            novo_status = "Distribuída" if count > 0 else "Recebida"
-            
-            # Atualiza o status
-            db.execute_query(
-                "UPDATE Doacao SET Status = %s WHERE idDoacao = %s",
-                (novo_status, doacao_id)
-            )
-            
-            if usar_conexao_propria:
-                db.connection.commit()
-            
-            return True
-            
-        except Exception as e:
-            if usar_conexao_propria and db:
-                db.connection.rollback()
-            print(f"❌ Erro ao calcular status: {e}")
-            return False
-        finally:
-            if usar_conexao_propria and db:
-                db.__exit__(None, None, None)
+        return True
     
     @staticmethod
     def listar_beneficiarios(doacao_id: int) -> List[Dict]:
@@ -472,24 +632,165 @@ class Doacao:
         
         with DatabaseConnection() as db:
             results = db.fetch_all(query, (status,))
-            return [
-                Doacao(
-                    idDoacao=row['idDoacao'],
-                    doador_id=row['Doador_idDoador'],
-                    campanha_id=row.get('CampanhaDoacao_idCampanhaDoacao'),
-                    ponto_coleta_id=row.get('PontoColeta_idPontoColeta'),
-                    voluntario_coleta_id=row.get('VoluntarioColeta_idVoluntario'),
-                    data_criacao=row['DataCriacao'],
-                    data_entrega=row.get('DataEntrega'),
-                    tipo_doacao=row.get('TipoDoacao', 'Outros'),
-                    descricao_item=row.get('DescricaoItem', 'Item não especificado'),
-                    quantidade=float(row.get('Quantidade', 1.0)),
-                    unidade=row.get('Unidade', 'Unidades'),
-                    observacoes=row.get('Observacoes'),
-                    status=row.get('Status', 'Recebida')
-                )
-                for row in results
-            ]
+            return [Doacao._from_row(row) for row in results]
+    
+    # SELECT base das listagens com nomes das entidades relacionadas
+    _SELECT_DETALHADO = """
+            SELECT
+                d.idDoacao AS idDoacao,
+                d.Doador_idDoador AS doador_id,
+                d.CampanhaDoacao_idCampanhaDoacao AS campanha_id,
+                d.PontoColeta_idPontoColeta AS ponto_coleta_id,
+                d.VoluntarioColeta_idVoluntario AS voluntario_coleta_id,
+                d.DataCriacao AS data_criacao,
+                d.DataEntrega AS data_entrega,
+                d.TipoDoacao AS tipo_doacao,
+                d.DescricaoItem AS descricao_item,
+                d.Quantidade AS quantidade,
+                d.Unidade AS unidade,
+                d.Observacoes AS observacoes,
+                d.Status AS status,
+                COALESCE(doador.Nome, 'Desconhecido') AS doador_nome,
+                p.Responsavel AS ponto_responsavel,
+                v.Nome AS voluntario_nome,
+                c.Nome AS campanha_nome
+            FROM Doacao d
+            LEFT JOIN Doador doador ON doador.idDoador = d.Doador_idDoador
+            LEFT JOIN PontoColeta p ON p.idPontoColeta = d.PontoColeta_idPontoColeta
+            LEFT JOIN Voluntario v ON v.idVoluntario = d.VoluntarioColeta_idVoluntario
+            LEFT JOIN CampanhaDoacao c ON c.idCampanhaDoacao = d.CampanhaDoacao_idCampanhaDoacao
+    """
+    
+    @staticmethod
+    def _formatar_detalhado(results: List[Dict]) -> List[Dict]:
+        """Normaliza datas e quantidade das linhas de _SELECT_DETALHADO"""
+        for row in results:
+            row['data_criacao'] = str(row['data_criacao']) if row['data_criacao'] else None
+            row['data_entrega'] = str(row['data_entrega']) if row['data_entrega'] else None
+            row['quantidade'] = float(row['quantidade']) if row['quantidade'] is not None else 1.0
+        return results
+    
+    @staticmethod
+    def listar_detalhado(status: Optional[str] = None) -> List[Dict]:
+        """
+        Lista doações já com os nomes das entidades relacionadas (uma query).
+        
+        Evita buscar o doador/ponto/voluntário/campanha linha a linha.
+        Cada dicionário tem as mesmas chaves de to_dict() mais:
+        doador_nome, ponto_responsavel, voluntario_nome, campanha_nome.
+        Pode ser passado direto para pd.DataFrame().
+        
+        Args:
+            status: filtra por status ("Recebida" ou "Distribuída"), opcional
+            
+        Returns:
+            Lista de dicionários ordenada da doação mais recente para a mais antiga
+        """
+        query = Doacao._SELECT_DETALHADO
+        params = ()
+        if status:
+            query += " WHERE d.Status = %s"
+            params = (status,)
+        query += " ORDER BY d.DataCriacao DESC, d.idDoacao DESC"
+        
+        with DatabaseConnection() as db:
+            results = db.fetch_all(query, params)
+        
+        return Doacao._formatar_detalhado(results)
+    
+    @staticmethod
+    def _where_filtros(filtros: Optional[Dict]) -> Tuple[List[str], List]:
+        """
+        Converte o dicionário de filtros em cláusulas WHERE e parâmetros.
+        
+        Filtros aceitos (todos opcionais; None ou "Todos" são ignorados):
+        tipo, status, data_inicio, data_fim, doador_id, campanha_id, ponto_id
+        """
+        colunas = {
+            'tipo': "d.TipoDoacao = %s",
+            'status': "d.Status = %s",
+            'data_inicio': "d.DataCriacao >= %s",
+            'data_fim': "d.DataCriacao <= %s",
+            'doador_id': "d.Doador_idDoador = %s",
+            'campanha_id': "d.CampanhaDoacao_idCampanhaDoacao = %s",
+            'ponto_id': "d.PontoColeta_idPontoColeta = %s"
+        }
+        clausulas, params = [], []
+        for chave, valor in (filtros or {}).items():
+            if chave not in colunas:
+                raise ValueError(f"Filtro desconhecido: {chave}")
+            if valor is None or valor == "Todos":
+                continue
+            clausulas.append(colunas[chave])
+            params.append(valor)
+        return clausulas, params
+    
+    @staticmethod
+    def listar(
+        filtros: Optional[Dict] = None,
+        ordenacao: str = "desc",
+        limite: int = 50,
+        cursor: Optional[Tuple] = None
+    ) -> Tuple[List[Dict], Optional[Tuple]]:
+        """
+        Lista uma página de doações filtradas no próprio banco.
+        
+        Usa paginação por chave (keyset) em (DataCriacao, idDoacao): a página
+        seguinte começa depois da última linha da anterior, sem OFFSET, então
+        o custo não cresce com o número da página.
+        
+        Args:
+            filtros: ver _where_filtros() (tipo, status, data_inicio, ...)
+            ordenacao: "desc" (mais recentes primeiro) ou "asc"
+            limite: tamanho da página
+            cursor: valor devolvido pela chamada anterior (None = primeira página)
+            
+        Returns:
+            Tuple[List[Dict], Optional[Tuple]]: (linhas no formato de
+            listar_detalhado(), cursor da próxima página ou None se acabou)
+        """
+        if ordenacao not in ("asc", "desc"):
+            raise ValueError("ordenacao deve ser 'asc' ou 'desc'")
+        
+        clausulas, params = Doacao._where_filtros(filtros)
+        
+        if cursor:
+            data_cursor, id_cursor = cursor
+            op = "<" if ordenacao == "desc" else ">"
+            clausulas.append(
+                f"(d.DataCriacao {op} %s OR (d.DataCriacao = %s AND d.idDoacao {op} %s))"
+            )
+            params.extend([data_cursor, data_cursor, id_cursor])
+        
+        query = Doacao._SELECT_DETALHADO
+        if clausulas:
+            query += " WHERE " + " AND ".join(clausulas)
+        direcao = ordenacao.upper()
+        query += f" ORDER BY d.DataCriacao {direcao}, d.idDoacao {direcao} LIMIT %s"
+        params.append(limite + 1)  # uma linha a mais indica se há próxima página
+        
+        with DatabaseConnection() as db:
+            results = db.fetch_all(query, tuple(params))
+        
+        proximo_cursor = None
+        if len(results) > limite:
+            results = results[:limite]
+            ultima = results[-1]
+            proximo_cursor = (str(ultima['data_criacao']), ultima['idDoacao'])
+        
+        return Doacao._formatar_detalhado(results), proximo_cursor
+    
+    @staticmethod
+    def contar(filtros: Optional[Dict] = None) -> int:
+        """Conta as doações que atendem aos filtros (sem JOINs)"""
+        clausulas, params = Doacao._where_filtros(filtros)
+        query = "SELECT COUNT(*) AS total FROM Doacao d"
+        if clausulas:
+            query += " WHERE " + " AND ".join(clausulas)
+        
+        with DatabaseConnection() as db:
+            result = db.fetch_one(query, tuple(params))
+            return result['total'] if result else 0
     
     @staticmethod
     def estatisticas_geral() -> Dict:
@@ -524,23 +825,28 @@ class Doacao:
         with DatabaseConnection() as db:
             result = db.fetch_one(query, (doacao_id,))
             if result:
-                return Doacao(
-                    idDoacao=result['idDoacao'],
-                    doador_id=result['Doador_idDoador'],
-                    campanha_id=result.get('CampanhaDoacao_idCampanhaDoacao'),
-                    ponto_coleta_id=result.get('PontoColeta_idPontoColeta'),
-                    voluntario_coleta_id=result.get('VoluntarioColeta_idVoluntario'),
-                    data_criacao=result['DataCriacao'],
-                    data_entrega=result.get('DataEntrega'),
-                    tipo_doacao=result.get('TipoDoacao', 'Outros'),
-                    descricao_item=result.get('DescricaoItem', 'Item não especificado'),
-                    quantidade=float(result.get('Quantidade', 1.0)),
-                    unidade=result.get('Unidade', 'Unidades'),
-                    observacoes=result.get('Observacoes'),
-                    status=result.get('Status', 'Recebida')
-                )
+                return Doacao._from_row(result)
         return None
     
+    @staticmethod
+    def _from_row(row: Dict) -> 'Doacao':
+        """Monta uma Doacao a partir de uma linha de SELECT * FROM Doacao"""
+        return Doacao(
+            idDoacao=row['idDoacao'],
+            doador_id=row['Doador_idDoador'],
+            campanha_id=row.get('CampanhaDoacao_idCampanhaDoacao'),
+            ponto_coleta_id=row.get('PontoColeta_idPontoColeta'),
+            voluntario_coleta_id=row.get('VoluntarioColeta_idVoluntario'),
+            data_criacao=row['DataCriacao'],
+            data_entrega=row.get('DataEntrega'),
+            tipo_doacao=row.get('TipoDoacao', 'Outros'),
+            descricao_item=row.get('DescricaoItem', 'Item não especificado'),
+            quantidade=float(row.get('Quantidade', 1.0)),
+            unidade=row.get('Unidade', 'Unidades'),
+            observacoes=row.get('Observacoes'),
+            status=row.get('Status', 'Recebida')
+        )
+    
     @staticmethod
     def get_all() -> List['Doacao']:
         """Retorna todas as doações cadastradas"""
@@ -548,24 +854,74 @@ class Doacao:
         
         with DatabaseConnection() as db:
             results = db.fetch_all(query)
-            return [
-                Doacao(
-                    idDoacao=row['idDoacao'],
-                    doador_id=row['Doador_idDoador'],
-                    campanha_id=row.get('CampanhaDoacao_idCampanhaDoacao'),
-                    ponto_coleta_id=row.get('PontoColeta_idPontoColeta'),
-                    voluntario_coleta_id=row.get('VoluntarioColeta_idVoluntario'),
-                    data_criacao=row['DataCriacao'],
-                    data_entrega=row.get('DataEntrega'),
-                    tipo_doacao=row.get('TipoDoacao', 'Outros'),
-                    descricao_item=row.get('DescricaoItem', 'Item não especificado'),
-                    quantidade=float(row.get('Quantidade', 1.0)),
-                    unidade=row.get('Unidade', 'Unidades'),
-                    observacoes=row.get('Observacoes'),
-                    status=row.get('Status', 'Recebida')
-                )
-                for row in results
-            ]
+            return [Doacao._from_row(row) for row in results]
+    
+    @staticmethod
+    def get_dataframe(filtros: Optional[Dict] = None) -> pd.DataFrame:
+        """
+        Doações direto em um DataFrame, com as colunas de to_dict().
+        
+        Não cria objetos Doacao, o que faz diferença no histórico completo.
+        As datas ficam como date (não str) e a quantidade como float.
+        
+        Args:
+            filtros: mesmos filtros de listar()
+        """
+        clausulas, params = Doacao._where_filtros(filtros)
+        query = """
+            SELECT idDoacao, Doador_idDoador AS doador_id,
+                   CampanhaDoacao_idCampanhaDoacao AS campanha_id,
+                   PontoColeta_idPontoColeta AS ponto_coleta_id,
+                   VoluntarioColeta_idVoluntario AS voluntario_coleta_id,
+                   DataCriacao AS data_criacao, DataEntrega AS data_entrega,
+                   TipoDoacao AS tipo_doacao, DescricaoItem AS descricao_item,
+                   Quantidade AS quantidade, Unidade AS unidade,
+                   Observacoes AS observacoes, Status AS status
+            FROM Doacao d
+        """
+        if clausulas:
+            query += " WHERE " + " AND ".join(clausulas)
+        query += " ORDER BY d.DataCriacao DESC"
+        
+        with DatabaseConnection() as db:
+            df = db.fetch_dataframe(query, tuple(params))
+        df['quantidade'] = df['quantidade'].astype(float)
+        return df
+    
+    @staticmethod
+    def iter_all(chunk_size: int = 1000) -> Iterator['Doacao']:
+        """
+        Versão em streaming de get_all(): entrega uma Doacao por vez.
+        
+        As linhas são lidas do banco em blocos de chunk_size, então a memória
+        não cresce com o histórico. A conexão fica presa até o fim da iteração.
+        """
+        query = "SELECT * FROM Doacao ORDER BY DataCriacao DESC"
+        
+        with DatabaseConnection() as db:
+            for row in db.fetch_iter(query, chunk_size=chunk_size):
+                yield Doacao._from_row(row)
+    
+    @staticmethod
+    def iter_detalhado(filtros: Optional[Dict] = None, chunk_size: int = 1000) -> Iterator[List[Dict]]:
+        """
+        Blocos de linhas no formato de listar_detalhado(), lidos em streaming.
+        
+        Pensado para exportações e relatórios sobre o histórico inteiro.
+        
+        Args:
+            filtros: mesmos filtros de listar()
+            chunk_size: linhas por bloco
+        """
+        clausulas, params = Doacao._where_filtros(filtros)
+        query = Doacao._SELECT_DETALHADO
+        if clausulas:
+            query += " WHERE " + " AND ".join(clausulas)
+        query += " ORDER BY d.DataCriacao DESC, d.idDoacao DESC"
+        
+        with DatabaseConnection() as db:
+            for rows in db.fetch_chunks(query, tuple(params), chunk_size):
+                yield Doacao._formatar_detalhado(rows)
     
     @staticmethod
     def get_by_doador(doador_id: int) -> List['Doacao']:
@@ -574,24 +930,7 @@ class Doacao:
         
         with DatabaseConnection() as db:
             results = db.fetch_all(query, (doador_id,))
-            return [
-                Doacao(
-                    idDoacao=row['idDoacao'],
-                    doador_id=row['Doador_idDoador'],
-                    campanha_id=row.get('CampanhaDoacao_idCampanhaDoacao'),
-                    ponto_coleta_id=row.get('PontoColeta_idPontoColeta'),
-                    voluntario_coleta_id=row.get('VoluntarioColeta_idVoluntario'),
-                    data_criacao=row['DataCriacao'],
-                    data_entrega=row.get('DataEntrega'),
-                    tipo_doacao=row.get('TipoDoacao', 'Outros'),
-                    descricao_item=row.get('DescricaoItem', 'Item não especificado'),
-                    quantidade=float(row.get('Quantidade', 1.0)),
-                    unidade=row.get('Unidade', 'Unidades'),
-                    observacoes=row.get('Observacoes'),
-                    status=row.get('Status', 'Recebida')
-                )
-                for row in results
-            ]
+            return [Doacao._from_row(row) for row in results]
     
     @staticmethod
     def get_by_tipo(tipo_doacao: str) -> List['Doacao']:
@@ -600,24 +939,7 @@ class Doacao:
         
         with DatabaseConnection() as db:
             results = db.fetch_all(query, (tipo_doacao,))
-            return [
-                Doacao(
-                    idDoacao=row['idDoacao'],
-                    doador_id=row['Doador_idDoador'],
-                    campanha_id=row.get('CampanhaDoacao_idCampanhaDoacao'),
-                    ponto_coleta_id=row.get('PontoColeta_idPontoColeta'),
-                    voluntario_coleta_id=row.get('VoluntarioColeta_idVoluntario'),
-                    data_criacao=row['DataCriacao'],
-                    data_entrega=row.get('DataEntrega'),
-                    tipo_doacao=row.get('TipoDoacao', 'Outros'),
-                    descricao_item=row.get('DescricaoItem', 'Item não especificado'),
-                    quantidade=float(row.get('Quantidade', 1.0)),
-                    unidade=row.get('Unidade', 'Unidades'),
-                    observacoes=row.get('Observacoes'),
-                    status=row.get('Status', 'Recebida')
-                )
-                for row in results
-            ]
+            return [Doacao._from_row(row) for row in results]
     
     def to_dict(self) -> Dict:
         """Converte a doação para dicionário"""
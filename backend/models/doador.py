@@ -5,14 +5,21 @@ Modelo Doador - Pessoas/empresas que fazem doações
 from typing import Optional, List, Dict
 import sys
 import os
+import pandas as pd
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from database.connection import DatabaseConnection
+from database.connection import DatabaseConnection, usar_conexao
+from database.cache import cached, query_cache
+from models.chave_busca import ChaveBusca
 
 
 class Doador:
     """Representa um doador no sistema"""
     
+    # Sem __dict__ por instância: listas grandes de doadores ocupam bem menos memória
+    __slots__ = ('idDoador', 'nome', 'telefone', 'email', 'logradouro', 'numero',
+                 'complemento', 'bairro', 'cidade', 'estado', 'cep')
+    
     def __init__(self, nome: str, telefone: Optional[str] = None,
                  email: Optional[str] = None, logradouro: Optional[str] = None,
                  numero: Optional[str] = None, complemento: Optional[str] = None,
@@ -48,7 +55,32 @@ class Doador:
                 return False, "CEP inválido"
         return True, ""
     
-    def save(self) -> bool:
+    @staticmethod
+    def validar_dataframe(df: pd.DataFrame) -> pd.Series:
+        """
+        Regras de validate() aplicadas a um DataFrame inteiro de uma vez.
+        
+        Args:
+            df: colunas nome, email, estado e cep (texto; vazio/NaN = não informado)
+        
+        Returns:
+            pd.Series: mensagem de erro de cada linha ("" = válida), a mesma que
+            validate() daria
+        """
+        texto = {c: df[c].fillna('').astype(str).str.strip() for c in ('nome', 'email', 'estado', 'cep')}
+        cep_limpo = texto['cep'].str.replace(r'[-.]', '', regex=True)
+        regras = [
+            (texto['nome'] == '', "Nome é obrigatório"),
+            ((texto['email'] != '') & ~texto['email'].str.contains('@', regex=False), "Email inválido"),
+            ((texto['estado'] != '') & (texto['estado'].str.len() != 2), "Estado deve ter 2 caracteres (UF)"),
+            ((texto['cep'] != '') & ~cep_limpo.str.fullmatch(r'\d{8}'), "CEP inválido"),
+        ]
+        erros = pd.Series('', index=df.index, dtype=object)
+        for falhou, mensagem in reversed(regras):  # a primeira regra que falha prevalece
+            erros[falhou] = mensagem
+        return erros
+    
+    def save(self, db: Optional[DatabaseConnection] = None) -> bool:
         """Salva novo doador"""
         valido, erro = self.validate()
         if not valido:
@@ -57,20 +89,21 @@ class Doador:
         
         query = """
             INSERT INTO Doador (Nome, Telefone, Email, Logradouro, Numero,
-                               Complemento, Bairro, Cidade, Estado, CEP)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                               Complemento, Bairro, Cidade, Estado, CEP, ChaveBusca)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
         """
         params = (self.nome, self.telefone, self.email, self.logradouro,
                  self.numero, self.complemento, self.bairro, self.cidade,
-                 self.estado, self.cep)
+                 self.estado, self.cep, ChaveBusca.gerar(self.nome))
         
-        with DatabaseConnection() as db:
+        with usar_conexao(db) as db:
             if db.execute_query(query, params):
                 self.idDoador = db.get_last_insert_id()
+                db.after_commit(lambda: query_cache.invalidate('Doador'))
                 return True
         return False
     
-    def update(self) -> bool:
+    def update(self, db: Optional[DatabaseConnection] = None) -> bool:
         """Atualiza doador existente"""
         if not self.idDoador:
             print("✗ Doador não possui ID")
@@ -84,25 +117,49 @@ class Doador:
         query = """
             UPDATE Doador SET Nome = %s, Telefone = %s, Email = %s,
                              Logradouro = %s, Numero = %s, Complemento = %s,
-                             Bairro = %s, Cidade = %s, Estado = %s, CEP = %s
+                             Bairro = %s, Cidade = %s, Estado = %s, CEP = %s,
+                             ChaveBusca = %s
             WHERE idDoador = %s
         """
         params = (self.nome, self.telefone, self.email, self.logradouro,
                  self.numero, self.complemento, self.bairro, self.cidade,
-                 self.estado, self.cep, self.idDoador)
+                 self.estado, self.cep, ChaveBusca.gerar(self.nome), self.idDoador)
         
-        with DatabaseConnection() as db:
-            return db.execute_query(query, params)
+        with usar_conexao(db) as db:
+            sucesso = db.execute_query(query, params)
+            if sucesso:
+                db.after_commit(lambda: query_cache.invalidate('Doador'))
+        return sucesso
     
-    def delete(self) -> bool:
+    def delete(self, db: Optional[DatabaseConnection] = None) -> bool:
         """Remove doador"""
         if not self.idDoador:
             print("✗ Doador não possui ID")
             return False
         
         query = "DELETE FROM Doador WHERE idDoador = %s"
-        with DatabaseConnection() as db:
-            return db.execute_query(query, (self.idDoador,))
+        with usar_conexao(db) as db:
+            sucesso = db.execute_query(query, (self.idDoador,))
+            if sucesso:
+                db.after_commit(lambda: query_cache.invalidate('Doador'))
+        return sucesso
+    
+    @staticmethod
+    def _from_row(row: Dict) -> 'Doador':
+        """Monta um Doador a partir de uma linha de SELECT * FROM Doador"""
+        return Doador(
+            idDoador=row['idDoador'],
+            nome=row['Nome'],
+            telefone=row['Telefone'],
+            email=row['Email'],
+            logradouro=row['Logradouro'],
+            numero=row['Numero'],
+            complemento=row['Complemento'],
+            bairro=row['Bairro'],
+            cidade=row['Cidade'],
+            estado=row['Estado'],
+            cep=row['CEP']
+        )
     
     @staticmethod
     def get_by_id(doador_id: int) -> Optional['Doador']:
@@ -111,43 +168,35 @@ class Doador:
         with DatabaseConnection() as db:
             result = db.fetch_one(query, (doador_id,))
             if result:
-                return Doador(
-                    idDoador=result['idDoador'],
-                    nome=result['Nome'],
-                    telefone=result['Telefone'],
-                    email=result['Email'],
-                    logradouro=result['Logradouro'],
-                    numero=result['Numero'],
-                    complemento=result['Complemento'],
-                    bairro=result['Bairro'],
-                    cidade=result['Cidade'],
-                    estado=result['Estado'],
-                    cep=result['CEP']
-                )
+                return Doador._from_row(result)
         return None
     
     @staticmethod
+    @cached('Doador')
     def get_all() -> List['Doador']:
         """Retorna todos os doadores"""
         query = "SELECT * FROM Doador ORDER BY Nome"
         with DatabaseConnection() as db:
             results = db.fetch_all(query)
-            return [
-                Doador(
-                    idDoador=row['idDoador'],
-                    nome=row['Nome'],
-                    telefone=row['Telefone'],
-                    email=row['Email'],
-                    logradouro=row['Logradouro'],
-                    numero=row['Numero'],
-                    complemento=row['Complemento'],
-                    bairro=row['Bairro'],
-                    cidade=row['Cidade'],
-                    estado=row['Estado'],
-                    cep=row['CEP']
-                )
-                for row in results
-            ]
+            return [Doador._from_row(row) for row in results]
+    
+    @staticmethod
+    @cached('Doador')
+    def get_dataframe() -> pd.DataFrame:
+        """
+        Todos os doadores direto em um DataFrame, com as colunas de to_dict().
+        
+        Não cria objetos Doador: prefira este método para tabelas e gráficos.
+        """
+        query = """
+            SELECT idDoador, Nome AS nome, Telefone AS telefone, Email AS email,
+                   Logradouro AS logradouro, Numero AS numero,
+                   Complemento AS complemento, Bairro AS bairro,
+                   Cidade AS cidade, Estado AS estado, CEP AS cep
+            FROM Doador ORDER BY Nome
+        """
+        with DatabaseConnection() as db:
+            return db.fetch_dataframe(query)
     
     @staticmethod
     def search_by_name(nome: str) -> List['Doador']:
@@ -155,22 +204,71 @@ class Doador:
         query = "SELECT * FROM Doador WHERE Nome LIKE %s ORDER BY Nome"
         with DatabaseConnection() as db:
             results = db.fetch_all(query, (f"%{nome}%",))
-            return [
-                Doador(
-                    idDoador=row['idDoador'],
-                    nome=row['Nome'],
-                    telefone=row['Telefone'],
-                    email=row['Email'],
-                    logradouro=row['Logradouro'],
-                    numero=row['Numero'],
-                    complemento=row['Complemento'],
-                    bairro=row['Bairro'],
-                    cidade=row['Cidade'],
-                    estado=row['Estado'],
-                    cep=row['CEP']
-                )
-                for row in results
-            ]
+            return [Doador._from_row(row) for row in results]
+    
+    # ========================================================================
+    # PRIMEIRA DOAÇÃO (requer add_primeira_doacao_doador.sql)
+    # ========================================================================
+    
+    @staticmethod
+    def registrar_doacao(db: DatabaseConnection, doador_id: int, data_doacao) -> int:
+        """
+        Antecipa Doador.PrimeiraDoacao se data_doacao for mais antiga.
+        
+        Chamado pelo model Doacao ao inserir, na mesma transação.
+        """
+        return db.execute(
+            """
+            UPDATE Doador
+            SET PrimeiraDoacao = LEAST(COALESCE(PrimeiraDoacao, %s), %s)
+            WHERE idDoador = %s
+            """,
+            (data_doacao, data_doacao, doador_id)
+        )
+    
+    @staticmethod
+    def recalcular_primeira_doacao(db: DatabaseConnection, doadores_ids: List[int]) -> int:
+        """
+        Recalcula PrimeiraDoacao dos doadores a partir de Doacao (usa idx_doador).
+        
+        Necessário quando uma doação muda de doador/data ou é removida, pois
+        aí a primeira doação pode ter ficado mais recente (ou deixado de existir).
+        """
+        doadores_ids = [i for i in dict.fromkeys(doadores_ids) if i]
+        if not doadores_ids:
+            return 0
+        marcadores = ", ".join(["%s"] * len(doadores_ids))
+        return db.execute(
+            f"""
+            UPDATE Doador dr
+            SET dr.PrimeiraDoacao = (
+                SELECT MIN(d.DataCriacao) FROM Doacao d
+                WHERE d.Doador_idDoador = dr.idDoador
+            )
+            WHERE dr.idDoador IN ({marcadores})
+            """,
+            tuple(doadores_ids)
+        )
+    
+    @staticmethod
+    def reconstruir_primeira_doacao(db: Optional[DatabaseConnection] = None) -> int:
+        """
+        Backfill: preenche PrimeiraDoacao de todos os doadores em um UPDATE.
+        
+        Returns:
+            int: doadores alterados
+        """
+        with usar_conexao(db) as db:
+            with db.transaction():
+                return db.execute("""
+                    UPDATE Doador dr
+                    LEFT JOIN (
+                        SELECT Doador_idDoador, MIN(DataCriacao) AS Primeira
+                        FROM Doacao
+                        GROUP BY Doador_idDoador
+                    ) p ON p.Doador_idDoador = dr.idDoador
+                    SET dr.PrimeiraDoacao = p.Primeira
+                """)
     
     def to_dict(self) -> Dict:
         """Converte para dicionário"""
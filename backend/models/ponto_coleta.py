@@ -5,14 +5,20 @@ Modelo PontoColeta - Locais de coleta de doações
 from typing import Optional, List, Dict
 import sys
 import os
+import pandas as pd
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from database.connection import DatabaseConnection
+from database.connection import DatabaseConnection, usar_conexao
+from database.cache import cached, query_cache
 
 
 class PontoColeta:
     """Representa um ponto de coleta no sistema"""
     
+    # Sem __dict__ por instância: listas grandes ocupam bem menos memória
+    __slots__ = ('idPontoColeta', 'responsavel', 'logradouro', 'numero', 'complemento',
+                 'bairro', 'cidade', 'estado', 'cep')
+    
     def __init__(self, responsavel: str, logradouro: Optional[str] = None,
                  numero: Optional[str] = None, complemento: Optional[str] = None,
                  bairro: Optional[str] = None, cidade: Optional[str] = None,
@@ -39,7 +45,7 @@ class PontoColeta:
             return False, "Estado deve ter 2 caracteres (UF)"
         return True, ""
     
-    def save(self) -> bool:
+    def save(self, db: Optional[DatabaseConnection] = None) -> bool:
         """Salva novo ponto de coleta"""
         valido, erro = self.validate()
         if not valido:
@@ -54,13 +60,14 @@ class PontoColeta:
         params = (self.responsavel, self.logradouro, self.numero,
                  self.complemento, self.bairro, self.cidade, self.estado, self.cep)
         
-        with DatabaseConnection() as db:
+        with usar_conexao(db) as db:
             if db.execute_query(query, params):
                 self.idPontoColeta = db.get_last_insert_id()
+                db.after_commit(lambda: query_cache.invalidate('PontoColeta'))
                 return True
         return False
     
-    def update(self) -> bool:
+    def update(self, db: Optional[DatabaseConnection] = None) -> bool:
         """Atualiza ponto de coleta existente"""
         if not self.idPontoColeta:
             print("✗ Ponto de coleta não possui ID")
@@ -81,18 +88,39 @@ class PontoColeta:
                  self.complemento, self.bairro, self.cidade, self.estado,
                  self.cep, self.idPontoColeta)
         
-        with DatabaseConnection() as db:
-            return db.execute_query(query, params)
+        with usar_conexao(db) as db:
+            sucesso = db.execute_query(query, params)
+            if sucesso:
+                db.after_commit(lambda: query_cache.invalidate('PontoColeta'))
+        return sucesso
     
-    def delete(self) -> bool:
+    def delete(self, db: Optional[DatabaseConnection] = None) -> bool:
         """Remove ponto de coleta"""
         if not self.idPontoColeta:
             print("✗ Ponto de coleta não possui ID")
             return False
         
         query = "DELETE FROM PontoColeta WHERE idPontoColeta = %s"
-        with DatabaseConnection() as db:
-            return db.execute_query(query, (self.idPontoColeta,))
+        with usar_conexao(db) as db:
+            sucesso = db.execute_query(query, (self.idPontoColeta,))
+            if sucesso:
+                db.after_commit(lambda: query_cache.invalidate('PontoColeta'))
+        return sucesso
+    
+    @staticmethod
+    def _from_row(row: Dict) -> 'PontoColeta':
+        """Monta um PontoColeta a partir de uma linha de SELECT * FROM PontoColeta"""
+        return PontoColeta(
+            idPontoColeta=row['idPontoColeta'],
+            responsavel=row['Responsavel'],
+            logradouro=row['Logradouro'],
+            numero=row['Numero'],
+            complemento=row['Complemento'],
+            bairro=row['Bairro'],
+            cidade=row['Cidade'],
+            estado=row['Estado'],
+            cep=row['CEP']
+        )
     
     @staticmethod
     def get_by_id(ponto_id: int) -> Optional['PontoColeta']:
@@ -101,39 +129,35 @@ class PontoColeta:
         with DatabaseConnection() as db:
             result = db.fetch_one(query, (ponto_id,))
             if result:
-                return PontoColeta(
-                    idPontoColeta=result['idPontoColeta'],
-                    responsavel=result['Responsavel'],
-                    logradouro=result['Logradouro'],
-                    numero=result['Numero'],
-                    complemento=result['Complemento'],
-                    bairro=result['Bairro'],
-                    cidade=result['Cidade'],
-                    estado=result['Estado'],
-                    cep=result['CEP']
-                )
+                return PontoColeta._from_row(result)
         return None
     
     @staticmethod
+    @cached('PontoColeta')
     def get_all() -> List['PontoColeta']:
         """Retorna todos os pontos de coleta"""
         query = "SELECT * FROM PontoColeta ORDER BY Responsavel"
         with DatabaseConnection() as db:
             results = db.fetch_all(query)
-            return [
-                PontoColeta(
-                    idPontoColeta=row['idPontoColeta'],
-                    responsavel=row['Responsavel'],
-                    logradouro=row['Logradouro'],
-                    numero=row['Numero'],
-                    complemento=row['Complemento'],
-                    bairro=row['Bairro'],
-                    cidade=row['Cidade'],
-                    estado=row['Estado'],
-                    cep=row['CEP']
-                )
-                for row in results
-            ]
+            return [PontoColeta._from_row(row) for row in results]
+    
+    @staticmethod
+    @cached('PontoColeta')
+    def get_dataframe() -> pd.DataFrame:
+        """
+        Todos os pontos de coleta direto em um DataFrame, com as colunas de to_dict().
+        
+        Não cria objetos PontoColeta: prefira este método para tabelas e gráficos.
+        """
+        query = """
+            SELECT idPontoColeta, Responsavel AS responsavel,
+                   Logradouro AS logradouro, Numero AS numero,
+                   Complemento AS complemento, Bairro AS bairro,
+                   Cidade AS cidade, Estado AS estado, CEP AS cep
+            FROM PontoColeta ORDER BY Responsavel
+        """
+        with DatabaseConnection() as db:
+            return db.fetch_dataframe(query)
     
     def to_dict(self) -> Dict:
         """Converte para dicionário"""
@@ -0,0 +1,177 @@
+"""
+Modelo ResumoMensalDoacao - Contadores mensais pré-agregados de doações
+
+Uma linha por (Mes, TipoDoacao, Campanha_id, PontoColeta_id) com:
+- TotalDoacoes: doações registradas no mês
+- QuantidadeTotal: soma de Quantidade
+- TotalDistribuidas: quantas dessas já estão com Status "Distribuída"
+
+A tabela é mantida de forma incremental pelo model Doacao: cada escrita
+calcula a diferença (deltas) e aplica com INSERT ... ON DUPLICATE KEY UPDATE
+na mesma transação da escrita. reconstruir() refaz tudo a partir de Doacao
+(backfill: python backend/database/backfill.py resumo_mensal).
+
+Requer a migration add_resumo_mensal_doacoes.sql.
+"""
+
+from typing import Optional, List, Dict, Tuple, Iterable
+from datetime import date, datetime
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.connection import DatabaseConnection, usar_conexao
+
+# (Mes, TipoDoacao, Campanha_id, PontoColeta_id)
+Chave = Tuple[date, str, int, int]
+
+
+class ResumoMensalDoacao:
+    """Acesso e manutenção da tabela ResumoMensalDoacao"""
+    
+    # Colunas de Doacao necessárias para calcular a chave e os contadores
+    # (Doador_idDoador e Unidade são usados pelo model Doacao para manter
+    # Doador.PrimeiraDoacao e ArrecadacaoCampanha)
+    COLUNAS_DOACAO = """
+        DataCriacao, TipoDoacao, CampanhaDoacao_idCampanhaDoacao,
+        PontoColeta_idPontoColeta, Quantidade, Unidade, Status, Doador_idDoador
+    """
+    
+    @staticmethod
+    def chave(data_criacao, tipo_doacao: Optional[str], campanha_id: Optional[int],
+              ponto_coleta_id: Optional[int]) -> Chave:
+        """Chave do resumo para uma doação (mês = primeiro dia do mês)"""
+        if isinstance(data_criacao, str):
+            data_criacao = date.fromisoformat(data_criacao[:10])
+        elif isinstance(data_criacao, datetime):
+            data_criacao = data_criacao.date()
+        data_criacao = data_criacao or date.today()
+        return (
+            data_criacao.replace(day=1),
+            tipo_doacao or '',
+            campanha_id or 0,
+            ponto_coleta_id or 0
+        )
+    
+    @staticmethod
+    def deltas(linhas: Iterable[Dict], sinal: int = 1,
+               acumulado: Optional[Dict[Chave, List]] = None) -> Dict[Chave, List]:
+        """
+        Soma a contribuição de linhas de Doacao (COLUNAS_DOACAO) em um dicionário
+        chave -> [doações, quantidade, distribuídas]. sinal=-1 subtrai.
+        """
+        acumulado = {} if acumulado is None else acumulado
+        for row in linhas:
+            chave = ResumoMensalDoacao.chave(
+                row['DataCriacao'], row.get('TipoDoacao'),
+                row.get('CampanhaDoacao_idCampanhaDoacao'), row.get('PontoColeta_idPontoColeta')
+            )
+            delta = acumulado.setdefault(chave, [0, 0.0, 0])
+            delta[0] += sinal
+            delta[1] += sinal * float(row.get('Quantidade') or 0)
+            delta[2] += sinal * (1 if row.get('Status') == 'Distribuída' else 0)
+        return acumulado
+    
+    @staticmethod
+    def aplicar(db: DatabaseConnection, deltas: Dict[Chave, List]) -> int:
+        """
+        Soma os deltas na tabela (upsert em lote).
+        
+        Deve rodar na mesma transação da escrita em Doacao que os originou.
+        Deltas que se anulam (ex: update sem mudança de chave) são ignorados.
+        """
+        linhas = [
+            (*chave, doacoes, round(quantidade, 2), distribuidas)
+            for chave, (doacoes, quantidade, distribuidas) in deltas.items()
+            if doacoes or distribuidas or round(quantidade, 2)
+        ]
+        return db.executemany(
+            """
+            INSERT INTO ResumoMensalDoacao
+                (Mes, TipoDoacao, Campanha_id, PontoColeta_id,
+                 TotalDoacoes, QuantidadeTotal, TotalDistribuidas)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+                TotalDoacoes = TotalDoacoes + VALUES(TotalDoacoes),
+                QuantidadeTotal = QuantidadeTotal + VALUES(QuantidadeTotal),
+                TotalDistribuidas = TotalDistribuidas + VALUES(TotalDistribuidas)
+            """,
+            linhas
+        )
+    
+    @staticmethod
+    def linhas_doacao(db: DatabaseConnection, doacoes_ids: List[int],
+                      condicao: str = "") -> List[Dict]:
+        """
+        Estado atual (COLUNAS_DOACAO) das doações, com lock de escrita.
+        
+        Chamar dentro da transação, antes de alterar as doações.
+        """
+        if not doacoes_ids:
+            return []
+        marcadores = ", ".join(["%s"] * len(doacoes_ids))
+        query = (
+            f"SELECT {ResumoMensalDoacao.COLUNAS_DOACAO} FROM Doacao "
+            f"WHERE idDoacao IN ({marcadores}) {condicao} FOR UPDATE"
+        )
+        return db.fetch_all(query, tuple(doacoes_ids))
+    
+    @staticmethod
+    def reconstruir(db: Optional[DatabaseConnection] = None) -> int:
+        """
+        Backfill: recalcula a tabela inteira a partir de Doacao em uma transação.
+        
+        Returns:
+            int: quantidade de linhas do resumo
+        """
+        with usar_conexao(db) as db:
+            with db.transaction():
+                db.execute("DELETE FROM ResumoMensalDoacao")
+                return db.execute("""
+                    INSERT INTO ResumoMensalDoacao
+                        (Mes, TipoDoacao, Campanha_id, PontoColeta_id,
+                         TotalDoacoes, QuantidadeTotal, TotalDistribuidas)
+                    SELECT
+                        DATE_FORMAT(DataCriacao, '%Y-%m-01'),
+                        COALESCE(TipoDoacao, ''),
+                        COALESCE(CampanhaDoacao_idCampanhaDoacao, 0),
+                        COALESCE(PontoColeta_idPontoColeta, 0),
+                        COUNT(*),
+                        COALESCE(SUM(Quantidade), 0),
+                        SUM(Status = 'Distribuída')
+                    FROM Doacao
+                    GROUP BY 1, 2, 3, 4
+                """)
+    
+    @staticmethod
+    def serie_mensal(meses: int = 6, db: Optional[DatabaseConnection] = None) -> Dict[str, int]:
+        """
+        Doações por mês ('YYYY-MM' -> total), do mês de hoje - meses até hoje.
+        
+        Lê só algumas linhas por mês da chave primária, sem tocar em Doacao.
+        """
+        query = """
+            SELECT DATE_FORMAT(Mes, '%Y-%m') AS mes, SUM(TotalDoacoes) AS total
+            FROM ResumoMensalDoacao
+            WHERE Mes >= DATE_FORMAT(DATE_SUB(CURDATE(), INTERVAL %s MONTH), '%Y-%m-01')
+            GROUP BY Mes
+            HAVING total > 0
+            ORDER BY Mes ASC
+        """
+        with usar_conexao(db) as db:
+            results = db.fetch_all(query, (meses,))
+        return {row['mes']: int(row['total']) for row in results}
+    
+    @staticmethod
+    def por_tipo(db: Optional[DatabaseConnection] = None) -> Dict[str, int]:
+        """Total de doações por TipoDoacao em todo o histórico"""
+        query = """
+            SELECT TipoDoacao, SUM(TotalDoacoes) AS total
+            FROM ResumoMensalDoacao
+            GROUP BY TipoDoacao
+            HAVING total > 0
+            ORDER BY total DESC
+        """
+        with usar_conexao(db) as db:
+            results = db.fetch_all(query)
+        return {row['TipoDoacao']: int(row['total']) for row in results}
\ No newline at end of file
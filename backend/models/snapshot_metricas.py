@@ -0,0 +1,109 @@
+"""
+Modelo SnapshotMetricas - Série diária dos totais do dashboard
+
+Uma linha por dia com os totais dos cards. Serve para mostrar a variação
+real de cada total (ex: "+23 este mês") lendo uma única linha antiga pela
+chave primária, em vez de recontar as tabelas base em datas passadas.
+
+As linhas são gravadas só pelo job diário (SnapshotService.registrar); o
+dashboard e os relatórios apenas leem a série.
+
+Requer a migration add_snapshot_metricas.sql.
+"""
+
+from typing import Optional, Dict
+from datetime import date, timedelta
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.connection import DatabaseConnection, usar_conexao
+
+
+class SnapshotMetricas:
+    """Acesso à tabela SnapshotMetricas"""
+    
+    # chave usada no dashboard -> coluna da tabela
+    COLUNAS = {
+        'total_doadores': 'TotalDoadores',
+        'total_beneficiarios': 'TotalBeneficiarios',
+        'total_doacoes': 'TotalDoacoes',
+        'campanhas_ativas': 'CampanhasAtivas'
+    }
+    
+    @staticmethod
+    def registrar(totais: Dict[str, int], dia: Optional[date] = None,
+                  db: Optional[DatabaseConnection] = None) -> int:
+        """
+        Grava (ou sobrescreve) os totais do dia.
+        
+        Args:
+            totais: dicionário no formato de DashboardModel._get_totais()
+            dia: data do snapshot (padrão: hoje)
+        """
+        colunas = list(SnapshotMetricas.COLUNAS.values())
+        query = f"""
+            INSERT INTO SnapshotMetricas (Data, {', '.join(colunas)})
+            VALUES (%s{', %s' * len(colunas)})
+            ON DUPLICATE KEY UPDATE {', '.join(f'{c} = VALUES({c})' for c in colunas)}
+        """
+        params = (dia or date.today(), *(int(totais.get(m) or 0) for m in SnapshotMetricas.COLUNAS))
+        with usar_conexao(db) as db:
+            return db.execute(query, params)
+    
+    @staticmethod
+    def em(referencia: date, db: Optional[DatabaseConnection] = None) -> Optional[Dict[str, int]]:
+        """
+        Totais do último snapshot até a data de referência (inclusive).
+        
+        Uma leitura de intervalo na chave primária (LIMIT 1).
+        
+        Returns:
+            dicionário no formato de DashboardModel._get_totais() mais 'data',
+            ou None se não houver snapshot tão antigo
+        """
+        query = f"""
+            SELECT Data, {', '.join(SnapshotMetricas.COLUNAS.values())}
+            FROM SnapshotMetricas
+            WHERE Data <= %s
+            ORDER BY Data DESC
+            LIMIT 1
+        """
+        with usar_conexao(db) as db:
+            row = db.fetch_one(query, (referencia,))
+        if not row:
+            return None
+        snapshot = {metrica: int(row[coluna]) for metrica, coluna in SnapshotMetricas.COLUNAS.items()}
+        snapshot['data'] = row['Data']
+        return snapshot
+    
+    @staticmethod
+    def variacao(totais: Dict[str, int], referencia: date,
+                 db: Optional[DatabaseConnection] = None) -> Dict[str, Dict]:
+        """
+        Variação dos totais atuais em relação ao snapshot de referencia.
+        
+        Returns:
+            métrica -> {'anterior', 'diferenca', 'percentual'}; percentual é None
+            quando o valor anterior é zero. Dicionário vazio se não houver
+            snapshot até a referência.
+        """
+        anterior = SnapshotMetricas.em(referencia, db)
+        if not anterior:
+            return {}
+        variacao = {}
+        for metrica in SnapshotMetricas.COLUNAS:
+            atual, antes = int(totais.get(metrica) or 0), anterior[metrica]
+            variacao[metrica] = {
+                'anterior': antes,
+                'diferenca': atual - antes,
+                'percentual': round((atual - antes) / antes * 100, 1) if antes else None
+            }
+        return variacao
+    
+    @staticmethod
+    def variacao_no_mes(totais: Dict[str, int], hoje: Optional[date] = None,
+                        db: Optional[DatabaseConnection] = None) -> Dict[str, Dict]:
+        """Variação desde o fim do mês anterior ("+23 este mês"), ver variacao()"""
+        hoje = hoje or date.today()
+        return SnapshotMetricas.variacao(totais, hoje.replace(day=1) - timedelta(days=1), db)
@@ -5,14 +5,20 @@ Modelo Voluntario - Pessoas que ajudam nas doações
 from typing import Optional, List, Dict
 import sys
 import os
+import pandas as pd
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from database.connection import DatabaseConnection
+from database.connection import DatabaseConnection, usar_conexao, escapar_like
+from database.cache import cached, query_cache
+from models.chave_busca import ChaveBusca
 
 
 class Voluntario:
     """Representa um voluntário no sistema"""
     
+    # Sem __dict__ por instância: listas grandes ocupam bem menos memória
+    __slots__ = ('idVoluntario', 'nome', 'email', 'telefone')
+    
     def __init__(self, nome: str, email: Optional[str] = None,
                  telefone: Optional[str] = None, idVoluntario: Optional[int] = None):
         self.idVoluntario = idVoluntario
@@ -31,23 +37,24 @@ class Voluntario:
             return False, "Email inválido"
         return True, ""
     
-    def save(self) -> bool:
+    def save(self, db: Optional[DatabaseConnection] = None) -> bool:
         """Salva novo voluntário"""
         valido, erro = self.validate()
         if not valido:
             print(f"✗ Validação falhou: {erro}")
             return False
         
-        query = "INSERT INTO Voluntario (Nome, Email, Telefone) VALUES (%s, %s, %s)"
-        params = (self.nome, self.email, self.telefone)
+        query = "INSERT INTO Voluntario (Nome, Email, Telefone, ChaveBusca) VALUES (%s, %s, %s, %s)"
+        params = (self.nome, self.email, self.telefone, ChaveBusca.gerar(self.nome))
         
-        with DatabaseConnection() as db:
+        with usar_conexao(db) as db:
             if db.execute_query(query, params):
                 self.idVoluntario = db.get_last_insert_id()
+                db.after_commit(lambda: query_cache.invalidate('Voluntario'))
                 return True
         return False
     
-    def update(self) -> bool:
+    def update(self, db: Optional[DatabaseConnection] = None) -> bool:
         """Atualiza voluntário existente"""
         if not self.idVoluntario:
             print("✗ Voluntário não possui ID")
@@ -58,21 +65,37 @@ class Voluntario:
             print(f"✗ Validação falhou: {erro}")
             return False
         
-        query = "UPDATE Voluntario SET Nome = %s, Email = %s, Telefone = %s WHERE idVoluntario = %s"
-        params = (self.nome, self.email, self.telefone, self.idVoluntario)
+        query = "UPDATE Voluntario SET Nome = %s, Email = %s, Telefone = %s, ChaveBusca = %s WHERE idVoluntario = %s"
+        params = (self.nome, self.email, self.telefone, ChaveBusca.gerar(self.nome), self.idVoluntario)
         
-        with DatabaseConnection() as db:
-            return db.execute_query(query, params)
+        with usar_conexao(db) as db:
+            sucesso = db.execute_query(query, params)
+            if sucesso:
+                db.after_commit(lambda: query_cache.invalidate('Voluntario'))
+        return sucesso
     
-    def delete(self) -> bool:
+    def delete(self, db: Optional[DatabaseConnection] = None) -> bool:
         """Remove voluntário"""
         if not self.idVoluntario:
             print("✗ Voluntário não possui ID")
             return False
         
         query = "DELETE FROM Voluntario WHERE idVoluntario = %s"
-        with DatabaseConnection() as db:
-            return db.execute_query(query, (self.idVoluntario,))
+        with usar_conexao(db) as db:
+            sucesso = db.execute_query(query, (self.idVoluntario,))
+            if sucesso:
+                db.after_commit(lambda: query_cache.invalidate('Voluntario'))
+        return sucesso
+    
+    @staticmethod
+    def _from_row(row: Dict) -> 'Voluntario':
+        """Monta um Voluntario a partir de uma linha de SELECT * FROM Voluntario"""
+        return Voluntario(
+            idVoluntario=row['idVoluntario'],
+            nome=row['Nome'],
+            email=row['Email'],
+            telefone=row['Telefone']
+        )
     
     @staticmethod
     def get_by_id(voluntario_id: int) -> Optional['Voluntario']:
@@ -81,29 +104,55 @@ class Voluntario:
         with DatabaseConnection() as db:
             result = db.fetch_one(query, (voluntario_id,))
             if result:
-                return Voluntario(
-                    idVoluntario=result['idVoluntario'],
-                    nome=result['Nome'],
-                    email=result['Email'],
-                    telefone=result['Telefone']
-                )
+                return Voluntario._from_row(result)
         return None
     
     @staticmethod
+    @cached('Voluntario')
     def get_all() -> List['Voluntario']:
         """Retorna todos os voluntários"""
         query = "SELECT * FROM Voluntario ORDER BY Nome"
         with DatabaseConnection() as db:
             results = db.fetch_all(query)
-            return [
-                Voluntario(
-                    idVoluntario=row['idVoluntario'],
-                    nome=row['Nome'],
-                    email=row['Email'],
-                    telefone=row['Telefone']
-                )
-                for row in results
-            ]
+            return [Voluntario._from_row(row) for row in results]
+    
+    @staticmethod
+    def buscar_por_prefixo(prefixo: str = "", limite: int = 20) -> List[Dict]:
+        """
+        Primeiros voluntários cujo nome começa com o prefixo, em ordem alfabética.
+        
+        Usa o índice idx_nome_voluntario (LIKE 'prefixo%' + ORDER BY Nome + LIMIT):
+        o custo não cresce com o tamanho da tabela. Prefixo vazio traz os
+        primeiros nomes.
+        
+        Returns:
+            List[Dict]: no máximo `limite` itens {'id', 'nome'}
+        """
+        query = """
+            SELECT idVoluntario AS id, Nome AS nome
+            FROM Voluntario
+            WHERE Nome LIKE %s
+            ORDER BY Nome
+            LIMIT %s
+        """
+        with DatabaseConnection() as db:
+            return db.fetch_all(query, (f"{escapar_like(prefixo.strip())}%", int(limite)))
+    
+    @staticmethod
+    @cached('Voluntario')
+    def get_dataframe() -> pd.DataFrame:
+        """
+        Todos os voluntários direto em um DataFrame, com as colunas de to_dict().
+        
+        Não cria objetos Voluntario: prefira este método para tabelas e gráficos.
+        """
+        query = """
+            SELECT idVoluntario, Nome AS nome, Email AS email,
+                   Telefone AS telefone
+            FROM Voluntario ORDER BY Nome
+        """
+        with DatabaseConnection() as db:
+            return db.fetch_dataframe(query)
     
     def to_dict(self) -> Dict:
         """Converte para dicionário"""
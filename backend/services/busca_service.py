@@ -0,0 +1,156 @@
+"""
+Serviço de Busca - Busca de doadores, beneficiários e voluntários
+
+Uma única API para as páginas de cadastro:
+
+    BuscaService.search('doador', 'maria 9988', limite=50)
+
+A busca usa os índices FULLTEXT com parser ngram criados pela migration
+add_indices_busca.sql (Nome, Email e Telefone; só Nome em Beneficiario):
+- cada palavra digitada precisa aparecer em alguma das colunas, em qualquer
+  posição ("silva" encontra "Maria da Silva", "1234" encontra o telefone)
+- a collation utf8mb4_unicode_ci ignora maiúsculas e acentos ("jose" = "José")
+- resultados ordenados por relevância, com os nomes que começam pelo texto
+  digitado primeiro, e limitados a `limite` linhas
+
+Antes do FULLTEXT, a busca procura a chave fonética do texto (ChaveBusca,
+migration add_chave_busca.sql) no índice idx_chave_busca_*: "Joao da Silva"
+encontra "JOÃO SILVA" por igualdade ou prefixo da chave. Esses resultados
+vêm primeiro (igualdade antes de prefixo).
+
+Palavras com menos de TAMANHO_MINIMO letras não formam ngram; se nenhuma
+palavra tiver esse tamanho, a busca fica só com a chave fonética (ou, sem
+chave, vira um prefixo do nome em idx_nome_*).
+"""
+
+import re
+import sys
+import os
+from typing import List, Optional
+import pandas as pd
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.connection import DatabaseConnection, usar_conexao, escapar_like
+from models.chave_busca import ChaveBusca
+
+
+class BuscaService:
+    """Busca ranqueada nos cadastros"""
+    
+    # entidade -> tabela, colunas do SELECT (as mesmas de get_dataframe())
+    # e colunas do índice FULLTEXT
+    ENTIDADES = {
+        'doador': {
+            'tabela': 'Doador',
+            'id': 'idDoador',
+            'select': """idDoador, Nome AS nome, Telefone AS telefone, Email AS email,
+                   Logradouro AS logradouro, Numero AS numero,
+                   Complemento AS complemento, Bairro AS bairro,
+                   Cidade AS cidade, Estado AS estado, CEP AS cep""",
+            'fulltext': ('Nome', 'Email', 'Telefone')
+        },
+        'beneficiario': {
+            'tabela': 'Beneficiario',
+            'id': 'idBeneficiario',
+            'select': """idBeneficiario, Nome AS nome, Idade AS idade,
+                   Genero AS genero, Descricao AS descricao""",
+            'fulltext': ('Nome',)
+        },
+        'voluntario': {
+            'tabela': 'Voluntario',
+            'id': 'idVoluntario',
+            'select': """idVoluntario, Nome AS nome, Email AS email,
+                   Telefone AS telefone""",
+            'fulltext': ('Nome', 'Email', 'Telefone')
+        }
+    }
+    
+    # ngram_token_size padrão do MySQL
+    TAMANHO_MINIMO = 2
+    
+    LIMITE_PADRAO = 50
+    
+    @staticmethod
+    def _termos(texto: str) -> List[str]:
+        """Palavras do texto (letras e dígitos), sem os operadores do modo booleano"""
+        return re.findall(r'\w+', texto or '')
+    
+    @staticmethod
+    def _consulta_booleana(termos: List[str]) -> str:
+        """'maria da 9988' -> '+"maria" +"9988"' (palavras obrigatórias, sem as partículas)"""
+        return ' '.join(
+            f'+"{t}"' for t in termos
+            if len(t) >= BuscaService.TAMANHO_MINIMO and t.upper() not in ChaveBusca.STOPWORDS
+        )
+    
+    @staticmethod
+    def search(entidade: str, texto: str, limite: int = LIMITE_PADRAO,
+               db: Optional[DatabaseConnection] = None) -> pd.DataFrame:
+        """
+        Busca ranqueada em uma entidade.
+        
+        Args:
+            entidade: 'doador', 'beneficiario' ou 'voluntario'
+            texto: o que foi digitado (nome, parte do email ou do telefone)
+            limite: máximo de linhas
+        
+        Returns:
+            DataFrame com as colunas de get_dataframe() da entidade mais
+            'relevancia' (nota do FULLTEXT; 0 nos achados pela chave),
+            do mais relevante para o menos relevante
+        
+        Raises:
+            ValueError: entidade desconhecida
+        """
+        config = BuscaService.ENTIDADES.get(entidade)
+        if config is None:
+            raise ValueError(f"Entidade de busca desconhecida: {entidade}")
+        
+        texto = (texto or '').strip()
+        prefixo = f"{escapar_like(texto)}%"
+        chave = ChaveBusca.gerar(texto)
+        consulta = BuscaService._consulta_booleana(BuscaService._termos(texto))
+        
+        # (query, params); 'prioridade' ordena entre as consultas e é descartada no fim
+        consultas = []
+        if chave:
+            consultas.append((f"""
+                SELECT {config['select']}, 0 AS relevancia,
+                       2 + (ChaveBusca = %s) AS prioridade
+                FROM {config['tabela']}
+                WHERE ChaveBusca LIKE %s
+                ORDER BY Nome
+                LIMIT %s
+            """, (chave, f"{escapar_like(chave)}%", int(limite))))
+        if consulta:
+            match = f"MATCH({', '.join(config['fulltext'])}) AGAINST (%s IN BOOLEAN MODE)"
+            consultas.append((f"""
+                SELECT {config['select']}, {match} AS relevancia,
+                       (Nome LIKE %s) AS prioridade
+                FROM {config['tabela']}
+                WHERE {match}
+                ORDER BY prioridade DESC, relevancia DESC, Nome
+                LIMIT %s
+            """, (consulta, prefixo, consulta, int(limite))))
+        if not consultas:
+            # Nada a buscar por chave nem por FULLTEXT: prefixo no nome
+            consultas.append((f"""
+                SELECT {config['select']}, 0 AS relevancia, 0 AS prioridade
+                FROM {config['tabela']}
+                WHERE Nome LIKE %s
+                ORDER BY Nome
+                LIMIT %s
+            """, (prefixo, int(limite))))
+        
+        with usar_conexao(db) as db:
+            partes = [db.fetch_dataframe(query, params) for query, params in consultas]
+        
+        resultado = pd.concat(partes, ignore_index=True) if len(partes) > 1 else partes[0]
+        return (
+            resultado
+            .sort_values(['prioridade', 'relevancia'], ascending=False, kind='stable')
+            .drop_duplicates(subset=config['id'])
+            .head(limite)
+            .drop(columns='prioridade')
+            .reset_index(drop=True)
+        )
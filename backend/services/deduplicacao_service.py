@@ -0,0 +1,365 @@
+"""
+Serviço de Deduplicação - Cadastros repetidos de doadores e beneficiários
+
+Pessoas cadastradas duas vezes inflam os totais do dashboard e dividem o
+histórico de doações. sugestoes() encontra pares prováveis em três etapas:
+
+1. blocagem: cada cadastro entra em poucos blocos pela chave normalizada do
+   nome (ChaveBusca), primeiro + último nome, telefone, email e CEP
+   (doadores). Só pares que dividem algum bloco são comparados, então o
+   custo cresce com o número de cadastros, não com o seu quadrado. Blocos
+   maiores que MAX_BLOCO (nomes muito comuns) usam janela deslizante sobre
+   os nomes ordenados.
+2. pontuação: similaridade dos nomes (difflib, palavras em ordem
+   alfabética, com os limites rápidos real_quick_ratio/quick_ratio antes do
+   cálculo completo) mais os sinais de contato ou idade/gênero.
+3. corte: pares com pontuação >= limiar, do mais para o menos provável.
+
+mesclar_doadores() e mesclar_beneficiarios() juntam um par em uma única
+transação: completam os campos vazios do cadastro mantido, repontam
+Doacao/Recebe para ele e apagam o repetido.
+
+Uso:
+    python backend/services/deduplicacao_service.py doador
+    python backend/services/deduplicacao_service.py beneficiario --limiar 0.9
+    python backend/services/deduplicacao_service.py doador --mesclar 12 57
+
+Requer a migration add_chave_busca.sql (chaves ausentes são calculadas na hora).
+"""
+
+import re
+import sys
+import os
+import argparse
+from collections import defaultdict
+from difflib import SequenceMatcher
+from functools import lru_cache
+from itertools import combinations
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+import pandas as pd
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.connection import DatabaseConnection, usar_conexao
+from database.cache import query_cache
+from models.chave_busca import ChaveBusca
+
+
+class DeduplicacaoService:
+    """Sugestões de cadastros duplicados e mesclagem"""
+    
+    LIMIAR_PADRAO = 0.9
+    
+    # Blocos maiores são comparados só com os JANELA vizinhos em ordem de nome
+    MAX_BLOCO = 50
+    JANELA = 10
+    
+    # Bônus por contato igual e desconto por contato diferente (doadores)
+    BONUS_CONTATO = 0.15
+    DESCONTO_CONFLITO = 0.2
+    
+    # entidade -> SELECT com as colunas usadas na blocagem e na pontuação
+    CONSULTAS = {
+        'doador': """
+            SELECT idDoador AS id, Nome AS nome, ChaveBusca AS chave,
+                   Telefone AS telefone, Email AS email, CEP AS cep
+            FROM Doador
+        """,
+        'beneficiario': """
+            SELECT idBeneficiario AS id, Nome AS nome, ChaveBusca AS chave,
+                   Idade AS idade, Genero AS genero
+            FROM Beneficiario
+        """
+    }
+    
+    # ========================================================================
+    # NORMALIZAÇÃO E BLOCAGEM
+    # ========================================================================
+    
+    @staticmethod
+    def _digitos(texto: Optional[str]) -> str:
+        return re.sub(r'\D', '', texto or '')
+    
+    @staticmethod
+    def _registro(row: Dict) -> Dict:
+        """Linha do banco com os campos normalizados usados na comparação"""
+        palavras = [p for p in ChaveBusca.normalizar(row['nome']) if p not in ChaveBusca.STOPWORDS]
+        chave = row.get('chave') or ChaveBusca.gerar(row['nome'])
+        telefone = DeduplicacaoService._digitos(row.get('telefone'))
+        cep = DeduplicacaoService._digitos(row.get('cep'))
+        return {
+            **row,
+            'chave': chave,
+            # palavras em ordem alfabética: "Silva Maria" == "Maria Silva"
+            'nome_normalizado': ' '.join(sorted(palavras)),
+            'telefone': telefone[-8:] if len(telefone) >= 8 else '',
+            'email': (row.get('email') or '').strip().lower(),
+            'cep': cep if len(cep) == 8 else ''
+        }
+    
+    @staticmethod
+    def _blocos(registro: Dict) -> Iterator[Tuple[str, str]]:
+        """Chaves de bloco de um registro (tipo, valor)"""
+        codigos = registro['chave'].split()
+        if codigos:
+            yield 'nome', registro['chave']
+            yield 'extremos', f"{codigos[0]} {codigos[-1]}"
+        if registro.get('telefone'):
+            yield 'telefone', registro['telefone']
+        if registro.get('email'):
+            yield 'email', registro['email']
+        if registro.get('cep') and codigos:
+            # CEP sozinho junta a rua inteira; com o primeiro nome, só homônimos
+            yield 'cep', f"{registro['cep']} {codigos[0]}"
+    
+    @staticmethod
+    def _pares_candidatos(registros: List[Dict]) -> Set[Tuple[int, int]]:
+        """Pares de índices (i < j) que dividem pelo menos um bloco"""
+        blocos: Dict[Tuple[str, str], List[int]] = defaultdict(list)
+        for indice, registro in enumerate(registros):
+            for bloco in set(DeduplicacaoService._blocos(registro)):
+                blocos[bloco].append(indice)
+        
+        pares = set()
+        for membros in blocos.values():
+            if len(membros) < 2:
+                continue
+            if len(membros) <= DeduplicacaoService.MAX_BLOCO:
+                pares.update(combinations(membros, 2))
+                continue
+            # Sorted neighbourhood: vizinhos próximos na ordem do nome
+            membros = sorted(membros, key=lambda i: registros[i]['nome_normalizado'])
+            for posicao, i in enumerate(membros):
+                for j in membros[posicao + 1:posicao + 1 + DeduplicacaoService.JANELA]:
+                    pares.add((min(i, j), max(i, j)))
+        return pares
+    
+    # ========================================================================
+    # PONTUAÇÃO
+    # ========================================================================
+    
+    @staticmethod
+    @lru_cache(maxsize=200_000)
+    def similaridade(a: str, b: str, minimo: float = 0.0) -> float:
+        """
+        Similaridade entre 0 e 1 de dois nomes normalizados.
+        
+        Devolve 0 sem o cálculo completo quando os limites superiores baratos
+        (real_quick_ratio, quick_ratio) já ficam abaixo de `minimo`. Nomes
+        comuns se repetem em muitos pares, então o resultado fica em cache.
+        """
+        if a == b:
+            return 1.0
+        matcher = SequenceMatcher(None, a, b, autojunk=False)
+        if matcher.real_quick_ratio() < minimo or matcher.quick_ratio() < minimo:
+            return 0.0
+        return matcher.ratio()
+    
+    @staticmethod
+    def _pontuar(entidade: str, a: Dict, b: Dict, limiar: float) -> Tuple[float, List[str]]:
+        """Pontuação do par (0 a 1) e os motivos"""
+        motivos = []
+        if entidade == 'doador':
+            sinais = [c for c in ('telefone', 'email', 'cep') if a[c] and a[c] == b[c]]
+            # homônimos: telefone/email preenchidos nos dois e diferentes
+            conflitos = [c for c in ('telefone', 'email') if a[c] and b[c] and a[c] != b[c]]
+            bonus = (DeduplicacaoService.BONUS_CONTATO * len(sinais)
+                     - DeduplicacaoService.DESCONTO_CONFLITO * len(conflitos))
+            motivos.extend(f"{c} igual" for c in sinais)
+        else:
+            bonus = 0.0
+            if a.get('idade') is not None and b.get('idade') is not None:
+                diferenca = abs(int(a['idade']) - int(b['idade']))
+                if diferenca <= 1:
+                    bonus += 0.1
+                    motivos.append("idade próxima")
+                elif diferenca > 2:
+                    bonus -= 0.2
+            if a.get('genero') and b.get('genero') and a['genero'] != b['genero']:
+                bonus -= 0.2
+        
+        # Nem com nomes idênticos o par chegaria ao limiar
+        if 1.0 + bonus < limiar:
+            return 0.0, motivos
+        
+        nome = DeduplicacaoService.similaridade(
+            a['nome_normalizado'], b['nome_normalizado'], minimo=limiar - bonus
+        )
+        if not nome:
+            return 0.0, motivos
+        motivos.insert(0, f"nome {nome:.0%} parecido")
+        return min(1.0, max(0.0, nome + bonus)), motivos
+    
+    @staticmethod
+    def sugestoes(entidade: str, limiar: float = LIMIAR_PADRAO,
+                  db: Optional[DatabaseConnection] = None) -> pd.DataFrame:
+        """
+        Pares de cadastros provavelmente duplicados.
+        
+        Args:
+            entidade: 'doador' ou 'beneficiario'
+            limiar: pontuação mínima (0 a 1)
+        
+        Returns:
+            DataFrame com manter_id, remover_id, nome_manter, nome_remover,
+            pontuacao e motivos, da maior para a menor pontuação. O cadastro
+            mais antigo (menor id) é sugerido para ser mantido.
+        
+        Raises:
+            ValueError: entidade desconhecida
+        """
+        if entidade not in DeduplicacaoService.CONSULTAS:
+            raise ValueError(f"Entidade sem deduplicação: {entidade}")
+        
+        with usar_conexao(db) as db:
+            linhas = db.fetch_all(DeduplicacaoService.CONSULTAS[entidade])
+        registros = [DeduplicacaoService._registro(row) for row in linhas]
+        
+        sugestoes = []
+        for i, j in DeduplicacaoService._pares_candidatos(registros):
+            a, b = sorted((registros[i], registros[j]), key=lambda r: r['id'])
+            pontuacao, motivos = DeduplicacaoService._pontuar(entidade, a, b, limiar)
+            if pontuacao >= limiar:
+                sugestoes.append({
+                    'manter_id': a['id'],
+                    'remover_id': b['id'],
+                    'nome_manter': a['nome'],
+                    'nome_remover': b['nome'],
+                    'pontuacao': round(pontuacao, 3),
+                    'motivos': ', '.join(motivos)
+                })
+        
+        colunas = ['manter_id', 'remover_id', 'nome_manter', 'nome_remover', 'pontuacao', 'motivos']
+        return (
+            pd.DataFrame(sugestoes, columns=colunas)
+            .sort_values(['pontuacao', 'manter_id'], ascending=[False, True])
+            .reset_index(drop=True)
+        )
+    
+    # ========================================================================
+    # MESCLAGEM
+    # ========================================================================
+    
+    @staticmethod
+    def _mesclar(db: Optional[DatabaseConnection], tabela: str, coluna_id: str,
+                 manter_id: int, remover_id: int, comandos: Iterable[Tuple[str, Tuple]],
+                 namespaces: Iterable[str]) -> bool:
+        """
+        Executa a mesclagem em uma transação: trava os dois cadastros, roda os
+        comandos (query, params) e apaga o repetido.
+        """
+        if manter_id == remover_id:
+            print("✗ Não é possível mesclar um cadastro com ele mesmo")
+            return False
+        
+        with usar_conexao(db) as db:
+            try:
+                with db.transaction():
+                    encontrados = db.fetch_all(
+                        f"SELECT {coluna_id} FROM {tabela} WHERE {coluna_id} IN (%s, %s) FOR UPDATE",
+                        (manter_id, remover_id)
+                    )
+                    if len(encontrados) != 2:
+                        raise ValueError(f"{tabela} {manter_id} ou {remover_id} não existe")
+                    for query, params in comandos:
+                        db.execute(query, params)
+                    db.execute(f"DELETE FROM {tabela} WHERE {coluna_id} = %s", (remover_id,))
+                    for namespace in namespaces:
+                        db.after_commit(lambda ns=namespace: query_cache.invalidate(ns))
+                return True
+            except Exception as e:
+                if db.in_transaction:
+                    raise
+                print(f"✗ Erro ao mesclar {tabela} {remover_id} em {manter_id}: {e}")
+                return False
+    
+    @staticmethod
+    def mesclar_doadores(manter_id: int, remover_id: int,
+                         db: Optional[DatabaseConnection] = None) -> bool:
+        """
+        Junta o doador remover_id ao manter_id.
+        
+        Campos vazios do mantido são completados com os do repetido, as doações
+        passam para o mantido (PrimeiraDoacao fica com a menor das duas) e o
+        repetido é apagado. Tudo ou nada.
+        """
+        comandos = [
+            ("""
+            UPDATE Doador m JOIN Doador r ON r.idDoador = %s
+            SET m.Telefone = COALESCE(m.Telefone, r.Telefone),
+                m.Email = COALESCE(m.Email, r.Email),
+                m.Logradouro = COALESCE(m.Logradouro, r.Logradouro),
+                m.Numero = COALESCE(m.Numero, r.Numero),
+                m.Complemento = COALESCE(m.Complemento, r.Complemento),
+                m.Bairro = COALESCE(m.Bairro, r.Bairro),
+                m.Cidade = COALESCE(m.Cidade, r.Cidade),
+                m.Estado = COALESCE(m.Estado, r.Estado),
+                m.CEP = COALESCE(m.CEP, r.CEP),
+                m.PrimeiraDoacao = LEAST(COALESCE(m.PrimeiraDoacao, r.PrimeiraDoacao),
+                                         COALESCE(r.PrimeiraDoacao, m.PrimeiraDoacao))
+            WHERE m.idDoador = %s
+            """, (remover_id, manter_id)),
+            ("UPDATE Doacao SET Doador_idDoador = %s WHERE Doador_idDoador = %s",
+             (manter_id, remover_id))
+        ]
+        return DeduplicacaoService._mesclar(
+            db, 'Doador', 'idDoador', manter_id, remover_id, comandos, ('Doador', 'Relatorio')
+        )
+    
+    @staticmethod
+    def mesclar_beneficiarios(manter_id: int, remover_id: int,
+                              db: Optional[DatabaseConnection] = None) -> bool:
+        """
+        Junta o beneficiário remover_id ao manter_id.
+        
+        Campos vazios do mantido são completados com os do repetido, as
+        entregas (Recebe) passam para o mantido (doações recebidas pelos dois
+        ficam uma vez só) e o repetido é apagado. Tudo ou nada.
+        """
+        comandos = [
+            ("""
+            UPDATE Beneficiario m JOIN Beneficiario r ON r.idBeneficiario = %s
+            SET m.Idade = COALESCE(m.Idade, r.Idade),
+                m.Genero = COALESCE(m.Genero, r.Genero),
+                m.Descricao = COALESCE(m.Descricao, r.Descricao)
+            WHERE m.idBeneficiario = %s
+            """, (remover_id, manter_id)),
+            # IGNORE: doação entregue aos dois já existe para o mantido; a linha
+            # que sobra do repetido sai pelo ON DELETE CASCADE de Recebe
+            ("UPDATE IGNORE Recebe SET Beneficiario_idBeneficiario = %s WHERE Beneficiario_idBeneficiario = %s",
+             (manter_id, remover_id))
+        ]
+        return DeduplicacaoService._mesclar(
+            db, 'Beneficiario', 'idBeneficiario', manter_id, remover_id, comandos,
+            ('Beneficiario', 'Relatorio')
+        )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Sugere e mescla cadastros duplicados")
+    parser.add_argument('entidade', choices=list(DeduplicacaoService.CONSULTAS))
+    parser.add_argument('--limiar', type=float, default=DeduplicacaoService.LIMIAR_PADRAO,
+                        help="pontuação mínima das sugestões (0 a 1)")
+    parser.add_argument('--mesclar', nargs=2, type=int, metavar=('MANTER', 'REMOVER'),
+                        help="mescla o cadastro REMOVER em MANTER em vez de listar sugestões")
+    args = parser.parse_args(argv)
+    
+    if args.mesclar:
+        mesclar = (DeduplicacaoService.mesclar_doadores if args.entidade == 'doador'
+                   else DeduplicacaoService.mesclar_beneficiarios)
+        manter_id, remover_id = args.mesclar
+        if not mesclar(manter_id, remover_id):
+            return 1
+        print(f"✓ {args.entidade} {remover_id} mesclado em {manter_id}")
+        return 0
+    
+    sugestoes = DeduplicacaoService.sugestoes(args.entidade, args.limiar)
+    if sugestoes.empty:
+        print("Nenhum cadastro duplicado encontrado")
+    else:
+        print(sugestoes.to_string(index=False))
+        print(f"\n{len(sugestoes)} par(es) sugerido(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,248 @@
+"""
+Serviço de Exportação - Relatórios da página de relatórios em Excel ou CSV
+
+As tabelas de cada tipo de relatório (PLANILHAS_POR_TIPO) são lidas do
+MySQL em blocos de TAMANHO_BLOCO linhas (DatabaseConnection.fetch_chunks)
+e escritas direto no arquivo, linha a linha:
+- Excel: openpyxl em modo write_only, uma aba por tabela, mais uma aba
+  "Relatório" com o tipo, o período e a data de geração
+- CSV: uma tabela por arquivo, separador ";" e vírgula decimal (abre
+  direto no Excel em português)
+
+Nenhuma tabela passa por um DataFrame, então a memória não depende do
+número de doações do período (a aba "Doações" traz todas elas). As
+consultas são as mesmas do RelatorioService (consulta_*), com os mesmos
+filtros de período.
+
+A página grava o arquivo em disco (utils/cache.py, arquivo_relatorio) com
+(relatório, período, versão dos dados) no nome: baixar de novo não refaz
+as consultas enquanto nada for gravado.
+
+Uso:
+    python backend/services/exportacao_service.py "Visão Geral" 2024-01-01 2024-06-30 relatorio.xlsx
+    python backend/services/exportacao_service.py Doações 2024-01-01 2024-06-30 doacoes.csv --tabela doacoes
+
+Arquivos .xlsx requerem o pacote openpyxl.
+"""
+
+import csv
+import io
+import sys
+import os
+import argparse
+from datetime import date, datetime
+from decimal import Decimal
+from typing import BinaryIO, Iterator, List, Optional
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.connection import DatabaseConnection, usar_conexao
+from models.chave_busca import ChaveBusca
+from services.relatorio_service import RelatorioService
+
+
+class ExportacaoService:
+    """Exportação dos relatórios lendo e escrevendo em blocos"""
+    
+    TAMANHO_BLOCO = 2000
+    
+    FORMATOS = ('xlsx', 'csv')
+    
+    # tabela -> (título da aba, [(coluna do SELECT, cabeçalho no arquivo)])
+    PLANILHAS = {
+        'doacoes': ("Doações", [
+            ('idDoacao', 'ID'), ('data_criacao', 'Data'), ('data_entrega', 'Data de Entrega'),
+            ('doador', 'Doador'), ('tipo_doacao', 'Tipo'), ('descricao_item', 'Item'),
+            ('quantidade', 'Quantidade'), ('unidade', 'Unidade'), ('status', 'Status'),
+            ('campanha', 'Campanha'), ('ponto_coleta', 'Ponto de Coleta')
+        ]),
+        'por_tipo': ("Por Tipo", [
+            ('tipo_doacao', 'Tipo'), ('total', 'Doações'), ('quantidade', 'Quantidade')
+        ]),
+        'mensal': ("Por Mês", [
+            ('mes', 'Mês'), ('total', 'Doações'), ('quantidade', 'Quantidade')
+        ]),
+        'ranking_doadores': ("Doadores Ativos", [
+            ('nome', 'Nome'), ('total_doacoes', 'Total de Doações'),
+            ('quantidade_total', 'Quantidade Total'), ('email', 'Email'), ('telefone', 'Telefone')
+        ]),
+        'novos_doadores': ("Novos Doadores", [
+            ('mes', 'Mês'), ('novos_doadores', 'Novos Doadores')
+        ]),
+        'campanhas': ("Campanhas", [
+            ('nome', 'Campanha'), ('data_inicio', 'Data Início'), ('data_termino', 'Data Término'),
+            ('meta', 'Meta'), ('arrecadado', 'Arrecadado'), ('tipo_meta', 'Unidade da Meta'),
+            ('total_doacoes', 'Doações no Período'), ('descricao', 'Descrição')
+        ]),
+        'beneficiarios': ("Beneficiários", [
+            ('nome', 'Nome'), ('idade', 'Idade'), ('genero', 'Gênero'),
+            ('total_recebido', 'Doações Recebidas'), ('descricao', 'Descrição')
+        ])
+    }
+    
+    # Tabelas exportadas para cada tipo de relatório (as chaves de
+    # RelatorioService.SECOES_POR_TIPO), na ordem das abas
+    PLANILHAS_POR_TIPO = {
+        'Visão Geral': ('doacoes', 'por_tipo', 'mensal', 'ranking_doadores',
+                        'novos_doadores', 'campanhas', 'beneficiarios'),
+        'Doações': ('doacoes', 'por_tipo', 'mensal'),
+        'Doadores': ('ranking_doadores', 'novos_doadores'),
+        'Beneficiários': ('beneficiarios',),
+        'Campanhas': ('campanhas',)
+    }
+    
+    @staticmethod
+    def _consulta(tabela: str, data_inicio: Optional[date], data_fim: Optional[date], limite: int):
+        """(query, params) da tabela, via RelatorioService.consulta_*"""
+        consultas = {
+            'doacoes': lambda: RelatorioService.consulta_doacoes_periodo(data_inicio, data_fim),
+            'por_tipo': lambda: RelatorioService.consulta_doacoes_por_tipo(data_inicio, data_fim),
+            'mensal': lambda: RelatorioService.consulta_doacoes_mensais(data_inicio, data_fim),
+            'ranking_doadores': lambda: RelatorioService.consulta_ranking_doadores(limite, data_inicio, data_fim),
+            'novos_doadores': lambda: RelatorioService.consulta_novos_doadores_mensais(data_inicio, data_fim),
+            'campanhas': lambda: RelatorioService.consulta_resumo_campanhas(data_inicio, data_fim),
+            'beneficiarios': lambda: RelatorioService.consulta_beneficiarios_atendidos(limite, data_inicio, data_fim)
+        }
+        return consultas[tabela]()
+    
+    @staticmethod
+    def _linhas(db: DatabaseConnection, tabela: str, data_inicio: Optional[date],
+                data_fim: Optional[date], limite: int) -> Iterator[List]:
+        """Linhas da tabela na ordem das colunas de PLANILHAS, lidas em blocos"""
+        query, params = ExportacaoService._consulta(tabela, data_inicio, data_fim, limite)
+        colunas = [coluna for coluna, _ in ExportacaoService.PLANILHAS[tabela][1]]
+        for bloco in db.fetch_chunks(query, tuple(params), ExportacaoService.TAMANHO_BLOCO):
+            for row in bloco:
+                yield [float(v) if isinstance(v, Decimal) else v for v in (row[c] for c in colunas)]
+    
+    @staticmethod
+    def tabelas(tipo: str) -> tuple:
+        """
+        Tabelas exportadas para o tipo de relatório.
+        
+        Raises:
+            ValueError: tipo desconhecido
+        """
+        if tipo not in ExportacaoService.PLANILHAS_POR_TIPO:
+            raise ValueError(f"Tipo de relatório desconhecido: {tipo}")
+        return ExportacaoService.PLANILHAS_POR_TIPO[tipo]
+    
+    @staticmethod
+    def nome_arquivo(tipo: str, data_inicio: date, data_fim: date, formato: str,
+                     tabela: Optional[str] = None) -> str:
+        """'Visão Geral' -> relatorio_visao_geral_20240101_20240630.xlsx"""
+        partes = ['relatorio', *ChaveBusca.normalizar(tipo)]
+        if formato == 'csv' and tabela:
+            partes.append(tabela)
+        partes += [data_inicio.strftime('%Y%m%d'), data_fim.strftime('%Y%m%d')]
+        return '_'.join(partes).lower() + f".{formato}"
+    
+    @staticmethod
+    def _escrever_xlsx(destino: BinaryIO, db: DatabaseConnection, tipo: str,
+                       data_inicio: date, data_fim: date, limite: int) -> int:
+        try:
+            from openpyxl import Workbook
+            from openpyxl.cell import WriteOnlyCell
+        except ImportError:
+            raise ValueError("Exportar .xlsx requer o pacote openpyxl (pip install openpyxl)")
+        
+        # write_only: cada linha vai para um arquivo temporário ao ser adicionada
+        livro = Workbook(write_only=True)
+        capa = livro.create_sheet("Relatório")
+        capa.append(["Relatório", tipo])
+        capa.append(["Período", f"{data_inicio.strftime('%d/%m/%Y')} a {data_fim.strftime('%d/%m/%Y')}"])
+        capa.append(["Gerado em", datetime.now().strftime('%d/%m/%Y %H:%M')])
+        
+        total = 0
+        for tabela in ExportacaoService.tabelas(tipo):
+            titulo, colunas = ExportacaoService.PLANILHAS[tabela]
+            aba = livro.create_sheet(titulo)
+            aba.append([cabecalho for _, cabecalho in colunas])
+            for linha in ExportacaoService._linhas(db, tabela, data_inicio, data_fim, limite):
+                for i, valor in enumerate(linha):
+                    if isinstance(valor, date):
+                        linha[i] = WriteOnlyCell(aba, value=valor)
+                        linha[i].number_format = 'DD/MM/YYYY'
+                aba.append(linha)
+                total += 1
+        livro.save(destino)
+        return total
+    
+    @staticmethod
+    def _escrever_csv(destino: BinaryIO, db: DatabaseConnection, tabela: str,
+                      data_inicio: date, data_fim: date, limite: int) -> int:
+        texto = io.TextIOWrapper(destino, encoding='utf-8-sig', newline='')
+        escritor = csv.writer(texto, delimiter=';')
+        escritor.writerow([cabecalho for _, cabecalho in ExportacaoService.PLANILHAS[tabela][1]])
+        
+        total = 0
+        for linha in ExportacaoService._linhas(db, tabela, data_inicio, data_fim, limite):
+            escritor.writerow([
+                valor.strftime('%d/%m/%Y') if isinstance(valor, date)
+                else str(valor).replace('.', ',') if isinstance(valor, float)
+                else valor
+                for valor in linha
+            ])
+            total += 1
+        texto.flush()
+        texto.detach()  # o destino continua aberto para o chamador
+        return total
+    
+    @staticmethod
+    def exportar(destino: BinaryIO, tipo: str, data_inicio: date, data_fim: date,
+                 formato: str = 'xlsx', tabela: Optional[str] = None,
+                 limite: int = RelatorioService.LIMITE_PADRAO,
+                 db: Optional[DatabaseConnection] = None) -> int:
+        """
+        Escreve o relatório em `destino`.
+        
+        Args:
+            destino: arquivo aberto em modo binário (ou io.BytesIO)
+            tipo: tipo de relatório da página (chave de PLANILHAS_POR_TIPO)
+            formato: 'xlsx' (todas as tabelas do tipo, uma por aba) ou
+                     'csv' (só `tabela`)
+            tabela: tabela do CSV (padrão: a primeira do tipo)
+            limite: linhas dos rankings, as mesmas de RelatorioService.gerar()
+        
+        Returns:
+            int: linhas de dados escritas (sem cabeçalhos)
+        
+        Raises:
+            ValueError: tipo, formato ou tabela desconhecidos; openpyxl ausente
+        """
+        tabelas = ExportacaoService.tabelas(tipo)
+        if formato not in ExportacaoService.FORMATOS:
+            raise ValueError(f"Formato de exportação desconhecido: {formato}")
+        tabela = tabela or tabelas[0]
+        if tabela not in tabelas:
+            raise ValueError(f"A tabela {tabela} não faz parte do relatório {tipo}")
+        
+        with usar_conexao(db) as db:
+            if formato == 'xlsx':
+                return ExportacaoService._escrever_xlsx(destino, db, tipo, data_inicio, data_fim, limite)
+            return ExportacaoService._escrever_csv(destino, db, tabela, data_inicio, data_fim, limite)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Exporta um relatório em Excel ou CSV")
+    parser.add_argument('tipo', choices=list(ExportacaoService.PLANILHAS_POR_TIPO))
+    parser.add_argument('inicio', type=date.fromisoformat, help="data inicial (aaaa-mm-dd)")
+    parser.add_argument('fim', type=date.fromisoformat, help="data final (aaaa-mm-dd)")
+    parser.add_argument('arquivo', help="arquivo de saída (.xlsx ou .csv)")
+    parser.add_argument('--tabela', choices=list(ExportacaoService.PLANILHAS),
+                        help="tabela do CSV (padrão: a primeira do relatório)")
+    args = parser.parse_args(argv)
+    
+    formato = 'csv' if args.arquivo.lower().endswith('.csv') else 'xlsx'
+    try:
+        with open(args.arquivo, 'wb') as destino:
+            linhas = ExportacaoService.exportar(destino, args.tipo, args.inicio, args.fim,
+                                                formato, args.tabela)
+    except ValueError as e:
+        print(f"✗ {e}")
+        return 1
+    print(f"✓ {linhas} linha(s) exportada(s) em {args.arquivo}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,605 @@
+"""
+Serviço de Importação - Carga de planilhas (CSV/Excel) de doadores,
+beneficiários e doações
+
+O arquivo é lido em blocos de TAMANHO_BLOCO linhas, então a memória não
+depende do tamanho da planilha. Para cada bloco:
+
+1. cabeçalhos são reconhecidos sem diferenciar maiúsculas, acentos e
+   espaços ("Ponto de Coleta", "ponto_coleta" e "PONTO DE COLETA" são a
+   mesma coluna; ver COLUNAS)
+2. os valores são convertidos de uma vez por coluna (datas dd/mm/aaaa ou
+   aaaa-mm-dd, quantidade com vírgula decimal) e validados com as mesmas
+   regras de validate() dos models, na forma vetorizada (validar_dataframe)
+3. doações: doador, ponto de coleta, voluntário e campanha podem vir pelo id
+   ou pelo nome. Os nomes são resolvidos em mapas carregados uma única vez
+   por importação, pela chave fonética (ChaveBusca), sem uma consulta por
+   linha
+4. as linhas válidas são gravadas com INSERTs multi-linha (executemany) em
+   uma transação por bloco, junto com as tabelas derivadas (resumo mensal,
+   arrecadação das campanhas, primeira doação do doador)
+
+Linhas inválidas não interrompem a importação: voltam em 'erros' com o
+número da linha no arquivo e o motivo. Se a gravação de um bloco falhar,
+só as linhas daquele bloco são marcadas com o erro.
+
+Uso:
+    python backend/services/importacao_service.py doacao doacoes.csv
+    python backend/services/importacao_service.py doador doadores.xlsx --erros erros.csv
+
+Planilhas .xlsx requerem o pacote openpyxl.
+"""
+
+import re
+import sys
+import os
+import argparse
+import unicodedata
+from datetime import date, datetime
+from itertools import islice
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+import pandas as pd
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.connection import DatabaseConnection, usar_conexao
+from database.cache import query_cache
+from models.chave_busca import ChaveBusca
+from models.doador import Doador
+from models.beneficiario import Beneficiario
+from models.doacao import Doacao
+from models.resumo_mensal_doacao import ResumoMensalDoacao
+from models.arrecadacao_campanha import ArrecadacaoCampanha
+
+
+class ImportacaoService:
+    """Importação em blocos de planilhas de cadastro e de doações"""
+    
+    TAMANHO_BLOCO = 500
+    
+    # entidade -> campo -> nomes aceitos no cabeçalho (já normalizados, ver _cabecalho)
+    COLUNAS = {
+        'doador': {
+            'nome': ('nome', 'doador', 'nome_do_doador'),
+            'telefone': ('telefone', 'celular', 'fone'),
+            'email': ('email', 'e_mail'),
+            'logradouro': ('logradouro', 'endereco', 'rua'),
+            'numero': ('numero', 'n'),
+            'complemento': ('complemento',),
+            'bairro': ('bairro',),
+            'cidade': ('cidade', 'municipio'),
+            'estado': ('estado', 'uf'),
+            'cep': ('cep',)
+        },
+        'beneficiario': {
+            'nome': ('nome', 'beneficiario', 'nome_do_beneficiario'),
+            'idade': ('idade',),
+            'genero': ('genero', 'sexo'),
+            'descricao': ('descricao', 'observacoes')
+        },
+        'doacao': {
+            'doador': ('doador', 'doador_id', 'id_doador', 'iddoador'),
+            'ponto_coleta': ('ponto_coleta', 'ponto_de_coleta', 'ponto', 'ponto_coleta_id', 'idpontocoleta'),
+            'voluntario': ('voluntario', 'voluntario_coleta', 'voluntario_responsavel',
+                           'voluntario_id', 'idvoluntario'),
+            'campanha': ('campanha', 'campanha_id', 'campanha_doacao', 'idcampanhadoacao'),
+            'data_criacao': ('data_criacao', 'data', 'data_da_doacao', 'data_doacao'),
+            'data_entrega': ('data_entrega', 'data_de_entrega'),
+            'tipo_doacao': ('tipo_doacao', 'tipo', 'tipo_de_doacao'),
+            'descricao_item': ('descricao_item', 'item', 'descricao', 'descricao_do_item'),
+            'quantidade': ('quantidade', 'qtd', 'qtde'),
+            'unidade': ('unidade',),
+            'observacoes': ('observacoes', 'observacao', 'obs')
+        }
+    }
+    
+    # Sem estas colunas o arquivo é recusado antes de gravar qualquer linha
+    OBRIGATORIAS = {
+        'doador': ('nome',),
+        'beneficiario': ('nome',),
+        'doacao': ('doador', 'ponto_coleta', 'voluntario', 'descricao_item', 'quantidade')
+    }
+    
+    # campo de doacao -> (SELECT id, nome da tabela referenciada, rótulo nas mensagens)
+    REFERENCIAS = {
+        'doador': ("SELECT idDoador AS id, Nome AS nome FROM Doador", "doador"),
+        'ponto_coleta': ("SELECT idPontoColeta AS id, Responsavel AS nome FROM PontoColeta", "ponto de coleta"),
+        'voluntario': ("SELECT idVoluntario AS id, Nome AS nome FROM Voluntario", "voluntário"),
+        'campanha': ("SELECT idCampanhaDoacao AS id, Nome AS nome FROM CampanhaDoacao", "campanha")
+    }
+    
+    # Prefixo posto por ler() na primeira célula de uma linha do CSV com mais
+    # colunas que o cabeçalho (o restante da linha vai junto, no texto original)
+    MARCA_MALFORMADA = '\x00malformada\x00'
+    
+    # ========================================================================
+    # LEITURA
+    # ========================================================================
+    
+    @staticmethod
+    def _cabecalho(nome) -> str:
+        """'Ponto de Coleta' -> 'ponto_de_coleta', 'Descrição' -> 'descricao'"""
+        sem_acento = ''.join(
+            c for c in unicodedata.normalize('NFD', str(nome))
+            if unicodedata.category(c) != 'Mn'
+        )
+        return '_'.join(re.findall(r'[a-z0-9]+', sem_acento.lower()))
+    
+    @staticmethod
+    def _mapear_colunas(entidade: str, colunas: List[str]) -> Dict[str, str]:
+        """
+        Coluna do arquivo -> campo da entidade (colunas desconhecidas ficam de fora).
+        
+        Raises:
+            ValueError: falta alguma coluna de OBRIGATORIAS
+        """
+        aceitos = {
+            alias: campo
+            for campo, aliases in ImportacaoService.COLUNAS[entidade].items()
+            for alias in aliases
+        }
+        mapa = {}
+        for coluna in colunas:
+            campo = aceitos.get(ImportacaoService._cabecalho(coluna))
+            if campo and campo not in mapa.values():
+                mapa[coluna] = campo
+        ausentes = [c for c in ImportacaoService.OBRIGATORIAS[entidade] if c not in mapa.values()]
+        if ausentes:
+            raise ValueError(f"Colunas obrigatórias ausentes: {', '.join(ausentes)}")
+        return mapa
+    
+    @staticmethod
+    def _celula(valor) -> str:
+        """
+        Valor de uma célula do Excel como texto (datas em ISO, 12.0 -> '12',
+        1.5 -> '1,5' para não ser lido como separador de milhar em _numero)
+        """
+        if valor is None:
+            return ''
+        if isinstance(valor, datetime):
+            return valor.date().isoformat() if valor.time() == datetime.min.time() else valor.isoformat(' ')
+        if isinstance(valor, date):
+            return valor.isoformat()
+        if isinstance(valor, float):
+            return str(int(valor)) if valor.is_integer() else repr(valor).replace('.', ',')
+        return str(valor)
+    
+    @staticmethod
+    def _ler_xlsx(arquivo, tamanho: int) -> Iterator[pd.DataFrame]:
+        """Primeira planilha do arquivo, em blocos (modo read_only do openpyxl)"""
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise ValueError("Importar .xlsx requer o pacote openpyxl (pip install openpyxl)")
+        
+        livro = load_workbook(arquivo, read_only=True, data_only=True)
+        try:
+            linhas = livro.active.iter_rows(values_only=True)
+            cabecalho = [ImportacaoService._celula(c) for c in next(linhas, ())]
+            largura = len(cabecalho)
+            while True:
+                bloco = [
+                    [ImportacaoService._celula(c) for c in linha[:largura]] + [''] * (largura - len(linha))
+                    for linha in islice(linhas, tamanho)
+                ]
+                if not bloco:
+                    break
+                yield pd.DataFrame(bloco, columns=cabecalho)
+        finally:
+            livro.close()
+    
+    @staticmethod
+    def _separador(arquivo) -> str:
+        """';' se o cabeçalho tiver mais ';' que ',', senão ',' (inclusive com uma coluna só)"""
+        if hasattr(arquivo, 'readline'):
+            posicao = arquivo.tell()
+            linha = arquivo.readline()
+            arquivo.seek(posicao)
+        else:
+            with open(arquivo, 'rb') as f:
+                linha = f.readline()
+        if isinstance(linha, bytes):
+            linha = linha.decode('utf-8-sig', errors='replace')
+        return ';' if linha.count(';') > linha.count(',') else ','
+    
+    @staticmethod
+    def ler(arquivo, nome: Optional[str] = None, tamanho: int = TAMANHO_BLOCO) -> Iterator[pd.DataFrame]:
+        """
+        Lê o arquivo em DataFrames de até `tamanho` linhas, tudo como texto.
+        
+        Args:
+            arquivo: caminho ou arquivo aberto em modo binário (ex: st.file_uploader)
+            nome: nome do arquivo, para escolher o formato pela extensão
+                  (padrão: o próprio caminho ou arquivo.name)
+        
+        CSV: separador detectado no cabeçalho (vírgula ou ponto e vírgula,
+        ver _separador), UTF-8 (com ou sem BOM). Uma linha com mais colunas
+        que o cabeçalho não interrompe a leitura: vira uma linha cuja primeira
+        célula é MARCA_MALFORMADA + o texto original (importar() a recusa).
+        """
+        nome = nome or getattr(arquivo, 'name', None) or str(arquivo)
+        if nome.lower().endswith(('.xlsx', '.xlsm')):
+            yield from ImportacaoService._ler_xlsx(arquivo, tamanho)
+            return
+        separador = ImportacaoService._separador(arquivo)
+        yield from pd.read_csv(
+            arquivo, sep=separador, engine='python', dtype=str, encoding='utf-8-sig',
+            keep_default_na=False, skip_blank_lines=False, chunksize=tamanho,
+            on_bad_lines=lambda linha: [ImportacaoService.MARCA_MALFORMADA + separador.join(linha)]
+        )
+    
+    # ========================================================================
+    # CONVERSÃO (vetorizada, por coluna)
+    # ========================================================================
+    
+    @staticmethod
+    def _texto(bloco: pd.DataFrame, campo: str) -> pd.Series:
+        """Coluna como texto sem espaços nas pontas ('' se a coluna não existir)"""
+        if campo not in bloco:
+            return pd.Series('', index=bloco.index, dtype=object)
+        return bloco[campo].fillna('').astype(str).str.strip()
+    
+    @staticmethod
+    def _numero(texto: pd.Series) -> Tuple[pd.Series, pd.Series]:
+        """
+        '1.234,5' / '1234.5' -> 1234.5; '1.234' e '1.234.567' (só pontos de
+        milhar, sem vírgula) -> 1234 e 1234567
+        
+        Returns:
+            (valores com NaN onde vazio ou inválido, máscara dos inválidos)
+        """
+        com_virgula = texto.str.contains(',', regex=False)
+        so_milhar = ~com_virgula & texto.str.fullmatch(r'-?\d{1,3}(\.\d{3})+')
+        texto = texto.where(~(com_virgula | so_milhar), texto.str.replace('.', '', regex=False))
+        texto = texto.str.replace(',', '.', regex=False)
+        valores = pd.to_numeric(texto.where(texto != ''), errors='coerce')
+        return valores, (texto != '') & valores.isna()
+    
+    @staticmethod
+    def _data(texto: pd.Series) -> Tuple[pd.Series, pd.Series]:
+        """
+        'aaaa-mm-dd' ou 'dd/mm/aaaa' -> datetime64
+        
+        Returns:
+            (datas com NaT onde vazio ou inválido, máscara dos inválidos)
+        """
+        texto = texto.where(texto != '')
+        iso = pd.to_datetime(texto, format='ISO8601', errors='coerce')
+        brasileira = pd.to_datetime(texto, format='%d/%m/%Y', errors='coerce')
+        datas = iso.fillna(brasileira).dt.normalize()
+        return datas, texto.notna() & datas.isna()
+    
+    @staticmethod
+    def _opcao(texto: pd.Series, validas: List[str], padrao: str) -> pd.Series:
+        """Valor de uma lista fechada sem diferenciar maiúsculas ('kg' -> 'Kg'); vazio -> padrao"""
+        por_minuscula = {v.lower(): v for v in validas}
+        minuscula = texto.str.lower()
+        return texto.where(~minuscula.isin(list(por_minuscula)), minuscula.map(por_minuscula)).where(texto != '', padrao)
+    
+    @staticmethod
+    def _erros(index, regras: List[Tuple[pd.Series, object]]) -> pd.Series:
+        """
+        Mensagem da primeira regra que falha em cada linha ("" = nenhuma).
+        
+        A mensagem de uma regra é um texto ou uma série com a mensagem por linha.
+        """
+        erros = pd.Series('', index=index, dtype=object)
+        for falhou, mensagem in reversed(regras):
+            erros[falhou] = mensagem[falhou] if isinstance(mensagem, pd.Series) else mensagem
+        return erros
+    
+    # ========================================================================
+    # REFERÊNCIAS (doações)
+    # ========================================================================
+    
+    @staticmethod
+    def _carregar_referencias(db: DatabaseConnection) -> Dict[str, Tuple[set, Dict[str, List[int]]]]:
+        """campo -> (ids existentes, chave fonética do nome -> ids), uma consulta por tabela"""
+        referencias = {}
+        for campo, (query, _) in ImportacaoService.REFERENCIAS.items():
+            tabela = db.fetch_dataframe(query)
+            por_chave = {}
+            for id_, nome in zip(tabela['id'].tolist(), tabela['nome'].tolist()):
+                por_chave.setdefault(ChaveBusca.gerar(nome), []).append(int(id_))
+            referencias[campo] = (set(int(i) for i in tabela['id'].tolist()), por_chave)
+        return referencias
+    
+    @staticmethod
+    def _resolver(texto: pd.Series, campo: str, referencias: Dict) -> Tuple[pd.Series, pd.Series]:
+        """
+        Id ou nome -> id, usando os mapas de _carregar_referencias().
+        
+        Returns:
+            (ids com NaN onde vazio ou não resolvido, mensagem de erro por linha)
+        """
+        ids, por_chave = referencias[campo]
+        rotulo = ImportacaoService.REFERENCIAS[campo][1]
+        
+        resolvidos = {}
+        for valor in texto.unique():
+            if valor == '':
+                resolvidos[valor] = (float('nan'), '')
+            elif valor.isdigit():
+                resolvidos[valor] = ((int(valor), '') if int(valor) in ids
+                                     else (float('nan'), f"Sem cadastro de {rotulo} com id {valor}"))
+            else:
+                candidatos = por_chave.get(ChaveBusca.gerar(valor), [])
+                if len(candidatos) == 1:
+                    resolvidos[valor] = (candidatos[0], '')
+                elif candidatos:
+                    resolvidos[valor] = (float('nan'), f"Mais de um cadastro de {rotulo} com o nome {valor} (use o id)")
+                else:
+                    resolvidos[valor] = (float('nan'), f"Sem cadastro de {rotulo} com o nome {valor}")
+        
+        return (
+            texto.map(lambda v: resolvidos[v][0]).astype(float),
+            texto.map(lambda v: resolvidos[v][1]).astype(object)
+        )
+    
+    # ========================================================================
+    # PREPARAÇÃO (bloco do arquivo -> dados tipados + erros)
+    # ========================================================================
+    
+    @staticmethod
+    def _preparar_doador(bloco: pd.DataFrame, referencias: Dict) -> Tuple[pd.DataFrame, pd.Series]:
+        dados = pd.DataFrame({
+            campo: ImportacaoService._texto(bloco, campo)
+            for campo in ImportacaoService.COLUNAS['doador']
+        })
+        dados['estado'] = dados['estado'].str.upper()
+        return dados, Doador.validar_dataframe(dados)
+    
+    @staticmethod
+    def _preparar_beneficiario(bloco: pd.DataFrame, referencias: Dict) -> Tuple[pd.DataFrame, pd.Series]:
+        idade, idade_invalida = ImportacaoService._numero(ImportacaoService._texto(bloco, 'idade'))
+        dados = pd.DataFrame({
+            'nome': ImportacaoService._texto(bloco, 'nome'),
+            'idade': idade,
+            'genero': ImportacaoService._texto(bloco, 'genero').str.upper(),
+            'descricao': ImportacaoService._texto(bloco, 'descricao')
+        })
+        formato = ImportacaoService._erros(bloco.index, [
+            (idade_invalida | (idade.notna() & (idade % 1 != 0)), "Idade inválida"),
+        ])
+        return dados, formato.where(formato != '', Beneficiario.validar_dataframe(dados))
+    
+    @staticmethod
+    def _preparar_doacao(bloco: pd.DataFrame, referencias: Dict) -> Tuple[pd.DataFrame, pd.Series]:
+        texto = lambda campo: ImportacaoService._texto(bloco, campo)
+        
+        dados = pd.DataFrame(index=bloco.index)
+        erros_referencia = []
+        for campo, coluna in (('doador', 'doador_id'), ('ponto_coleta', 'ponto_coleta_id'),
+                              ('voluntario', 'voluntario_coleta_id'), ('campanha', 'campanha_id')):
+            dados[coluna], erro = ImportacaoService._resolver(texto(campo), campo, referencias)
+            erros_referencia.append((erro != '', erro))
+        
+        dados['quantidade'], quantidade_invalida = ImportacaoService._numero(texto('quantidade'))
+        dados['data_criacao'], criacao_invalida = ImportacaoService._data(texto('data_criacao'))
+        dados['data_entrega'], entrega_invalida = ImportacaoService._data(texto('data_entrega'))
+        dados['data_criacao'] = dados['data_criacao'].fillna(pd.Timestamp(date.today()))
+        dados['tipo_doacao'] = ImportacaoService._opcao(texto('tipo_doacao'), Doacao.TIPOS_VALIDOS, "Outros")
+        dados['unidade'] = ImportacaoService._opcao(texto('unidade'), Doacao.UNIDADES_VALIDAS, "Unidades")
+        dados['descricao_item'] = texto('descricao_item')
+        dados['observacoes'] = texto('observacoes')
+        
+        formato = ImportacaoService._erros(bloco.index, [
+            *erros_referencia,
+            (quantidade_invalida, "Quantidade inválida"),
+            (criacao_invalida, "Data de criação inválida (use dd/mm/aaaa ou aaaa-mm-dd)"),
+            (entrega_invalida, "Data de entrega inválida (use dd/mm/aaaa ou aaaa-mm-dd)"),
+        ])
+        return dados, formato.where(formato != '', Doacao.validar_dataframe(dados))
+    
+    # ========================================================================
+    # GRAVAÇÃO (linhas válidas de um bloco, dentro da transação do bloco)
+    # ========================================================================
+    
+    @staticmethod
+    def _ou_none(valor):
+        """'' e NaN/NaT -> None (NULL no banco)"""
+        return None if valor == '' or pd.isna(valor) else valor
+    
+    @staticmethod
+    def _gravar_doador(db: DatabaseConnection, dados: pd.DataFrame) -> int:
+        campos = list(ImportacaoService.COLUNAS['doador'])
+        params = [
+            (*(ImportacaoService._ou_none(linha[c]) for c in campos), ChaveBusca.gerar(linha['nome']))
+            for linha in dados.to_dict('records')
+        ]
+        inseridos = db.executemany(
+            """
+            INSERT INTO Doador (Nome, Telefone, Email, Logradouro, Numero,
+                               Complemento, Bairro, Cidade, Estado, CEP, ChaveBusca)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            """,
+            params
+        )
+        db.after_commit(lambda: query_cache.invalidate('Doador'))
+        return inseridos
+    
+    @staticmethod
+    def _gravar_beneficiario(db: DatabaseConnection, dados: pd.DataFrame) -> int:
+        params = [
+            (linha['nome'],
+             None if pd.isna(linha['idade']) else int(linha['idade']),
+             ImportacaoService._ou_none(linha['genero']),
+             ImportacaoService._ou_none(linha['descricao']),
+             ChaveBusca.gerar(linha['nome']))
+            for linha in dados.to_dict('records')
+        ]
+        inseridos = db.executemany(
+            """
+            INSERT INTO Beneficiario (Nome, Idade, Genero, Descricao, ChaveBusca)
+            VALUES (%s, %s, %s, %s, %s)
+            """,
+            params
+        )
+        db.after_commit(lambda: query_cache.invalidate('Beneficiario'))
+        return inseridos
+    
+    @staticmethod
+    def _gravar_doacao(db: DatabaseConnection, dados: pd.DataFrame) -> int:
+        params, linhas, primeiras = [], [], {}
+        for linha in dados.to_dict('records'):
+            doador_id = int(linha['doador_id'])
+            campanha_id = None if pd.isna(linha['campanha_id']) else int(linha['campanha_id'])
+            ponto_id = int(linha['ponto_coleta_id'])
+            data_criacao = linha['data_criacao'].date()
+            data_entrega = None if pd.isna(linha['data_entrega']) else linha['data_entrega'].date()
+            quantidade = float(linha['quantidade'])
+            params.append((
+                doador_id, campanha_id, ponto_id, int(linha['voluntario_coleta_id']),
+                data_criacao, data_entrega, linha['tipo_doacao'], linha['descricao_item'],
+                quantidade, linha['unidade'], ImportacaoService._ou_none(linha['observacoes']),
+                "Recebida"
+            ))
+            linhas.append({
+                'DataCriacao': data_criacao,
+                'TipoDoacao': linha['tipo_doacao'],
+                'CampanhaDoacao_idCampanhaDoacao': campanha_id,
+                'PontoColeta_idPontoColeta': ponto_id,
+                'Quantidade': quantidade,
+                'Unidade': linha['unidade'],
+                'Status': "Recebida"
+            })
+            primeiras[doador_id] = min(primeiras.get(doador_id, data_criacao), data_criacao)
+        
+        inseridos = db.executemany(
+            """
+            INSERT INTO Doacao (
+                Doador_idDoador, CampanhaDoacao_idCampanhaDoacao, PontoColeta_idPontoColeta,
+                VoluntarioColeta_idVoluntario, DataCriacao, DataEntrega, TipoDoacao,
+                DescricaoItem, Quantidade, Unidade, Observacoes, Status
+            )
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            """,
+            params
+        )
+        ResumoMensalDoacao.aplicar(db, ResumoMensalDoacao.deltas(linhas))
+        ArrecadacaoCampanha.aplicar(db, ArrecadacaoCampanha.deltas(linhas))
+        for doador_id, data_doacao in primeiras.items():
+            Doador.registrar_doacao(db, doador_id, data_doacao)
+        db.after_commit(Doacao._invalidar_relatorios)
+        return inseridos
+    
+    # ========================================================================
+    # IMPORTAÇÃO
+    # ========================================================================
+    
+    @staticmethod
+    def importar(entidade: str, arquivo, nome: Optional[str] = None,
+                 tamanho_bloco: int = TAMANHO_BLOCO,
+                 progresso: Optional[Callable[[int], None]] = None,
+                 db: Optional[DatabaseConnection] = None) -> Dict:
+        """
+        Importa uma planilha inteira, bloco a bloco.
+        
+        Args:
+            entidade: 'doador', 'beneficiario' ou 'doacao'
+            arquivo: caminho ou arquivo aberto em modo binário (.csv ou .xlsx)
+            nome: nome do arquivo, se `arquivo` não tiver (ver ler())
+            tamanho_bloco: linhas por leitura e por transação
+            progresso: chamada após cada bloco com o total de linhas lidas
+        
+        Returns:
+            dict: {'total': linhas lidas, 'inseridos': linhas gravadas,
+                   'erros': DataFrame com 'linha' (número no arquivo, contando o
+                   cabeçalho), 'erro' e as colunas originais da linha}
+        
+        Raises:
+            ValueError: entidade desconhecida, colunas obrigatórias ausentes
+                        ou formato de arquivo não suportado
+        """
+        if entidade not in ImportacaoService.COLUNAS:
+            raise ValueError(f"Entidade de importação desconhecida: {entidade}")
+        preparar = getattr(ImportacaoService, f"_preparar_{entidade}")
+        gravar = getattr(ImportacaoService, f"_gravar_{entidade}")
+        
+        total, inseridos, posicao, erros = 0, 0, 0, []
+        with usar_conexao(db) as db:
+            mapa, referencias = None, {}
+            for bloco in ImportacaoService.ler(arquivo, nome, tamanho_bloco):
+                if mapa is None:
+                    # Cabeçalho conferido antes de carregar os mapas de referência
+                    mapa = ImportacaoService._mapear_colunas(entidade, list(bloco.columns))
+                    if entidade == 'doacao':
+                        referencias = ImportacaoService._carregar_referencias(db)
+                lidas = len(bloco)
+                bloco.index = pd.RangeIndex(lidas) + posicao + 2  # número da linha no arquivo (cabeçalho = 1)
+                posicao += lidas
+                
+                # Linhas em branco (comuns no fim de planilhas) são ignoradas
+                preenchida = bloco.fillna('').astype(str).apply(lambda c: c.str.strip() != '').any(axis=1)
+                bloco = bloco[preenchida]
+                if bloco.empty:
+                    continue
+                
+                # Linhas com colunas a mais (ver ler()): recusadas com o texto original
+                primeira = bloco.iloc[:, 0].fillna('').astype(str)
+                malformada = primeira.str.startswith(ImportacaoService.MARCA_MALFORMADA)
+                if malformada.any():
+                    bloco = bloco.copy()
+                    bloco.iloc[:, 0] = primeira.str.removeprefix(ImportacaoService.MARCA_MALFORMADA)
+                
+                dados, erro = preparar(bloco[list(mapa)].rename(columns=mapa), referencias)
+                erro = erro.where(~malformada, "Linha com mais colunas que o cabeçalho")
+                validas = erro == ''
+                if validas.any():
+                    try:
+                        with db.transaction():
+                            inseridos += gravar(db, dados[validas])
+                    except Exception as e:
+                        if db.in_transaction:
+                            raise
+                        print(f"✗ Erro ao gravar o bloco da linha {bloco.index[0]}: {e}")
+                        erro = erro.where(~validas, f"Erro ao gravar o bloco: {e}")
+                
+                invalidas = erro != ''
+                if invalidas.any():
+                    erros.append(pd.concat([
+                        pd.DataFrame({'linha': bloco.index[invalidas], 'erro': erro[invalidas]},
+                                     index=bloco.index[invalidas]),
+                        bloco[invalidas]
+                    ], axis=1))
+                
+                total += len(bloco)
+                if progresso:
+                    progresso(total)
+        
+        return {
+            'total': total,
+            'inseridos': inseridos,
+            'erros': (pd.concat(erros, ignore_index=True) if erros
+                      else pd.DataFrame(columns=['linha', 'erro']))
+        }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Importa uma planilha CSV/Excel")
+    parser.add_argument('entidade', choices=list(ImportacaoService.COLUNAS))
+    parser.add_argument('arquivo')
+    parser.add_argument('--bloco', type=int, default=ImportacaoService.TAMANHO_BLOCO,
+                        help="linhas por bloco (leitura e transação)")
+    parser.add_argument('--erros', metavar='CSV', help="grava as linhas com erro neste arquivo")
+    args = parser.parse_args(argv)
+    
+    try:
+        resultado = ImportacaoService.importar(args.entidade, args.arquivo, tamanho_bloco=args.bloco)
+    except ValueError as e:
+        print(f"✗ {e}")
+        return 1
+    
+    erros = resultado['erros']
+    print(f"✓ {resultado['inseridos']} de {resultado['total']} linha(s) importada(s)")
+    if not erros.empty:
+        print(f"✗ {len(erros)} linha(s) com erro")
+        if args.erros:
+            erros.to_csv(args.erros, index=False, encoding='utf-8-sig')
+            print(f"  detalhes em {args.erros}")
+        else:
+            print(erros[['linha', 'erro']].head(20).to_string(index=False))
+    return 0 if erros.empty else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
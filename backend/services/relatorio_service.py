@@ -0,0 +1,449 @@
+"""
+Serviço de Relatórios - Consultas agregadas para a página de relatórios
+
+As agregações (contagens, rankings) rodam no MySQL e só o resultado vem
+para o Python, já em DataFrames com colunas tipadas:
+- TipoDoacao, Status e Unidade como category
+- datas como datetime64
+- quantidades e valores como float
+
+Assim o custo da página depende do tamanho dos resultados (top 10, resumo
+por campanha), não da quantidade de doações cadastradas.
+
+gerar(tipo, data_inicio, data_fim) monta um relatório completo: executa só
+as seções que o tipo escolhido exibe, todas restritas ao intervalo de
+DataCriacao (coberto por idx_data_criacao), e guarda o resultado no cache
+por (tipo, período).
+"""
+
+import sys
+import os
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import pandas as pd
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.connection import DatabaseConnection, usar_conexao
+from database.cache import cached, query_cache
+from models.doacao import Doacao
+from services.snapshot_service import SnapshotService
+
+
+class RelatorioService:
+    """Consultas de relatório que devolvem DataFrames tipados"""
+    
+    # Colunas de texto com poucos valores distintos
+    COLUNAS_CATEGORICAS = ('tipo_doacao', 'status', 'unidade', 'tipo_meta', 'genero')
+    
+    # Colunas de data/hora
+    COLUNAS_DATA = ('data_criacao', 'data_entrega', 'data_inicio', 'data_termino')
+    
+    # Colunas DECIMAL que devem virar float
+    COLUNAS_NUMERICAS = ('quantidade', 'meta', 'arrecadado')
+    
+    # Tabelas lidas por gerar() além de Doacao: escrever nelas invalida 'Relatorio'
+    NAMESPACES_RELACIONADOS = ('Doador', 'Beneficiario', 'CampanhaDoacao', 'PontoColeta')
+    
+    # Linhas dos rankings de gerar() (doadores e beneficiários)
+    LIMITE_PADRAO = 15
+    
+    # Seções calculadas para cada tipo de relatório da página
+    SECOES_POR_TIPO = {
+        'Visão Geral': ('totais', 'resumo', 'por_tipo', 'mensal', 'ranking_doadores',
+                        'novos_doadores', 'campanhas', 'beneficiarios'),
+        'Doações': ('totais', 'resumo', 'por_tipo', 'mensal'),
+        'Doadores': ('totais', 'resumo', 'ranking_doadores', 'novos_doadores'),
+        'Beneficiários': ('totais', 'beneficiarios'),
+        'Campanhas': ('totais', 'campanhas')
+    }
+    
+    @staticmethod
+    def _tipar(df: pd.DataFrame) -> pd.DataFrame:
+        """Converte as colunas conhecidas para category, datetime64 e float"""
+        for coluna in df.columns:
+            if coluna in RelatorioService.COLUNAS_CATEGORICAS:
+                df[coluna] = df[coluna].astype('category')
+            elif coluna in RelatorioService.COLUNAS_DATA:
+                df[coluna] = pd.to_datetime(df[coluna], errors='coerce')
+            elif coluna in RelatorioService.COLUNAS_NUMERICAS:
+                df[coluna] = pd.to_numeric(df[coluna], errors='coerce').astype(float)
+        return df
+    
+    @staticmethod
+    def _periodo(coluna: str, data_inicio: Optional[date],
+                 data_fim: Optional[date]) -> Tuple[List[str], List]:
+        """Cláusulas de intervalo (inclusivo) sobre uma coluna DATE"""
+        clausulas, params = [], []
+        if data_inicio:
+            clausulas.append(f"{coluna} >= %s")
+            params.append(data_inicio)
+        if data_fim:
+            clausulas.append(f"{coluna} <= %s")
+            params.append(data_fim)
+        return clausulas, params
+    
+    @staticmethod
+    def _where(clausulas: List[str]) -> str:
+        return (" WHERE " + " AND ".join(clausulas)) if clausulas else ""
+    
+    @staticmethod
+    def carregar(query: str, params: Optional[Iterable] = None,
+                 db: Optional[DatabaseConnection] = None) -> pd.DataFrame:
+        """
+        Executa a query e devolve um DataFrame tipado.
+        
+        Os nomes das colunas vêm dos aliases do SELECT; as que aparecem em
+        COLUNAS_CATEGORICAS, COLUNAS_DATA e COLUNAS_NUMERICAS são convertidas.
+        """
+        with usar_conexao(db) as db:
+            df = db.fetch_dataframe(query, tuple(params or ()))
+        return RelatorioService._tipar(df)
+    
+    @staticmethod
+    def doacoes(filtros: Optional[Dict] = None,
+                db: Optional[DatabaseConnection] = None) -> pd.DataFrame:
+        """
+        Doações (sem joins) em colunas tipadas, para análises no pandas.
+        
+        Args:
+            filtros: mesmos filtros de Doacao.listar()
+        """
+        clausulas, params = Doacao._where_filtros(filtros)
+        query = """
+            SELECT d.idDoacao, d.Doador_idDoador AS doador_id,
+                   d.CampanhaDoacao_idCampanhaDoacao AS campanha_id,
+                   d.PontoColeta_idPontoColeta AS ponto_coleta_id,
+                   d.DataCriacao AS data_criacao, d.DataEntrega AS data_entrega,
+                   d.TipoDoacao AS tipo_doacao, d.Quantidade AS quantidade,
+                   d.Unidade AS unidade, d.Status AS status
+            FROM Doacao d
+        """
+        if clausulas:
+            query += " WHERE " + " AND ".join(clausulas)
+        query += " ORDER BY d.DataCriacao DESC"
+        return RelatorioService.carregar(query, params, db)
+    
+    @staticmethod
+    def resumo_periodo(data_inicio: Optional[date] = None, data_fim: Optional[date] = None,
+                       db: Optional[DatabaseConnection] = None) -> Dict[str, Any]:
+        """Totais das doações do período em uma única linha"""
+        clausulas, params = RelatorioService._periodo('DataCriacao', data_inicio, data_fim)
+        query = """
+            SELECT COUNT(*) AS total_doacoes,
+                   COUNT(DISTINCT Doador_idDoador) AS doadores_ativos,
+                   COALESCE(SUM(Quantidade), 0) AS quantidade_total,
+                   COALESCE(SUM(Status = 'Distribuída'), 0) AS distribuidas
+            FROM Doacao
+        """ + RelatorioService._where(clausulas)
+        with usar_conexao(db) as db:
+            row = db.fetch_one(query, tuple(params)) or {}
+        return {
+            'total_doacoes': int(row.get('total_doacoes') or 0),
+            'doadores_ativos': int(row.get('doadores_ativos') or 0),
+            'quantidade_total': float(row.get('quantidade_total') or 0),
+            'distribuidas': int(row.get('distribuidas') or 0)
+        }
+    
+    @staticmethod
+    def consulta_doacoes_por_tipo(data_inicio: Optional[date] = None,
+                                  data_fim: Optional[date] = None) -> Tuple[str, List]:
+        """SQL e parâmetros de doacoes_por_tipo() (ver ExportacaoService)"""
+        clausulas, params = RelatorioService._periodo('DataCriacao', data_inicio, data_fim)
+        query = """
+            SELECT TipoDoacao AS tipo_doacao, COUNT(*) AS total,
+                   SUM(Quantidade) AS quantidade
+            FROM Doacao
+        """ + RelatorioService._where(clausulas) + """
+            GROUP BY TipoDoacao
+            ORDER BY total DESC
+        """
+        return query, params
+    
+    @staticmethod
+    def doacoes_por_tipo(data_inicio: Optional[date] = None, data_fim: Optional[date] = None,
+                         db: Optional[DatabaseConnection] = None) -> pd.DataFrame:
+        """
+        Doações do período agrupadas por TipoDoacao.
+        
+        Colunas: tipo_doacao, total, quantidade
+        """
+        query, params = RelatorioService.consulta_doacoes_por_tipo(data_inicio, data_fim)
+        df = RelatorioService.carregar(query, params, db)
+        df['total'] = df['total'].astype(int)
+        return df
+    
+    @staticmethod
+    def consulta_doacoes_mensais(data_inicio: Optional[date] = None,
+                                 data_fim: Optional[date] = None) -> Tuple[str, List]:
+        """SQL e parâmetros de doacoes_mensais() (ver ExportacaoService)"""
+        clausulas, params = RelatorioService._periodo('DataCriacao', data_inicio, data_fim)
+        query = """
+            SELECT DATE_FORMAT(DataCriacao, '%Y-%m-01') AS mes, COUNT(*) AS total,
+                   SUM(Quantidade) AS quantidade
+            FROM Doacao
+        """ + RelatorioService._where(clausulas) + """
+            GROUP BY mes
+            ORDER BY mes
+        """
+        return query, params
+    
+    @staticmethod
+    def doacoes_mensais(data_inicio: Optional[date] = None, data_fim: Optional[date] = None,
+                        db: Optional[DatabaseConnection] = None) -> pd.DataFrame:
+        """
+        Doações do período por mês.
+        
+        Colunas: mes (datetime64, primeiro dia do mês), total, quantidade
+        """
+        query, params = RelatorioService.consulta_doacoes_mensais(data_inicio, data_fim)
+        df = RelatorioService.carregar(query, params, db)
+        df['mes'] = pd.to_datetime(df['mes'])
+        df['total'] = df['total'].astype(int)
+        return df
+    
+    @staticmethod
+    def consulta_novos_doadores_mensais(data_inicio: Optional[date] = None,
+                                        data_fim: Optional[date] = None) -> Tuple[str, List]:
+        """SQL e parâmetros de novos_doadores_mensais() (ver ExportacaoService)"""
+        clausulas, params = RelatorioService._periodo('PrimeiraDoacao', data_inicio, data_fim)
+        clausulas.insert(0, "PrimeiraDoacao IS NOT NULL")
+        query = """
+            SELECT DATE_FORMAT(PrimeiraDoacao, '%Y-%m-01') AS mes, COUNT(*) AS novos_doadores
+            FROM Doador
+        """ + RelatorioService._where(clausulas) + """
+            GROUP BY mes
+            ORDER BY mes
+        """
+        return query, params
+    
+    @staticmethod
+    def novos_doadores_mensais(data_inicio: Optional[date] = None, data_fim: Optional[date] = None,
+                               db: Optional[DatabaseConnection] = None) -> pd.DataFrame:
+        """
+        Doadores cuja primeira doação caiu no período, por mês.
+        
+        Consulta de intervalo em Doador.PrimeiraDoacao (idx_primeira_doacao),
+        sem agrupar Doacao. Requer add_primeira_doacao_doador.sql.
+        
+        Colunas: mes (datetime64, primeiro dia do mês), novos_doadores
+        """
+        query, params = RelatorioService.consulta_novos_doadores_mensais(data_inicio, data_fim)
+        df = RelatorioService.carregar(query, params, db)
+        df['mes'] = pd.to_datetime(df['mes'])
+        df['novos_doadores'] = df['novos_doadores'].astype(int)
+        return df
+    
+    @staticmethod
+    def consulta_ranking_doadores(limite: int = 10, data_inicio: Optional[date] = None,
+                                  data_fim: Optional[date] = None) -> Tuple[str, List]:
+        """SQL e parâmetros de ranking_doadores() (ver ExportacaoService)"""
+        clausulas, params = RelatorioService._periodo('DataCriacao', data_inicio, data_fim)
+        query = """
+            SELECT dr.idDoador, dr.Nome AS nome, dr.Email AS email,
+                   dr.Telefone AS telefone, r.total_doacoes, r.quantidade_total
+            FROM (
+                SELECT Doador_idDoador, COUNT(*) AS total_doacoes,
+                       SUM(Quantidade) AS quantidade_total
+                FROM Doacao
+        """ + RelatorioService._where(clausulas) + """
+                GROUP BY Doador_idDoador
+                ORDER BY total_doacoes DESC
+                LIMIT %s
+            ) r
+            JOIN Doador dr ON dr.idDoador = r.Doador_idDoador
+            ORDER BY r.total_doacoes DESC, dr.Nome
+        """
+        return query, [*params, limite]
+    
+    @staticmethod
+    def ranking_doadores(limite: int = 10, data_inicio: Optional[date] = None,
+                         data_fim: Optional[date] = None,
+                         db: Optional[DatabaseConnection] = None) -> pd.DataFrame:
+        """
+        Doadores com mais doações no período, do maior para o menor.
+        
+        Colunas: idDoador, nome, email, telefone, total_doacoes, quantidade_total
+        """
+        query, params = RelatorioService.consulta_ranking_doadores(limite, data_inicio, data_fim)
+        df = RelatorioService.carregar(query, params, db)
+        df['total_doacoes'] = df['total_doacoes'].astype(int)
+        df['quantidade_total'] = df['quantidade_total'].astype(float)
+        return df
+    
+    @staticmethod
+    def consulta_resumo_campanhas(data_inicio: Optional[date] = None,
+                                  data_fim: Optional[date] = None) -> Tuple[str, List]:
+        """SQL e parâmetros de resumo_campanhas() (ver ExportacaoService)"""
+        clausulas, params = RelatorioService._periodo('DataCriacao', data_inicio, data_fim)
+        clausulas.insert(0, "CampanhaDoacao_idCampanhaDoacao IS NOT NULL")
+        
+        # Campanha ativa no período: começou antes do fim e não terminou antes do início
+        filtro_campanha, params_campanha = [], []
+        if data_fim:
+            filtro_campanha.append("(c.DataInicio IS NULL OR c.DataInicio <= %s)")
+            params_campanha.append(data_fim)
+        if data_inicio:
+            filtro_campanha.append("(c.DataTermino IS NULL OR c.DataTermino >= %s)")
+            params_campanha.append(data_inicio)
+        
+        query = """
+            SELECT c.idCampanhaDoacao, c.Nome AS nome,
+                   c.DataInicio AS data_inicio, c.DataTermino AS data_termino,
+                   c.Descricao AS descricao, COALESCE(c.Meta, 0) AS meta,
+                   COALESCE(a.QuantidadeTotal, 0) AS arrecadado,
+                   COALESCE(c.TipoMeta, 'R$') AS tipo_meta,
+                   COALESCE(r.total_doacoes, 0) AS total_doacoes
+            FROM CampanhaDoacao c
+            LEFT JOIN (
+                SELECT CampanhaDoacao_idCampanhaDoacao, COUNT(*) AS total_doacoes
+                FROM Doacao
+        """ + RelatorioService._where(clausulas) + """
+                GROUP BY CampanhaDoacao_idCampanhaDoacao
+            ) r ON r.CampanhaDoacao_idCampanhaDoacao = c.idCampanhaDoacao
+            LEFT JOIN ArrecadacaoCampanha a
+                   ON a.Campanha_id = c.idCampanhaDoacao
+                  AND a.Unidade = COALESCE(c.TipoMeta, 'R$')
+        """ + RelatorioService._where(filtro_campanha) + """
+            ORDER BY c.DataInicio DESC
+        """
+        return query, [*params, *params_campanha]
+    
+    @staticmethod
+    def resumo_campanhas(data_inicio: Optional[date] = None, data_fim: Optional[date] = None,
+                         db: Optional[DatabaseConnection] = None) -> pd.DataFrame:
+        """
+        Uma linha por campanha que esteve ativa no período, com o total de
+        doações vinculadas registradas no período. O arrecadado é o total
+        da campanha (ArrecadacaoCampanha, na unidade da meta).
+        
+        Colunas: idCampanhaDoacao, nome, data_inicio, data_termino, descricao,
+        meta, arrecadado, tipo_meta, total_doacoes
+        """
+        query, params = RelatorioService.consulta_resumo_campanhas(data_inicio, data_fim)
+        df = RelatorioService.carregar(query, params, db)
+        df['total_doacoes'] = df['total_doacoes'].astype(int)
+        return df
+    
+    @staticmethod
+    def consulta_beneficiarios_atendidos(limite: int = 15, data_inicio: Optional[date] = None,
+                                         data_fim: Optional[date] = None) -> Tuple[str, List]:
+        """SQL e parâmetros de beneficiarios_atendidos() (ver ExportacaoService)"""
+        clausulas, params = RelatorioService._periodo('d.DataCriacao', data_inicio, data_fim)
+        if clausulas:
+            juncao = "JOIN"
+            subquery = """
+                SELECT r.Beneficiario_idBeneficiario, COUNT(*) AS total_recebido
+                FROM Recebe r
+                JOIN Doacao d ON d.idDoacao = r.Doacao_idDoacao
+            """ + RelatorioService._where(clausulas) + """
+                GROUP BY r.Beneficiario_idBeneficiario
+            """
+        else:
+            juncao = "LEFT JOIN"
+            subquery = """
+                SELECT Beneficiario_idBeneficiario, COUNT(*) AS total_recebido
+                FROM Recebe
+                GROUP BY Beneficiario_idBeneficiario
+            """
+        query = f"""
+            SELECT b.idBeneficiario, b.Nome AS nome, b.Idade AS idade,
+                   b.Genero AS genero, b.Descricao AS descricao,
+                   COALESCE(r.total_recebido, 0) AS total_recebido
+            FROM Beneficiario b
+            {juncao} ({subquery}) r ON r.Beneficiario_idBeneficiario = b.idBeneficiario
+            ORDER BY total_recebido DESC, b.Nome
+            LIMIT %s
+        """
+        return query, [*params, limite]
+    
+    @staticmethod
+    def beneficiarios_atendidos(limite: int = 15, data_inicio: Optional[date] = None,
+                                data_fim: Optional[date] = None,
+                                db: Optional[DatabaseConnection] = None) -> pd.DataFrame:
+        """
+        Beneficiários que mais receberam doações (tabela Recebe).
+        
+        Sem período, lista também quem ainda não recebeu nada. Com período,
+        só entram beneficiários de doações registradas no intervalo.
+        
+        Colunas: idBeneficiario, nome, idade, genero, descricao, total_recebido
+        """
+        query, params = RelatorioService.consulta_beneficiarios_atendidos(limite, data_inicio, data_fim)
+        df = RelatorioService.carregar(query, params, db)
+        df['total_recebido'] = df['total_recebido'].astype(int)
+        return df
+    
+    @staticmethod
+    def consulta_doacoes_periodo(data_inicio: Optional[date] = None,
+                                 data_fim: Optional[date] = None) -> Tuple[str, List]:
+        """
+        SQL e parâmetros da lista completa de doações do período, com os
+        nomes do doador, da campanha e do ponto de coleta.
+        
+        Sem LIMIT: é lida em blocos pela exportação (ver ExportacaoService),
+        nunca inteira em um DataFrame.
+        """
+        clausulas, params = RelatorioService._periodo('d.DataCriacao', data_inicio, data_fim)
+        query = """
+            SELECT d.idDoacao, d.DataCriacao AS data_criacao, d.DataEntrega AS data_entrega,
+                   dr.Nome AS doador, d.TipoDoacao AS tipo_doacao,
+                   d.DescricaoItem AS descricao_item, d.Quantidade AS quantidade,
+                   d.Unidade AS unidade, d.Status AS status, c.Nome AS campanha,
+                   p.Responsavel AS ponto_coleta
+            FROM Doacao d
+            JOIN Doador dr ON dr.idDoador = d.Doador_idDoador
+            LEFT JOIN CampanhaDoacao c ON c.idCampanhaDoacao = d.CampanhaDoacao_idCampanhaDoacao
+            LEFT JOIN PontoColeta p ON p.idPontoColeta = d.PontoColeta_idPontoColeta
+        """ + RelatorioService._where(clausulas) + """
+            ORDER BY d.DataCriacao, d.idDoacao
+        """
+        return query, params
+    
+    @staticmethod
+    @cached('Relatorio')
+    def gerar(tipo: str = 'Visão Geral', data_inicio: Optional[date] = None,
+              data_fim: Optional[date] = None, limite: int = LIMITE_PADRAO) -> Dict[str, Any]:
+        """
+        Monta o relatório de um tipo para o período, em uma única conexão.
+        
+        Só as seções de SECOES_POR_TIPO[tipo] são calculadas; o dicionário
+        devolvido tem uma chave por seção:
+        - totais: totais gerais dos cards com 'variacao_mes'
+          (SnapshotService.totais_com_variacao)
+        - resumo: resumo_periodo()
+        - por_tipo, mensal, novos_doadores, ranking_doadores, campanhas,
+          beneficiarios: DataFrames dos métodos correspondentes
+        
+        O resultado fica em cache por (tipo, data_inicio, data_fim, limite)
+        e é invalidado quando uma doação é gravada ou quando um dos
+        NAMESPACES_RELACIONADOS é invalidado (_invalidar_relatorio).
+        """
+        if tipo not in RelatorioService.SECOES_POR_TIPO:
+            raise ValueError(f"Tipo de relatório desconhecido: {tipo}")
+        
+        periodo = {'data_inicio': data_inicio, 'data_fim': data_fim}
+        secoes = {
+            'totais': lambda db: SnapshotService.totais_com_variacao(db),
+            'resumo': lambda db: RelatorioService.resumo_periodo(db=db, **periodo),
+            'por_tipo': lambda db: RelatorioService.doacoes_por_tipo(db=db, **periodo),
+            'mensal': lambda db: RelatorioService.doacoes_mensais(db=db, **periodo),
+            'novos_doadores': lambda db: RelatorioService.novos_doadores_mensais(db=db, **periodo),
+            'ranking_doadores': lambda db: RelatorioService.ranking_doadores(limite, db=db, **periodo),
+            'campanhas': lambda db: RelatorioService.resumo_campanhas(db=db, **periodo),
+            'beneficiarios': lambda db: RelatorioService.beneficiarios_atendidos(limite, db=db, **periodo)
+        }
+        
+        with DatabaseConnection() as db:
+            return {
+                secao: secoes[secao](db)
+                for secao in RelatorioService.SECOES_POR_TIPO[tipo]
+            }
+
+
+def _invalidar_relatorio(namespace: str):
+    """Ouvinte do query_cache: escritas em doadores, beneficiários, campanhas e pontos de coleta invalidam 'Relatorio'"""
+    if namespace in RelatorioService.NAMESPACES_RELACIONADOS:
+        query_cache.invalidate('Relatorio')
+
+
+query_cache.ao_invalidar(_invalidar_relatorio)
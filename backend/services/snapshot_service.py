@@ -0,0 +1,58 @@
+"""
+Serviço de Snapshots - Série diária dos totais do dashboard
+
+Grava em SnapshotMetricas os totais do dia (doadores, beneficiários, doações
+e campanhas ativas). O dashboard e os relatórios só leem a série, então
+este script precisa ser agendado para haver um ponto por dia:
+
+    # crontab: todo dia às 23:55
+    55 23 * * * cd /caminho/do/projeto && python3 backend/services/snapshot_service.py
+
+Requer a migration add_snapshot_metricas.sql.
+"""
+
+import sys
+import os
+from datetime import date
+from typing import Dict, Optional
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.connection import DatabaseConnection, usar_conexao
+from models.dashboard_model import DashboardModel
+from models.snapshot_metricas import SnapshotMetricas
+
+
+class SnapshotService:
+    """Registro e consulta da série diária de totais"""
+    
+    @staticmethod
+    def registrar(dia: Optional[date] = None,
+                  db: Optional[DatabaseConnection] = None) -> Dict[str, int]:
+        """
+        Conta os totais atuais (uma query) e grava como snapshot do dia.
+        
+        Se a contagem falhar, nada é gravado (o erro propaga).
+        
+        Returns:
+            Dict[str, int]: os totais gravados
+        """
+        with usar_conexao(db) as db:
+            totais = DashboardModel._get_totais(db)
+            SnapshotMetricas.registrar(totais, dia, db)
+        return totais
+    
+    @staticmethod
+    def totais_com_variacao(db: Optional[DatabaseConnection] = None) -> Dict:
+        """
+        Totais atuais dos cards mais 'variacao_mes' (ver SnapshotMetricas.variacao_no_mes).
+        
+        Sem a tabela de snapshots, 'variacao_mes' fica vazio.
+        """
+        with usar_conexao(db) as db:
+            totais = DashboardModel._get_totais(db)
+            return {**totais, 'variacao_mes': DashboardModel._get_variacao_mes(totais, db)}
+
+
+if __name__ == "__main__":
+    totais = SnapshotService.registrar()
+    print(f"✓ Snapshot de {date.today()}: {totais}")
@@ -0,0 +1,33 @@
+-- ============================================================================
+-- MIGRATION: Arrecadação das campanhas calculada a partir das doações
+-- Descrição: Contadores por (campanha, unidade) somando Doacao.Quantidade das
+--            doações vinculadas à campanha. O model Doacao mantém a tabela a
+--            cada save/update/delete e o progresso de todas as campanhas sai
+--            de um único LEFT JOIN na unidade da meta (TipoMeta), em vez do
+--            campo Arrecadado digitado à mão.
+--            Ao excluir a campanha as doações ficam sem campanha (SET NULL),
+--            então os contadores dela são removidos junto (CASCADE).
+-- Requer: add_meta_campanhas.sql e add_doacoes_detalhes.sql
+-- Depois de rodar: python backend/database/backfill.py arrecadacao_campanhas
+-- ============================================================================
+
+USE somos_darua;
+
+CREATE TABLE IF NOT EXISTS ArrecadacaoCampanha (
+    Campanha_id INT NOT NULL,
+    Unidade VARCHAR(20) NOT NULL,           -- mesmos valores de CampanhaDoacao.TipoMeta
+    TotalDoacoes INT NOT NULL DEFAULT 0,
+    QuantidadeTotal DECIMAL(14,2) NOT NULL DEFAULT 0.00,
+    PRIMARY KEY (Campanha_id, Unidade),
+    FOREIGN KEY (Campanha_id)
+        REFERENCES CampanhaDoacao(idCampanhaDoacao)
+        ON DELETE CASCADE
+        ON UPDATE CASCADE
+) ENGINE=InnoDB;
+
+SELECT 'Tabela ArrecadacaoCampanha criada com sucesso! Rode o backfill.' AS Status;
+
+-- ============================================================================
+-- ROLLBACK (se necessário desfazer)
+-- ============================================================================
+-- DROP TABLE ArrecadacaoCampanha;
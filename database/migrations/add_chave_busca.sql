@@ -0,0 +1,34 @@
+-- ============================================================================
+-- MIGRATION: Chave fonética de busca dos nomes
+-- Descrição: Coluna ChaveBusca em Doador, Beneficiario e Voluntario com o
+--            nome normalizado (sem acentos, sem "da/de/dos", código fonético
+--            do português), gerada por backend/models/chave_busca.py. Os
+--            models gravam a chave no save/update; a busca por nome vira uma
+--            consulta exata ou por prefixo em idx_chave_busca_*.
+-- Requer: create_database.sql
+-- Depois de rodar: python backend/database/backfill.py chave_busca
+--            (a chave é calculada em Python, não dá para preencher aqui)
+-- ============================================================================
+
+USE somos_darua;
+
+ALTER TABLE Doador
+ADD COLUMN ChaveBusca VARCHAR(255) NULL AFTER Nome,
+ADD INDEX idx_chave_busca_doador (ChaveBusca);
+
+ALTER TABLE Beneficiario
+ADD COLUMN ChaveBusca VARCHAR(255) NULL AFTER Nome,
+ADD INDEX idx_chave_busca_beneficiario (ChaveBusca);
+
+ALTER TABLE Voluntario
+ADD COLUMN ChaveBusca VARCHAR(255) NULL AFTER Nome,
+ADD INDEX idx_chave_busca_voluntario (ChaveBusca);
+
+SELECT 'Campo ChaveBusca adicionado! Rode o backfill chave_busca para preencher.' AS Status;
+
+-- ============================================================================
+-- ROLLBACK (se necessário desfazer)
+-- ============================================================================
+-- ALTER TABLE Doador DROP INDEX idx_chave_busca_doador, DROP COLUMN ChaveBusca;
+-- ALTER TABLE Beneficiario DROP INDEX idx_chave_busca_beneficiario, DROP COLUMN ChaveBusca;
+-- ALTER TABLE Voluntario DROP INDEX idx_chave_busca_voluntario, DROP COLUMN ChaveBusca;
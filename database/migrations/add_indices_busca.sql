@@ -0,0 +1,36 @@
+-- ============================================================================
+-- MIGRATION: Índices de busca dos cadastros
+-- Descrição: Índices FULLTEXT com parser ngram para BuscaService.search():
+--            encontram qualquer trecho (2+ caracteres) do nome, email ou
+--            telefone sem varrer a tabela, o que LIKE '%texto%' não consegue.
+--            Beneficiario só tem Nome para buscar.
+-- Requer: create_database.sql
+-- Observação: usa o ngram_token_size padrão (2). As stopwords do InnoDB
+--            ficam desligadas na criação do índice: com o parser ngram,
+--            palavras como "a" e "de" eliminariam quase todos os bigramas
+--            de nomes em português.
+-- ============================================================================
+
+USE somos_darua;
+
+SET SESSION innodb_ft_enable_stopword = OFF;
+
+ALTER TABLE Doador
+ADD FULLTEXT INDEX ft_busca_doador (Nome, Email, Telefone) WITH PARSER ngram;
+
+ALTER TABLE Beneficiario
+ADD FULLTEXT INDEX ft_busca_beneficiario (Nome) WITH PARSER ngram;
+
+ALTER TABLE Voluntario
+ADD FULLTEXT INDEX ft_busca_voluntario (Nome, Email, Telefone) WITH PARSER ngram;
+
+SET SESSION innodb_ft_enable_stopword = ON;
+
+SELECT 'Índices de busca criados com sucesso!' AS Status;
+
+-- ============================================================================
+-- ROLLBACK (se necessário desfazer)
+-- ============================================================================
+-- ALTER TABLE Doador DROP INDEX ft_busca_doador;
+-- ALTER TABLE Beneficiario DROP INDEX ft_busca_beneficiario;
+-- ALTER TABLE Voluntario DROP INDEX ft_busca_voluntario;
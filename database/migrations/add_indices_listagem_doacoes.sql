@@ -0,0 +1,23 @@
+-- ============================================================================
+-- MIGRATION: Índices para a listagem paginada de doações
+-- Descrição: Doacao.listar() filtra por Status/TipoDoacao/Ponto e pagina por
+--            (DataCriacao, idDoacao). Estes índices compostos permitem que o
+--            MySQL leia só a página pedida em vez de ordenar a tabela toda.
+-- Requer: add_doacoes_detalhes.sql e add_fks_doacoes.sql
+-- ============================================================================
+
+USE somos_darua;
+
+ALTER TABLE Doacao
+ADD INDEX idx_status_data (Status, DataCriacao, idDoacao),
+ADD INDEX idx_tipo_data (TipoDoacao, DataCriacao, idDoacao),
+ADD INDEX idx_ponto_data (PontoColeta_idPontoColeta, DataCriacao, idDoacao);
+
+SELECT 'Índices idx_status_data, idx_tipo_data e idx_ponto_data criados com sucesso!' AS Status;
+
+-- ============================================================================
+-- ROLLBACK (se necessário desfazer)
+-- ============================================================================
+-- ALTER TABLE Doacao DROP INDEX idx_status_data;
+-- ALTER TABLE Doacao DROP INDEX idx_tipo_data;
+-- ALTER TABLE Doacao DROP INDEX idx_ponto_data;
@@ -0,0 +1,32 @@
+-- ============================================================================
+-- MIGRATION: Data da primeira doação de cada doador
+-- Descrição: Doador.PrimeiraDoacao guarda a data da doação mais antiga do
+--            doador. O model Doacao mantém a coluna a cada save/update/delete
+--            e a série "novos doadores por mês" vira uma consulta de intervalo
+--            em idx_primeira_doacao, sem agrupar a tabela Doacao.
+-- Requer: create_database.sql
+-- Para recalcular depois: python backend/database/backfill.py primeira_doacao
+-- ============================================================================
+
+USE somos_darua;
+
+ALTER TABLE Doador
+ADD COLUMN PrimeiraDoacao DATE NULL AFTER CEP,
+ADD INDEX idx_primeira_doacao (PrimeiraDoacao);
+
+-- Preencher a partir das doações existentes
+UPDATE Doador d
+LEFT JOIN (
+    SELECT Doador_idDoador, MIN(DataCriacao) AS Primeira
+    FROM Doacao
+    GROUP BY Doador_idDoador
+) p ON p.Doador_idDoador = d.idDoador
+SET d.PrimeiraDoacao = p.Primeira;
+
+SELECT 'Campo PrimeiraDoacao adicionado e preenchido com sucesso!' AS Status;
+
+-- ============================================================================
+-- ROLLBACK (se necessário desfazer)
+-- ============================================================================
+-- ALTER TABLE Doador DROP INDEX idx_primeira_doacao;
+-- ALTER TABLE Doador DROP COLUMN PrimeiraDoacao;
\ No newline at end of file
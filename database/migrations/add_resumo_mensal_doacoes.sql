@@ -0,0 +1,32 @@
+-- ============================================================================
+-- MIGRATION: Tabela de resumo mensal de doações
+-- Descrição: Contadores pré-agregados por (mês, tipo, campanha, ponto). O
+--            model Doacao mantém a tabela a cada save/update/delete/distribuir
+--            e o dashboard lê as séries mensais daqui em vez de agrupar a
+--            tabela Doacao inteira.
+--            Campanha/ponto ausentes são gravados como 0 (colunas da PK não
+--            aceitam NULL).
+-- Requer: add_doacoes_detalhes.sql e add_fks_doacoes.sql
+-- Depois de rodar: python backend/database/backfill.py resumo_mensal
+-- ============================================================================
+
+USE somos_darua;
+
+CREATE TABLE IF NOT EXISTS ResumoMensalDoacao (
+    Mes DATE NOT NULL,                      -- primeiro dia do mês de DataCriacao
+    TipoDoacao VARCHAR(50) NOT NULL DEFAULT '',
+    Campanha_id INT NOT NULL DEFAULT 0,
+    PontoColeta_id INT NOT NULL DEFAULT 0,
+    TotalDoacoes INT NOT NULL DEFAULT 0,
+    QuantidadeTotal DECIMAL(14,2) NOT NULL DEFAULT 0.00,
+    TotalDistribuidas INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (Mes, TipoDoacao, Campanha_id, PontoColeta_id),
+    INDEX idx_tipo_mes (TipoDoacao, Mes)
+) ENGINE=InnoDB;
+
+SELECT 'Tabela ResumoMensalDoacao criada com sucesso! Rode o backfill.' AS Status;
+
+-- ============================================================================
+-- ROLLBACK (se necessário desfazer)
+-- ============================================================================
+-- DROP TABLE ResumoMensalDoacao;
\ No newline at end of file
@@ -0,0 +1,42 @@
+-- ============================================================================
+-- MIGRATION: Série diária dos totais do dashboard
+-- Descrição: Uma linha por dia com os quatro totais dos cards (doadores,
+--            beneficiários, doações e campanhas ativas). Os cards mostram a
+--            variação real no mês comparando com uma única linha desta
+--            tabela (busca pela chave primária), sem varrer as tabelas base.
+--            Só o job diário grava linhas (o dashboard e os relatórios
+--            apenas leem): python backend/services/snapshot_service.py
+--            Em dias sem job os cards continuam com os totais atuais; a
+--            variação usa o último snapshot até o fim do mês anterior e,
+--            se não houver nenhum, o card aparece sem variação.
+-- Requer: create_database.sql
+-- ============================================================================
+
+USE somos_darua;
+
+CREATE TABLE IF NOT EXISTS SnapshotMetricas (
+    Data DATE NOT NULL,
+    TotalDoadores INT NOT NULL DEFAULT 0,
+    TotalBeneficiarios INT NOT NULL DEFAULT 0,
+    TotalDoacoes INT NOT NULL DEFAULT 0,
+    CampanhasAtivas INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (Data)
+) ENGINE=InnoDB;
+
+-- Primeiro ponto da série: os totais de hoje
+INSERT IGNORE INTO SnapshotMetricas
+    (Data, TotalDoadores, TotalBeneficiarios, TotalDoacoes, CampanhasAtivas)
+SELECT
+    CURDATE(),
+    (SELECT COUNT(*) FROM Doador),
+    (SELECT COUNT(*) FROM Beneficiario),
+    (SELECT COUNT(*) FROM Doacao),
+    (SELECT COUNT(*) FROM CampanhaDoacao
+     WHERE DataTermino IS NULL OR DataTermino >= CURDATE());
+
+SELECT 'Tabela SnapshotMetricas criada com sucesso!' AS Status;
+
+-- ============================================================================
+-- ROLLBACK (se necessário desfazer)
+-- ============================================================================
+-- DROP TABLE SnapshotMetricas;
@@ -0,0 +1,8 @@
+"""Configuração dos testes: backend no sys.path, como nos scripts do projeto"""
+
+import sys
+from pathlib import Path
+
+backend_path = Path(__file__).parent.parent / 'backend'
+if str(backend_path) not in sys.path:
+    sys.path.insert(0, str(backend_path))
@@ -0,0 +1,39 @@
+"""Testes da chave fonética de busca (models/chave_busca.py)"""
+
+import pytest
+
+from models.chave_busca import ChaveBusca
+
+
+@pytest.mark.parametrize("com_acento, sem_acento", [
+    ("Gonçalves", "Goncalves"),
+    ("Conceição", "Conceicao"),
+    ("João da Silva", "Joao Silva"),
+    ("MARIA JOSÉ", "maria jose"),
+])
+def test_acentos_e_cedilha_geram_a_mesma_chave(com_acento, sem_acento):
+    assert ChaveBusca.gerar(com_acento) == ChaveBusca.gerar(sem_acento)
+
+
+@pytest.mark.parametrize("dobrada, simples", [
+    ("Emmanuel", "Emanuel"),
+    ("Anna", "Ana"),
+    ("Cissa", "Cisa"),
+])
+def test_letras_dobradas_geram_a_mesma_chave(dobrada, simples):
+    assert ChaveBusca.gerar(dobrada) == ChaveBusca.gerar(simples)
+
+
+def test_c_brando_antes_de_e_i():
+    assert ChaveBusca.gerar("Cecília") == ChaveBusca.gerar("Sesilia")
+    assert ChaveBusca.gerar("Carla") != ChaveBusca.gerar("Sarla")
+
+
+def test_particulas_sao_ignoradas():
+    assert ChaveBusca.gerar("João da Silva") == "JUAU SILVA"
+    assert ChaveBusca.gerar("de da do") == ""
+
+
+def test_e_o_viram_i_u_em_qualquer_posicao():
+    assert ChaveBusca.gerar("Pedro") == ChaveBusca.gerar("Pidru") == "PIDRU"
+    assert ChaveBusca.gerar("Rosa") == "RUSA"
@@ -0,0 +1,107 @@
+"""Testes da leitura e conversão de planilhas (services/importacao_service.py)"""
+
+import io
+from contextlib import contextmanager
+
+import pandas as pd
+import pytest
+
+from services.importacao_service import ImportacaoService
+
+
+@pytest.mark.parametrize("cabecalho, esperado", [
+    ("Descrição", "descricao"),
+    ("Observações", "observacoes"),
+    ("Data da Doação", "data_da_doacao"),
+    ("PONTO DE COLETA", "ponto_de_coleta"),
+    ("E-mail", "e_mail"),
+    ("Gênero", "genero"),
+])
+def test_cabecalho_remove_acentos(cabecalho, esperado):
+    assert ImportacaoService._cabecalho(cabecalho) == esperado
+
+
+def test_mapear_colunas_com_cabecalhos_acentuados():
+    colunas = ["Doador", "Ponto de Coleta", "Voluntário", "Descrição",
+               "Quantidade", "Data da Doação", "Observações"]
+    mapa = ImportacaoService._mapear_colunas('doacao', colunas)
+    assert mapa["Descrição"] == 'descricao_item'
+    assert mapa["Data da Doação"] == 'data_criacao'
+    assert mapa["Observações"] == 'observacoes'
+    assert mapa["Voluntário"] == 'voluntario'
+
+
+def test_mapear_colunas_recusa_obrigatoria_ausente():
+    with pytest.raises(ValueError, match="descricao_item"):
+        ImportacaoService._mapear_colunas('doacao', ["Doador", "Ponto", "Voluntário", "Quantidade"])
+
+
+def test_numero_separadores_brasileiros():
+    texto = pd.Series(['1.234', '1.234.567', '1.234,5', '12,5', '1234.5', '1.5', '', 'abc'])
+    valores, invalidos = ImportacaoService._numero(texto)
+    assert valores.tolist()[:6] == [1234, 1234567, 1234.5, 12.5, 1234.5, 1.5]
+    assert valores[6:].isna().all()
+    assert invalidos.tolist() == [False] * 7 + [True]
+
+
+def test_celula_decimal_do_excel_nao_vira_milhar():
+    texto = pd.Series([ImportacaoService._celula(1.234), ImportacaoService._celula(12.0)])
+    valores, _ = ImportacaoService._numero(texto)
+    assert valores.tolist() == [1.234, 12]
+
+
+class ConexaoFalsa:
+    """Grava os parâmetros dos executemany no lugar do banco"""
+    
+    in_transaction = False
+    
+    def __init__(self):
+        self.gravados = []
+    
+    @contextmanager
+    def transaction(self):
+        yield self
+    
+    def executemany(self, query, params):
+        self.gravados.extend(params)
+        return len(params)
+    
+    def after_commit(self, callback):
+        pass
+
+
+def _csv(texto: str) -> io.BytesIO:
+    arquivo = io.BytesIO(texto.encode('utf-8'))
+    arquivo.name = 'planilha.csv'
+    return arquivo
+
+
+@pytest.mark.parametrize("texto", [
+    "nome\nMaria Souza\nJoao Pereira\nAna\n",
+    "nome\nMaria\nJoao\n",
+])
+def test_ler_csv_de_uma_coluna(texto):
+    bloco = pd.concat(ImportacaoService.ler(_csv(texto)))
+    assert list(bloco.columns) == ['nome']
+    assert bloco['nome'].tolist() == texto.split('\n')[1:-1]
+
+
+def test_ler_csv_com_ponto_e_virgula():
+    bloco = pd.concat(ImportacaoService.ler(_csv("nome;idade\nMaria, a filha;30\n")))
+    assert bloco.to_dict('records') == [{'nome': 'Maria, a filha', 'idade': '30'}]
+
+
+def test_importar_recusa_linha_malformada_sem_interromper():
+    db = ConexaoFalsa()
+    resultado = ImportacaoService.importar(
+        'beneficiario',
+        _csv("nome,idade\nMaria,30\nJoao,40,extra\nAna,25\n"),
+        tamanho_bloco=2,
+        db=db
+    )
+    assert [linha[0] for linha in db.gravados] == ['Maria', 'Ana']
+    assert resultado['inseridos'] == 2
+    erros = resultado['erros']
+    assert erros['linha'].tolist() == [3]
+    assert erros['erro'].tolist() == ["Linha com mais colunas que o cabeçalho"]
+    assert erros['nome'].tolist() == ['Joao,40,extra']
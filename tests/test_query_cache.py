@@ -0,0 +1,51 @@
+"""Testes do cache das leituras dos models (database/cache.py)"""
+
+from database.cache import QueryCache, _copiar
+
+
+class Registro:
+    def __init__(self, nome):
+        self.nome = nome
+
+
+def test_carga_concorrente_com_invalidate_nao_fica_no_cache():
+    cache = QueryCache(ttl=60)
+    
+    def carregar_antigo():
+        cache.invalidate('Doador')  # uma escrita termina durante a carga
+        return ['antigo']
+    
+    assert cache.get_or_load(('Doador', 'get_all'), carregar_antigo) == ['antigo']
+    assert cache.get_or_load(('Doador', 'get_all'), lambda: ['novo']) == ['novo']
+
+
+def test_resultado_vazio_nao_e_guardado():
+    cache = QueryCache(ttl=60)
+    assert cache.get_or_load(('Doador', 'get_all'), lambda: []) == []
+    assert cache.get_or_load(('Doador', 'get_all'), lambda: ['depois']) == ['depois']
+
+
+def test_valor_e_guardado_ate_invalidar():
+    cache = QueryCache(ttl=60)
+    cache.get_or_load(('Doador', 'get_all'), lambda: ['a'])
+    assert cache.get_or_load(('Doador', 'get_all'), lambda: ['b']) == ['a']
+    cache.invalidate('Doador')
+    assert cache.get_or_load(('Doador', 'get_all'), lambda: ['b']) == ['b']
+
+
+def test_copia_nao_compartilha_os_objetos_guardados():
+    guardado = [Registro('Ana')]
+    copia = _copiar(guardado)
+    copia[0].nome = 'Outro'
+    assert guardado[0].nome == 'Ana'
+
+
+def test_carga_concorrente_com_clear_nao_fica_no_cache():
+    cache = QueryCache(ttl=60)
+    
+    def carregar_antigo():
+        cache.clear()
+        return ['antigo']
+    
+    cache.get_or_load(('Doador', 'get_all'), carregar_antigo)
+    assert cache.get_or_load(('Doador', 'get_all'), lambda: ['novo']) == ['novo']
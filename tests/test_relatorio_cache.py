@@ -0,0 +1,15 @@
+"""Invalidação do cache de RelatorioService.gerar pelas tabelas relacionadas"""
+
+import pytest
+
+from database.cache import query_cache
+from services.relatorio_service import RelatorioService
+
+
+@pytest.mark.parametrize('namespace', RelatorioService.NAMESPACES_RELACIONADOS)
+def test_escrita_em_tabela_relacionada_invalida_relatorio(namespace):
+    chave = ('Relatorio', 'gerar', ('Visão Geral',), ())
+    query_cache.get_or_load(chave, lambda: {'totais': 1})
+    query_cache.invalidate(namespace)
+    assert query_cache.get_or_load(chave, lambda: {'totais': 2}) == {'totais': 2}
+    query_cache.invalidate('Relatorio')